@@ -0,0 +1,93 @@
+# analysis.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+import pagerank as pr
+import betweenness as bt
+import flowratio as fr
+import cognitiveslope as cs
+import teamtopology as tt
+import teamflowgraph as tfg
+import analysiscache as ac
+import instrumentation as im
+
+#values returned for every team, in output order
+COLUMNS = ("type", "betweenness", "pagerank", "flow", "imps", "need", "energy", "resilience")
+
+def analyze(teamflow, extended=True, betweennessMethod="exact", samples=None, seed=None, backend=None, cache=None):
+    """ Team Topology and FINE Flow Analysis - findTopology and evaluate in a single pass over one graph
+
+    Parameters
+    ----------
+    teamflow : dictionary
+        dependency relationship dictionaly in the form: {"A":[("B","C"),("C","F")],"B":[("C","X")],"C":[]}
+        or a TeamFlowGraph. The graph is parsed once, and page rank (d=0.8) and betweenness are computed
+        once and shared by the topology classification and the FINE flow equations.
+
+    extended, betweennessMethod, samples, seed, backend:
+        as for teamtopology.findTopology, which also describes how the error bound of approx betweenness is reported
+
+    cache: AnalysisCache
+        reuse the page rank and betweenness of earlier calls on the same team flow (see the analysiscache module)
+
+    Returns
+    -------
+    dictionary
+        a dictionary containing the analysis of each team in the form:
+
+        {'team_1':  ['team_type', <betweenness>, <pageRank>, <flow>, <imps>, <need>, <energy>, <resilience>],
+          ...}
+
+        in COLUMNS order. The values equal those of findTopology(teamflow, centralities=True) for the
+        team flow without interactions and of evaluate(teamflow, flow=True, imp=True, need=True,
+        energy=True, resilience=True), rounded to 4 decimal places as they are.
+
+    """
+    if betweennessMethod not in ("exact", "approx", "interior"):
+        raise ValueError("betweennessMethod must be one of: exact, approx or interior")
+
+    #stages are timed when instrumentation is enabled (see the instrumentation module)
+    with im.stage("matrix"):
+        graph = tfg.asGraph(teamflow)
+        N = len(graph)
+        indptr, indices = graph.toCSR()
+        im.matrix("edges", N, len(graph.src), graph.src, graph.dst, graph.mode)
+        im.matrix("csr", N, len(indices), indptr, indices)
+
+    #keys match the sparse findTopology ones, so both share cached centralities
+    h = cache.key(teamflow) if cache is not None else None
+    with im.stage("pagerank"):
+        pagerank = ac.memoize(cache, (h, "pagerank", "sparse", 0.8), lambda: pr.pagerankSparse(indptr, indices, d=0.8, normalize=True))
+    with im.stage("betweenness"):
+        if betweennessMethod == "exact":
+            betweenness = ac.memoize(cache, (h, "betweenness", "sparse", backend), lambda: bt.betweennessCSR(indptr, indices, backend))
+        elif betweennessMethod == "approx":
+            k = samples or N
+            betweenness = ac.memoize(cache if seed is not None else None, (h, "approx", "sparse", k, seed, backend), lambda: bt.betweennessApprox(indptr, indices, k, seed, backend=backend)[0])
+            im.record("betweenness", {'method': "approx", 'teams': N, 'samples': min(k, N), 'bound': bt.errorBound(N, k)})
+        else:
+            betweenness = ac.memoize(cache, (h, "interior", "sparse"), lambda: bt.interior(indptr, indices))
+
+    #team types
+    with im.stage("classification"):
+        degree_out = np.diff(indptr)
+        degree_in = np.bincount(indices, minlength=N)
+        types = tt.assignTypes(bt.classify(betweenness), pr.classify(pagerank), degree_out, degree_in, extended)
+
+    #FINE flow circle equations for all teams at once, page rank as impediments
+    with im.stage("cognitive slope"):
+        slopesSum, nonZeroCount = cs.edgeSlopes(graph.src, graph.dst, graph.mode, N)
+        energy = slopesSum / nonZeroCount
+        flow = np.sqrt(energy / pagerank)
+        need = np.sqrt(energy * pagerank)
+    with im.stage("resilience"):
+        resilience = fr.computeResilienceArray(bad=1, good=10, batchSize=1, imps=pagerank, energy=energy)
+
+    with im.stage("output"):
+        columns = [types.tolist(), np.round(betweenness, 4).tolist(), np.round(pagerank, 4).tolist()]
+        columns += [fr.roundExact(x).tolist() for x in (flow, pagerank, need, energy)]
+        columns.append(resilience.tolist())
+
+        return {name: list(row) for name, row in zip(graph.names, zip(*columns))}
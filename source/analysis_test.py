@@ -0,0 +1,70 @@
+# analysis_test.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import unittest
+import analysis as an
+import analysiscache as ac
+import teamtopology as tt
+import teamflowgraph as tfg
+import fineflowevaluation as fine
+
+class TestAnalysis(unittest.TestCase):
+
+    def setUp(self):
+
+        #Team flow for Bakers Unlimited Example
+        self.BU_TeamFlow = {'StoreRO':  ['CRM', 'QE', 'DataEC'],
+                            'OnlineRO': ['CRM', 'UX', 'QE', 'DataEC'],
+                            'CRM':      ['DataEC', 'CloudES'],
+                            'UX':       [],
+                            'QE':       [],
+                            'DataEC':   ['QE', 'CloudES'],
+                            'CloudES':  ['QE']
+        }
+
+        #Team flow for Bakers Unlimited Example with interactions
+        self.BU_TeamFlowWithInteractions = {'StoreRO':  [('CRM', 'C'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'OnlineRO': [('CRM', 'C'), ('UX', 'F'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'CRM':      [('DataEC', 'X'), ('CloudES', 'X')],
+                                            'UX':       [],
+                                            'QE':       [],
+                                            'DataEC':   [('QE', 'F'), ('CloudES', 'X')],
+                                            'CloudES':  [('QE', 'F')]
+        }
+
+    def test_whenGivenBakersUnlimitedThenAnalysisMatchesTopologyAndEvaluation(self):
+        topology = tt.findTopology(self.BU_TeamFlow, centralities=True)
+        evaluation = fine.evaluate(self.BU_TeamFlowWithInteractions, flow=True, imp=True, need=True, energy=True, resilience=True)
+
+        result = an.analyze(self.BU_TeamFlowWithInteractions)
+
+        assert list(result.keys()) == list(self.BU_TeamFlow.keys())
+        for team, row in result.items():
+            assert len(row) == len(an.COLUMNS)
+            assert row[:3] == [topology[team][2], topology[team][0], topology[team][1]]
+            assert row[3:] == evaluation[team]
+
+    def test_whenGivenGraphOrOtherBetweennessMethodThenAnalysisMatchesDictionary(self):
+        graph = tfg.asGraph(self.BU_TeamFlowWithInteractions)
+
+        assert an.analyze(graph) == an.analyze(self.BU_TeamFlowWithInteractions)
+        types = [row[0] for row in an.analyze(graph, betweennessMethod="interior").values()]
+        assert types == [row[0] for row in tt.findTopology(self.BU_TeamFlow).values()]
+
+    def test_whenCacheIsSharedThenAnalysisReusesTopologyCentralities(self):
+        cache = ac.AnalysisCache()
+
+        tt.findTopology(self.BU_TeamFlowWithInteractions, sparse=True, cache=cache)
+        result = an.analyze(self.BU_TeamFlowWithInteractions, cache=cache)
+
+        assert cache.hits == 2
+        assert result == an.analyze(self.BU_TeamFlowWithInteractions)
+
+    def test_whenGivenUnknownBetweennessMethodThenErrorIsRaised(self):
+        with self.assertRaises(ValueError):
+            an.analyze(self.BU_TeamFlowWithInteractions, betweennessMethod="fast")
+
+if __name__ == '__main__':
+    unittest.main()
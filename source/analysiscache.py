@@ -0,0 +1,97 @@
+# analysiscache.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+from collections import OrderedDict
+import numpy as np
+import instrumentation as im
+
+#default memory bound of a cache, in bytes
+MAX_BYTES = 64 * 2**20
+
+class AnalysisCache:
+    """ Analysis Cache - keeps adjacency matrices, page rank and betweenness vectors between calls on the same team flow
+
+    Opt-in: pass a cache to findTopology, findCognitiveSlope or evaluate with cache=... and repeated
+    calls on a team flow with the same structure and the same solver parameters reuse the stored
+    arrays instead of rebuilding them. Entries are keyed by a hash of the team flow content, so an
+    equal dictionary built afresh for every call still hits, and any edit to it misses.
+
+    Stored arrays are read only and shared between calls. The least recently used entries are
+    evicted once the arrays held exceed the memory bound, and entries larger than the bound are
+    not stored at all.
+
+    Parameters
+    ----------
+    maxBytes : int
+        memory bound of the arrays held by the cache, by default MAX_BYTES
+    """
+
+    def __init__(self, maxBytes=MAX_BYTES):
+        self.maxBytes = maxBytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, compute):
+        """ returns the value stored under key, computing and storing it with compute() on a miss """
+        if key in self.entries:
+            self.hits += 1
+            im.count("cache.hits")
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+        self.misses += 1
+        im.count("cache.misses")
+        value = compute()
+        arrays = value if isinstance(value, tuple) else (value,)
+        size = sum(a.nbytes for a in arrays if isinstance(a, np.ndarray))
+        for a in arrays:
+            if isinstance(a, np.ndarray):
+                a.flags.writeable = False
+
+        if size <= self.maxBytes:
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.maxBytes:
+                self.bytes -= self.entries.popitem(last=False)[1][1]
+                self.evictions += 1
+
+        return value
+
+    def key(self, teamflow):
+        """ returns the content hash of a teamflow dictionary or TeamFlowGraph, used as the first part of all its keys """
+        return contentKey(teamflow)
+
+    def clear(self):
+        """ removes all entries, keeping the counters """
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """ returns the hit, miss and eviction counters and the current size of the cache """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(self.entries), 'bytes': self.bytes, 'maxBytes': self.maxBytes}
+
+
+def contentKey(teamflow):
+    """ returns a hash of the content of a teamflow dictionary or TeamFlowGraph, equal for equal team flows """
+    #imported here, so that the analyses load without them when no cache is used
+    import json
+    import hashlib
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(teamflow, dict):
+        h.update(b"dict" + json.dumps(list(teamflow.items()), default=repr).encode())
+    else:
+        h.update(b"graph" + json.dumps(teamflow.names, default=repr).encode())
+        for a in (teamflow.src, teamflow.dst, teamflow.mode):
+            h.update(a.tobytes())
+    return h.hexdigest()
+
+
+def memoize(cache, key, compute):
+    """ returns compute(), stored under key in cache when a cache is given """
+    return compute() if cache is None else cache.get(key, compute)
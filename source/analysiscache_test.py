@@ -0,0 +1,90 @@
+# analysiscache_test.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import copy
+import unittest
+import numpy as np
+import analysiscache as ac
+import teamtopology as tt
+import cognitiveslope as cs
+import fineflowevaluation as fine
+
+class TestAnalysisCache(unittest.TestCase):
+
+    def setUp(self):
+
+        #Team flow for Bakers Unlimited Example
+        self.BU_TeamFlow = {'StoreRO':  ['CRM', 'QE', 'DataEC'],
+                            'OnlineRO': ['CRM', 'UX', 'QE', 'DataEC'],
+                            'CRM':      ['DataEC', 'CloudES'],
+                            'UX':       [],
+                            'QE':       [],
+                            'DataEC':   ['QE', 'CloudES'],
+                            'CloudES':  ['QE']
+        }
+
+        #Team flow for Bakers Unlimited Example with interactions
+        self.BU_TeamFlowWithInteractions = {'StoreRO':  [('CRM', 'C'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'OnlineRO': [('CRM', 'C'), ('UX', 'F'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'CRM':      [('DataEC', 'X'), ('CloudES', 'X')],
+                                            'UX':       [],
+                                            'QE':       [],
+                                            'DataEC':   [('QE', 'F'), ('CloudES', 'X')],
+                                            'CloudES':  [('QE', 'F')]
+        }
+
+    def test_whenCalledTwiceOnEqualTeamFlowThenSecondCallHitsAndResultsMatch(self):
+        cache = ac.AnalysisCache()
+
+        first = tt.findTopology(self.BU_TeamFlow, True, True, cache=cache)
+        misses = cache.misses
+        second = tt.findTopology(copy.deepcopy(self.BU_TeamFlow), True, True, cache=cache)
+
+        assert first == second == tt.findTopology(self.BU_TeamFlow, True, True)
+        assert cache.misses == misses
+        assert cache.hits == misses
+
+    def test_whenEvaluatedTwiceThenResultsMatchUncachedEvaluation(self):
+        cache = ac.AnalysisCache()
+        expected = fine.evaluate(self.BU_TeamFlowWithInteractions, True, True, True, True, True, True)
+
+        for sparse in (False, True):
+            for _ in range(2):
+                result = cs.findCognitiveSlope(self.BU_TeamFlowWithInteractions, True, True, True, True, True, True, sparse=sparse, cache=cache)
+                assert result == expected
+
+        assert cache.stats()['hits'] == cache.stats()['misses']
+
+    def test_whenTeamFlowOrParametersChangeThenCacheMisses(self):
+        cache = ac.AnalysisCache()
+        edited = copy.deepcopy(self.BU_TeamFlow)
+        edited['UX'].append('QE')
+
+        tt.findTopology(self.BU_TeamFlow, cache=cache)
+        tt.findTopology(edited, cache=cache)
+        tt.findTopology(self.BU_TeamFlow, betweennessMethod="interior", cache=cache)
+
+        assert cache.hits == 2
+        assert cache.key(edited) != cache.key(self.BU_TeamFlow)
+        assert tt.findTopology(edited, cache=cache) == tt.findTopology(edited)
+
+    def test_whenMemoryBoundIsExceededThenLeastRecentlyUsedEntriesAreEvicted(self):
+        cache = ac.AnalysisCache(maxBytes=2000)
+
+        a = cache.get("a", lambda: np.zeros(100))
+        cache.get("b", lambda: np.zeros(100))
+        cache.get("a", lambda: np.ones(100))
+        cache.get("c", lambda: np.zeros(100))
+        cache.get("d", lambda: np.zeros(1000))
+
+        assert list(cache.entries) == ["a", "c"]
+        assert cache.stats() == {'hits': 1, 'misses': 4, 'evictions': 1, 'entries': 2, 'bytes': 1600, 'maxBytes': 2000}
+        assert not a.flags.writeable
+
+    def test_whenNoCacheIsGivenThenMemoizeComputes(self):
+        assert ac.memoize(None, "a", lambda: 1) == 1
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+# batch.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import sys
+import json
+import time
+import argparse
+import traceback
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import edgelist as el
+import analysis as an
+
+#team flow file extensions picked up from input directories
+EXTENSIONS = (".json", ".csv", ".jsonl")
+
+#analysis options of the worker processes, set once per worker by the pool initializer
+OPTIONS = None
+
+def runBatch(inputs, output, processes=None, inFlight=None, **options):
+    """ Analyzes many organizations across a process pool, streaming one result line per organization
+    Parameters
+    ----------
+    inputs : list
+        team flow files, directories of team flow files, or manifest files listing one team flow file per line
+        (see the findInputs function). A team flow file is a .json teamflow dictionary, with
+        [dependency, mode] pairs for interactions, or a .csv or .jsonl edge list (see the edgelist module).
+        Files of any other extension, and manifests that cannot be read, are reported as failed organizations.
+    output : file
+        text file the results are written to as JSON lines, in the order the organizations finish:
+        {"org": <path>, "index": <input position>, "teams": <count>, "seconds": <time>, "columns": analysis.COLUMNS,
+         "result": <analysis.analyze output>} or {"org": <path>, "index": <input position>, "error": <message>}
+    processes : int, optional
+        number of worker processes, by default one per CPU. With 1 the organizations are analyzed in process.
+    inFlight : int, optional
+        most organizations queued or running at once, by default twice the number of processes
+    options:
+        keyword arguments passed to analysis.analyze, such as betweennessMethod="interior"
+
+    Returns
+    -------
+    tuple
+        (analyzed, failed) counts. Each worker imports the tool kit once when it starts and keeps the
+        options, so tasks only carry a path, and no more than inFlight results are held at once.
+    """
+    paths = findInputs(inputs)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, min(processes, len(paths)))
+    inFlight = max(processes, inFlight or 2 * processes)
+    analyzed = 0
+    failed = 0
+
+    def write(line):
+        nonlocal analyzed, failed
+        if "error" in line:
+            failed += 1
+        else:
+            analyzed += 1
+        output.write(json.dumps(line) + "\n")
+        output.flush()
+
+    if processes == 1:
+        initWorker(options)
+        for index, path in enumerate(paths):
+            write(analyzeFile(index, path))
+        return analyzed, failed
+
+    with ProcessPoolExecutor(processes, initializer=initWorker, initargs=(options,)) as pool:
+        pending = set()
+        for index, path in enumerate(paths):
+            if len(pending) >= inFlight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(future.result())
+            pending.add(pool.submit(analyzeFile, index, path))
+        for future in wait(pending).done:
+            write(future.result())
+    return analyzed, failed
+
+
+def findInputs(inputs):
+    """ expands directories to the team flow files they hold and manifests to the files they list, one per line
+
+    An input that is neither a team flow file nor a readable manifest is kept as it is, so that it is
+    reported as a failed organization rather than stopping the batch.
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths += sorted(os.path.join(item, name) for name in os.listdir(item) if name.endswith(EXTENSIONS))
+        elif item.endswith(EXTENSIONS):
+            paths.append(item)
+        else:
+            #manifest entries are relative to the manifest, blank lines and # comments are skipped
+            try:
+                with open(item, encoding="utf-8") as file:
+                    lines = [line.strip() for line in file]
+            except (OSError, UnicodeDecodeError):
+                paths.append(item)
+                continue
+            paths += [os.path.join(os.path.dirname(item), line) for line in lines if line and not line.startswith("#")]
+    return paths
+
+
+def loadTeamFlow(path):
+    """ reads a team flow file as a teamflow dictionary (.json) or a TeamFlowGraph (.csv and .jsonl edge lists) """
+    if path.endswith(".csv"):
+        return el.loadCSV(path)
+    if path.endswith(".jsonl"):
+        return el.loadJSONL(path)
+    if not path.endswith(".json"):
+        raise ValueError(f"team flow files must be one of: {', '.join(EXTENSIONS)}, not {path}")
+    with open(path, encoding="utf-8") as file:
+        return parseTeamFlow(json.load(file))
+
+
+def parseTeamFlow(teamflow):
+    """ converts a teamflow dictionary decoded from JSON, with [dependency, mode] lists, to one with (dependency, mode) tuples """
+    if not isinstance(teamflow, dict) or not all(isinstance(row, list) for row in teamflow.values()):
+        raise ValueError("teamflow must be an object mapping each team to a list of dependencies")
+    return {team: [tuple(pair) if isinstance(pair, list) else pair for pair in row] for team, row in teamflow.items()}
+
+
+def initWorker(options):
+    """ pool initializer - keeps the analysis options for all tasks of this worker """
+    global OPTIONS
+    OPTIONS = options
+
+
+def analyzeFile(index, path):
+    """ analyzes one team flow file, returning its result line, or its error line when it cannot be read or analyzed """
+    start = time.perf_counter()
+    try:
+        result = an.analyze(loadTeamFlow(path), **OPTIONS)
+    except Exception as e:
+        return {"org": path, "index": index, "error": "".join(traceback.format_exception_only(e)).strip()}
+    return {"org": path, "index": index, "teams": len(result), "seconds": time.perf_counter() - start,
+            "columns": list(an.COLUMNS), "result": result}
+
+
+def main(argv=None):
+    """ runs the batch from the command line, returning 1 when any organization failed """
+    parser = argparse.ArgumentParser(description="FINE Flow Tool Kit batch analysis of many organizations")
+    parser.add_argument("inputs", nargs="+", help="team flow files (.json, .csv, .jsonl), directories of them, or manifest files")
+    parser.add_argument("--output", default="-", help="JSON lines results file, by default standard output")
+    parser.add_argument("--processes", type=int, help="worker processes, by default one per CPU")
+    parser.add_argument("--in-flight", type=int, help="most organizations queued at once, by default twice the processes")
+    parser.add_argument("--betweenness", choices=("exact", "approx", "interior"), default="exact", help="betweenness method")
+    parser.add_argument("--samples", type=int, help="pivots sampled by the approx betweenness method")
+    parser.add_argument("--seed", type=int, help="seed of the approx betweenness method")
+    parser.add_argument("--backend", choices=("networkx", "native", "parallel"), help="betweenness implementation")
+    args = parser.parse_args(argv)
+
+    options = {"betweennessMethod": args.betweenness, "samples": args.samples, "seed": args.seed, "backend": args.backend}
+    if args.output == "-":
+        analyzed, failed = runBatch(args.inputs, sys.stdout, args.processes, args.in_flight, **options)
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            analyzed, failed = runBatch(args.inputs, file, args.processes, args.in_flight, **options)
+
+    print(f"{analyzed} organizations analyzed, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# batch_test.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import io
+import os
+import json
+import tempfile
+import unittest
+import batch
+import analysis as an
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+
+        #Team flow for Bakers Unlimited Example with interactions
+        self.BU_TeamFlowWithInteractions = {'StoreRO':  [('CRM', 'C'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'OnlineRO': [('CRM', 'C'), ('UX', 'F'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'CRM':      [('DataEC', 'X'), ('CloudES', 'X')],
+                                            'UX':       [],
+                                            'QE':       [],
+                                            'DataEC':   [('QE', 'F'), ('CloudES', 'X')],
+                                            'CloudES':  [('QE', 'F')]
+        }
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.write("bu.json", json.dumps(self.BU_TeamFlowWithInteractions))
+        self.write("bu.csv", "team,depends_on,mode\n" + "".join(f"{t},{d},{m}\n" for t, row in self.BU_TeamFlowWithInteractions.items() for d, m in row))
+        self.write("small.json", json.dumps({"A": ["B"], "B": []}))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as file:
+            file.write(text)
+        return path
+
+    def runBatch(self, *args, **kwargs):
+        output = io.StringIO()
+        counts = batch.runBatch(*args, output=output, **kwargs)
+        return counts, [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_whenGivenDirectoryThenEachOrganizationIsAnalyzedOnce(self):
+        expected = an.analyze(self.BU_TeamFlowWithInteractions)
+
+        for processes in (1, 2):
+            counts, lines = self.runBatch([self.directory.name], processes=processes, inFlight=1)
+
+            assert counts == (3, 0)
+            assert sorted(line["index"] for line in lines) == [0, 1, 2]
+            results = {os.path.basename(line["org"]): line for line in lines}
+            assert results["bu.json"]["result"] == results["bu.csv"]["result"] == json.loads(json.dumps(expected))
+            assert results["small.json"]["teams"] == 2 and results["bu.json"]["columns"] == list(an.COLUMNS)
+
+    def test_whenGivenManifestThenListedFilesAreAnalyzedWithOptions(self):
+        manifest = self.write("nightly.txt", "# nightly snapshots\nbu.json\n\nsmall.json\n")
+
+        counts, lines = self.runBatch([manifest], processes=1, betweennessMethod="interior")
+
+        assert counts == (2, 0)
+        assert [os.path.basename(line["org"]) for line in lines] == ["bu.json", "small.json"]
+        assert lines[0]["result"]["CRM"][1] == 1.0
+
+    def test_whenAnOrganizationFailsThenErrorIsReportedAndOthersContinue(self):
+        broken = self.write("broken.json", "{not json")
+        missing = os.path.join(self.directory.name, "missing.csv")
+        output = os.path.join(self.directory.name, "results.jsonl")
+
+        assert batch.main([broken, missing, os.path.join(self.directory.name, "small.json"), "--output", output, "--processes", "2"]) == 1
+        with open(output) as file:
+            lines = sorted((json.loads(line) for line in file), key=lambda line: line["index"])
+        assert "JSONDecodeError" in lines[0]["error"] and "FileNotFoundError" in lines[1]["error"]
+        assert "result" in lines[2]
+
+    def test_whenAnInputHasAnUnknownExtensionThenItIsReportedAsFailed(self):
+        self.write("org.yaml", "A: [B]\n")
+        manifest = self.write("listed.txt", "org.yaml\nsmall.json\n")
+        missing = os.path.join(self.directory.name, "missing")
+
+        counts, lines = self.runBatch([manifest, missing], processes=1)
+
+        assert counts == (1, 2)
+        assert [os.path.basename(line["org"]) for line in lines] == ["org.yaml", "small.json", "missing"]
+        assert all("ValueError" in line["error"] for line in lines if "error" in line)
+
+if __name__ == '__main__':
+    unittest.main()
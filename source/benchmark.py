@@ -0,0 +1,320 @@
+# benchmark.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import sys
+import json
+import time
+import platform
+import ast
+import argparse
+import subprocess
+import tracemalloc
+import numpy as np
+import pagerank as pr
+import betweenness as bt
+import flowratio as fr
+import cognitiveslope as cs
+import teamtopology as tt
+import teamflowgraph as tfg
+import analysis as an
+
+#team types in generator order, and the default share of each type in an organization
+TYPES = ("SA", "EN", "CS", "PF")
+MIX = (0.6, 0.1, 0.1, 0.2)
+
+#interaction modes and the default share of each mode
+MODES = ("X", "C", "F")
+MODE_MIX = (0.4, 0.3, 0.3)
+
+#share of the dependencies of each team type on each team type, in TYPES order - enabling teams have none
+DEPENDS = {"SA": (0.2, 0.1, 0.2, 0.5),
+           "EN": (0.0, 0.0, 0.0, 0.0),
+           "CS": (0.0, 0.0, 0.2, 0.8),
+           "PF": (0.0, 0.0, 0.0, 1.0)}
+
+#organization sizes measured by default, in teams
+SIZES = (10, 100, 1000, 10000, 100000)
+
+#stored baseline, and the slowdown or memory growth over it that is flagged as a regression
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+TOLERANCE = 1.5
+
+#differences below these floors are timer and allocator noise, never regressions
+SECONDS_FLOOR = 0.005
+BYTES_FLOOR = 2**20
+
+#largest organization measured by each case, as dense matrices, exact betweenness and per team loops grow quickly
+DENSE_TEAMS = 1000
+EXACT_TEAMS = 2000
+LOOP_TEAMS = 10000
+
+def generateOrg(teams, seed=None, mix=MIX, modes=MODE_MIX, degree=3.0, exponent=2.5):
+    """ Generates a realistic synthetic organization as a teamflow dictionary with interactions
+    Parameters
+    ----------
+    teams : int
+        number of teams
+    seed : int, optional
+        random seed, the same seed always gives the same organization
+    mix : tuple, optional
+        share of stream-aligned, enabling, complicated-subsystem and platform teams, by default MIX
+    modes : tuple, optional
+        share of X, C and F interactions, by default MODE_MIX
+    degree : float, optional
+        average number of dependencies of teams that have dependencies, by default 3
+    exponent : float, optional
+        power law exponent of the number of teams depending on a team, by default 2.5
+
+    Returns
+    -------
+    dictionary
+        team flow in the form {"SA-0":[("PF-3","X"),("CS-7","C")], ...} where each team name is prefixed by the
+        type the team was generated as. Dependencies follow DEPENDS, and within a team type the teams depended
+        on are drawn with scale-free weights, so a few platform teams serve most of the organization.
+    """
+    rng = np.random.default_rng(seed)
+    kind = rng.choice(len(TYPES), size=teams, p=mix)
+    names = [f"{TYPES[k]}-{i}" for i, k in enumerate(kind.tolist())]
+
+    #dependencies of each team, enabling teams have none
+    depends = np.array([DEPENDS[t] for t in TYPES])
+    count = rng.poisson(degree, size=teams) * (depends.sum(axis=1)[kind] > 0)
+    src = np.repeat(np.arange(teams), count)
+
+    #type of team each dependency is on, then the team itself by its scale-free fitness
+    fitness = rng.pareto(exponent - 1, size=teams) + 1
+    target = np.empty(len(src), dtype=np.int64)
+    for k in range(len(TYPES)):
+        edges = np.flatnonzero(kind[src] == k)
+        if len(edges):
+            target[edges] = rng.choice(len(TYPES), size=len(edges), p=depends[k])
+    dst = np.full(len(src), -1)
+    for k in range(len(TYPES)):
+        edges = np.flatnonzero(target == k)
+        members = np.flatnonzero(kind == k)
+        if len(members):
+            dst[edges] = rng.choice(members, size=len(edges), p=fitness[members] / fitness[members].sum())
+    mode = rng.choice(len(MODES), size=len(src), p=modes)
+
+    teamflow = {name: [] for name in names}
+    for s, d, m in zip(src.tolist(), dst.tolist(), mode.tolist()):
+        if d >= 0 and d != s:
+            teamflow[names[s]].append((names[d], MODES[m]))
+    return teamflow
+
+
+class Org:
+    """ inputs shared by the benchmark cases of one organization size """
+
+    def __init__(self, teams, seed):
+        self.teamflow = generateOrg(teams, seed)
+        self.plain = {k: [d for d, _ in v] for k, v in self.teamflow.items()}
+        self.graph = tfg.asGraph(self.teamflow)
+        self.csr = self.graph.toCSR()
+        self.matrix = pr.dictToArray(self.plain) if teams <= DENSE_TEAMS else None
+        self.pagerank = pr.pagerankSparse(*self.csr, d=0.8, normalize=True)
+        self.interior = bt.interior(*self.csr)
+        slopesSum, nonZeroCount = cs.edgeSlopes(self.graph.src, self.graph.dst, self.graph.mode, teams)
+        self.energy = slopesSum / nonZeroCount
+
+
+#public functions, (name, largest size, function of an Org)
+FUNCTIONS = [
+    ("findTopology", DENSE_TEAMS, lambda o: tt.findTopology(o.plain)),
+    ("findTopology sparse", EXACT_TEAMS, lambda o: tt.findTopology(o.plain, sparse=True)),
+    ("findTopology interior", None, lambda o: tt.findTopology(o.plain, sparse=True, betweennessMethod="interior")),
+    ("findCognitiveSlope", DENSE_TEAMS, lambda o: cs.findCognitiveSlope(o.teamflow, resilience=True)),
+    ("findCognitiveSlope sparse", None, lambda o: cs.findCognitiveSlope(o.teamflow, resilience=True, sparse=True)),
+    ("analyze interior", None, lambda o: an.analyze(o.teamflow, betweennessMethod="interior")),
+    ("computeEntropy", LOOP_TEAMS, lambda o: [fr.computeEntropy(1, 10, 1, 10, i, e) for i, e in zip(o.pagerank.tolist(), o.energy.tolist())]),
+    ("computeEntropyArray", None, lambda o: fr.computeEntropyArray(1, 10, 1, 10, o.pagerank, o.energy)),
+    ("computeResilience", LOOP_TEAMS, lambda o: [fr.computeResilience(1, 10, 1, i, e) for i, e in zip(o.pagerank.tolist(), o.energy.tolist())]),
+    ("computeResilienceArray", None, lambda o: fr.computeResilienceArray(1, 10, 1, o.pagerank, o.energy)),
+]
+
+#stages of the analyses, (name, largest size, function of an Org)
+STAGES = [
+    ("parse graph", None, lambda o: tfg.TeamFlowGraph.fromDict(o.teamflow)),
+    ("dense matrix", DENSE_TEAMS, lambda o: pr.dictToArray(o.plain)),
+    ("csr matrix", None, lambda o: pr.edgesToCSR(o.graph.src, o.graph.dst, len(o.graph))),
+    ("pagerank dense", DENSE_TEAMS, lambda o: pr.pagerank(o.matrix, d=0.8, normalize=True)),
+    ("pagerank sparse", None, lambda o: pr.pagerankSparse(*o.csr, d=0.8, normalize=True)),
+    ("betweenness exact", EXACT_TEAMS, lambda o: bt.betweennessCSR(*o.csr)),
+    ("betweenness interior", None, lambda o: bt.interior(*o.csr)),
+    ("classification", None, lambda o: tt.assignTypes(bt.classify(o.interior), pr.classify(o.pagerank), np.diff(o.csr[0]), np.bincount(o.csr[1], minlength=len(o.graph)))),
+    ("cognitive slope", None, lambda o: cs.edgeSlopes(o.graph.src, o.graph.dst, o.graph.mode, len(o.graph))),
+]
+
+#modules whose import is measured, and the slow to import modules they must leave to be imported on first use
+IMPORTS = ("fineflowevaluation", "flowratio", "pagerank", "cognitiveslope", "betweenness", "teamtopology", "analysis")
+LAZY = ("networkx", "multiprocessing", "unittest")
+
+#run in a fresh interpreter with numpy already imported, printing the import time, peak memory and modules loaded
+IMPORT_SCRIPT = """
+import sys, time, tracemalloc, numpy
+base = set(sys.modules)
+if {traced}:
+    tracemalloc.start()
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+peak = tracemalloc.get_traced_memory()[1]
+print(repr((seconds, peak, sorted(m for m in set(sys.modules) - base if not m.startswith("_")))))
+"""
+
+def measure(function, org, repeat=3):
+    """ returns the best wall time of repeat calls, and the peak memory allocated by one more traced call """
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(org)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        function(org)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def runBenchmarks(sizes=SIZES, seed=0, repeat=3, only=None, log=None):
+    """ Measures every benchmark case for synthetic organizations of the given sizes
+    Parameters
+    ----------
+    sizes : tuple, optional
+        organization sizes in teams, by default SIZES
+    seed : int, optional
+        generator seed, by default 0
+    repeat : int, optional
+        timed calls per case, the best is kept, by default 3
+    only : string, optional
+        only measure the cases whose name contains this text
+    log : callable, optional
+        called with each result line as it is measured, such as print
+
+    Returns
+    -------
+    dictionary
+        {"<case>/<teams>": {"kind": "function" or "stage", "teams": int, "edges": int, "seconds": float, "peakBytes": int}}
+    """
+    results = {}
+    for teams in sizes:
+        org = Org(teams, seed)
+        for kind, cases in (("function", FUNCTIONS), ("stage", STAGES)):
+            for name, limit, function in cases:
+                if (limit is not None and teams > limit) or (only and only not in name):
+                    continue
+                seconds, peak = measure(function, org, repeat)
+                key = f"{name}/{teams}"
+                results[key] = {"kind": kind, "teams": teams, "edges": len(org.graph.src), "seconds": seconds, "peakBytes": peak}
+                if log:
+                    log(f"{key:<36} {seconds:>10.4f} s {peak / 2**20:>10.2f} MiB")
+    return results
+
+
+def measureImports(modules=IMPORTS, repeat=3, log=None):
+    """ Measures the import of each module in a fresh interpreter, with numpy already imported
+    Parameters
+    ----------
+    modules : tuple, optional
+        module names, by default IMPORTS
+    repeat : int, optional
+        timed imports per module, the best is kept, by default 3
+    log : callable, optional
+        called with each result line as it is measured, such as print
+
+    Returns
+    -------
+    dictionary
+        {"import <module>": {"kind": "import", "seconds": float, "peakBytes": int, "loaded": [module names]}}
+        where loaded lists the modules the import loaded, see LAZY for those it must not
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+
+    def run(module, traced):
+        script = IMPORT_SCRIPT.format(module=module, traced=traced)
+        output = subprocess.run([sys.executable, "-c", script], cwd=directory, capture_output=True, text=True, check=True).stdout
+        return ast.literal_eval(output)
+
+    results = {}
+    for module in modules:
+        seconds = min(run(module, False)[0] for _ in range(repeat))
+        _, peak, loaded = run(module, True)
+        key = f"import {module}"
+        results[key] = {"kind": "import", "seconds": seconds, "peakBytes": peak, "loaded": loaded}
+        if log:
+            log(f"{key:<36} {seconds:>10.4f} s {peak / 2**20:>10.2f} MiB")
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """ returns a description of each result that is slower or larger than its baseline by more than tolerance,
+    and of each import that loads a module it should leave to be imported on first use """
+    regressions = []
+    for key, result in results.items():
+        eager = [module for module in result.get("loaded", ()) if module.split(".")[0] in LAZY]
+        if eager:
+            regressions.append(f"{key}: loads {', '.join(eager)}")
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result["seconds"] > base["seconds"] * tolerance and result["seconds"] - base["seconds"] > SECONDS_FLOOR:
+            regressions.append(f"{key}: {result['seconds']:.4f} s against a baseline of {base['seconds']:.4f} s")
+        if result["peakBytes"] > base["peakBytes"] * tolerance and result["peakBytes"] - base["peakBytes"] > BYTES_FLOOR:
+            regressions.append(f"{key}: {result['peakBytes'] / 2**20:.2f} MiB against a baseline of {base['peakBytes'] / 2**20:.2f} MiB")
+    return regressions
+
+
+def main(argv=None):
+    """ runs the benchmarks from the command line, flagging regressions against the stored baseline """
+    parser = argparse.ArgumentParser(description="FINE Flow Tool Kit scaling benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="organization sizes in teams")
+    parser.add_argument("--seed", type=int, default=0, help="organization generator seed")
+    parser.add_argument("--repeat", type=int, default=3, help="timed calls per case")
+    parser.add_argument("--only", help="only run the cases whose name contains this text")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline results file")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="slowdown or memory growth flagged as a regression")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--output", help="also write the results to this file")
+    parser.add_argument("--imports", action="store_true", help="measure the import time of the modules instead")
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        results = measureImports(repeat=args.repeat, log=print)
+    else:
+        results = runBenchmarks(args.sizes, args.seed, args.repeat, args.only, log=print)
+    report = {"meta": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(), "seed": args.seed},
+              "results": results}
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.update_baseline:
+        #results of the other cases, such as the import times, are kept
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                report["results"] = dict(json.load(file)["results"], **results)
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, run with --update-baseline to store one")
+        return 0
+
+    with open(args.baseline) as file:
+        regressions = compare(results, json.load(file)["results"], args.tolerance)
+    for regression in regressions:
+        print("REGRESSION", regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
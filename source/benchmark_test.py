@@ -0,0 +1,73 @@
+# benchmark_test.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import json
+import tempfile
+import unittest
+import benchmark as bm
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_whenGivenTheSameSeedThenTheSameOrganizationIsGenerated(self):
+        assert bm.generateOrg(200, seed=1) == bm.generateOrg(200, seed=1)
+        assert bm.generateOrg(200, seed=1) != bm.generateOrg(200, seed=2)
+
+    def test_whenGeneratedThenOrganizationFollowsTheTypeMixAndModes(self):
+        org = bm.generateOrg(2000, seed=3)
+        types = [name.split("-")[0] for name in org]
+
+        for kind, share in zip(bm.TYPES, bm.MIX):
+            assert abs(types.count(kind) / len(org) - share) < 0.05
+        for team, row in org.items():
+            assert all(dependency in org and dependency != team and mode in bm.MODES for dependency, mode in row)
+            if team.startswith("EN"):
+                assert row == []
+            if team.startswith("PF"):
+                assert all(dependency.startswith("PF") for dependency, _ in row)
+
+    def test_whenGeneratedThenDependenciesAreScaleFree(self):
+        org = bm.generateOrg(5000, seed=4)
+        counts = {}
+        for row in org.values():
+            for dependency, _ in row:
+                counts[dependency] = counts.get(dependency, 0) + 1
+
+        #a few teams are depended on by far more teams than the average one
+        average = sum(counts.values()) / len(counts)
+        assert max(counts.values()) > 20 * average
+
+    def test_whenRunThenEveryCaseIsMeasuredAndRegressionsAreFlagged(self):
+        results = bm.runBenchmarks(sizes=(10,), repeat=1)
+
+        assert len(results) == len(bm.FUNCTIONS) + len(bm.STAGES)
+        assert all(r["seconds"] >= 0 and r["peakBytes"] >= 0 and r["teams"] == 10 for r in results.values())
+
+        slower = {key: dict(r, seconds=r["seconds"] + 1.0) for key, r in results.items()}
+        assert bm.compare(results, results) == []
+        assert len(bm.compare(slower, results)) == len(results)
+
+    def test_whenRunFromCommandLineThenBaselineIsStoredAndCompared(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, "baseline.json")
+            args = ["--sizes", "10", "--repeat", "1", "--only", "pagerank", "--baseline", baseline]
+
+            assert bm.main(args + ["--update-baseline"]) == 0
+            with open(baseline) as file:
+                assert set(json.load(file)["results"]) == {"pagerank dense/10", "pagerank sparse/10"}
+            assert bm.main(args) == 0
+
+    def test_whenImportingThenCoreModulesLoadWithNumpyAlone(self):
+        results = bm.measureImports(("fineflowevaluation", "flowratio", "teamtopology"), repeat=1)
+
+        assert results["import fineflowevaluation"]["loaded"] == ["fineflowevaluation"]
+        assert set(results["import flowratio"]["loaded"]) <= {"flowratio", "fineflowevaluation", "instrumentation"}
+        assert bm.compare(results, {}) == []
+
+        eager = dict(results["import teamtopology"], loaded=["networkx", "teamtopology"])
+        assert bm.compare({"import teamtopology": eager}, {}) == ["import teamtopology: loads networkx"]
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,27 +3,386 @@
 # Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import os
+import math
 import numpy as np
-import networkx as nx
+import pagerank as pr
 
-def betweenness(M):
+#networkx is optional, the native backend is used when it is not installed. It takes longer to import
+#than the rest of the tool kit, so it is imported on first use (see the networkx function)
+nx = None
+
+#source chunks handed to each worker of the parallel backend, more chunks balance uneven search costs
+CHUNKS_PER_PROCESS = 4
+
+#shared memory blocks and CSR arrays of the worker processes, attached once per worker by the pool initializer
+SHARED = None
+
+def betweenness(M, backend=None):
     """ Betweenness Algorithm - uses networkx library: https://networkx.org/documentation/stable/reference/algorithms/centrality.html
     Parameters
     ----------
     M : numpy array
         adjacency matrix where M_i,j represents the link from 'j' to 'i', such that for all 'j'
         sum(i, M_i,j) = 1
+    backend : string, optional
+        "networkx", "native" (see the brandes function) or "parallel" (see the brandesParallel function),
+        by default networkx when it is installed
 
     Returns
     -------
     numpy array
         a vector of betweenness scores for each vertex of the graph
     """
+    if selectBackend(backend) != "networkx":
+        return betweennessCSR(*pr.arrayToCSR(M), backend=backend)
+
+    nx = networkx()
     G = nx.from_numpy_array(M, create_using=nx.DiGraph)
     bc = nx.betweenness_centrality(G)
     lst = list(bc.values())
     return np.array(lst)
 
+def betweennessCSR(indptr, indices, backend=None):
+    """ Betweenness Algorithm - sparse variant of the betweenness function for graphs in CSR form
+    Parameters
+    ----------
+    indptr : numpy array
+        CSR row pointer array of length N+1, as output by pagerank.dictToCSR
+    indices : numpy array
+        CSR column index array, as output by pagerank.dictToCSR
+    backend : string, optional
+        "networkx", "native" (see the brandes function) or "parallel" (see the brandesParallel function),
+        by default networkx when it is installed
+
+    Returns
+    -------
+    numpy array
+        a vector of betweenness scores for each vertex of the graph
+    """
+    N = len(indptr) - 1
+    backend = selectBackend(backend)
+    if backend == "native":
+        return rescale(brandes(indptr, indices), N)
+    if backend == "parallel":
+        return rescale(brandesParallel(indptr, indices), N)
+
+    bc = networkx().betweenness_centrality(csrToGraph(indptr, indices))
+    return np.array([bc[i] for i in range(N)])
+
+def selectBackend(backend):
+    """ resolves the betweenness backend, raising an error for unknown or unavailable backends """
+    if backend is None:
+        return "native" if networkx() is None else "networkx"
+    if backend not in ("networkx", "native", "parallel"):
+        raise ValueError("backend must be one of: networkx, native or parallel")
+    if backend == "networkx" and networkx() is None:
+        raise ImportError("the networkx backend requires the networkx library")
+    return backend
+
+def networkx():
+    """ returns the networkx module, importing it on first use, or None when it is not installed """
+    global nx
+    if nx is None:
+        try:
+            import networkx as module
+        except ImportError:
+            module = False
+        nx = module
+    return nx or None
+
+def brandes(indptr, indices, sources=None):
+    """ Brandes' betweenness accumulation run directly on a graph in CSR form
+    Parameters
+    ----------
+    indptr : numpy array
+        CSR row pointer array of length N+1, as output by pagerank.dictToCSR
+    indices : numpy array
+        CSR column index array, as output by pagerank.dictToCSR
+    sources : iterable of int, optional
+        source vertices to accumulate dependencies from, by default all vertices
+
+    Returns
+    -------
+    numpy array
+        unnormalized sum of the pair dependencies of every vertex over the given sources,
+        see the rescale function for the normalization applied by networkx.
+        Each breadth first search expands a whole level at a time with array operations
+        on preallocated distance, path count and dependency vectors.
+    """
+    N = len(indptr) - 1
+    indptr = np.asarray(indptr, dtype=np.int64)
+    indices = np.asarray(indices, dtype=np.int64)
+    degree = np.diff(indptr)
+
+    bc = np.zeros(N)
+    dist = np.full(N, -1, dtype=np.int64)
+    sigma = np.zeros(N)
+    delta = np.zeros(N)
+
+    for s in (range(N) if sources is None else sources):
+        dist[s] = 0
+        sigma[s] = 1.0
+        frontier = np.array([s], dtype=np.int64)
+        levels = []
+        depth = 0
+
+        #forward phase - count shortest paths level by level, keeping the shortest path dag edges
+        while True:
+            counts = degree[frontier]
+            total = counts.sum()
+            if total == 0:
+                break
+            offsets = np.repeat(indptr[frontier] - np.cumsum(counts) + counts, counts) + np.arange(total)
+            src = np.repeat(frontier, counts)
+            dst = indices[offsets]
+
+            depth += 1
+            dist[dst[dist[dst] < 0]] = depth
+            dag = dist[dst] == depth
+            src, dst = src[dag], dst[dag]
+            if dst.size == 0:
+                break
+
+            frontier, inverse = np.unique(dst, return_inverse=True)
+            sigma[frontier] = np.bincount(inverse, weights=sigma[src])
+            levels.append((src, dst))
+
+        #backward phase - accumulate dependencies from the deepest level up
+        for src, dst in reversed(levels):
+            parents, inverse = np.unique(src, return_inverse=True)
+            delta[parents] += np.bincount(inverse, weights=sigma[src] / sigma[dst] * (1.0 + delta[dst]))
+
+        visited = np.concatenate([[s]] + [dst for _, dst in levels])
+        delta[s] = 0.0
+        bc[visited] += delta[visited]
+
+        dist[visited] = -1
+        sigma[visited] = 0.0
+        delta[visited] = 0.0
+
+    return bc
+
+def brandesParallel(indptr, indices, sources=None, processes=None, chunks=None):
+    """ Brandes' betweenness accumulation split by source vertex across a process pool
+    Parameters
+    ----------
+    indptr : numpy array
+        CSR row pointer array of length N+1, as output by pagerank.dictToCSR
+    indices : numpy array
+        CSR column index array, as output by pagerank.dictToCSR
+    sources : iterable of int, optional
+        source vertices to accumulate dependencies from, by default all vertices
+    processes : int, optional
+        number of worker processes, by default one per CPU. With 1 the sources are accumulated in process.
+    chunks : list of numpy arrays, optional
+        the sources of each task, by default the sources interleaved into CHUNKS_PER_PROCESS tasks per process
+
+    Returns
+    -------
+    numpy array
+        the output of the brandes function for the same sources. The CSR arrays are copied once into
+        shared memory which every worker attaches to when it starts, so tasks only carry their sources,
+        and the partial dependency vectors of the workers are summed in task order. Starting the pool
+        costs tens of milliseconds, so this pays off for organizations of a few thousand teams and up.
+    """
+    N = len(indptr) - 1
+    sources = np.arange(N) if sources is None else np.asarray(sources, dtype=np.int64)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, min(processes, len(sources)))
+    if processes == 1:
+        return brandes(indptr, indices, sources)
+
+    #interleaved chunks, so each holds a share of the costly hub sources of scale-free graphs
+    if chunks is None:
+        count = min(len(sources), processes * CHUNKS_PER_PROCESS)
+        chunks = [sources[i::count] for i in range(count)]
+
+    #imported here, as only this backend needs them
+    import multiprocessing
+    from multiprocessing import shared_memory
+
+    blocks = []
+    try:
+        for array in (indptr, indices):
+            array = np.asarray(array, dtype=np.int64)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, dtype=np.int64, buffer=block.buf)[:] = array
+        layout = [(block.name, n) for block, n in zip(blocks, (N + 1, len(indices)))]
+
+        bc = np.zeros(N)
+        with multiprocessing.Pool(processes, initializer=attachShared, initargs=(layout,)) as pool:
+            for partial in pool.imap(brandesChunk, chunks):
+                bc += partial
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return bc
+
+def attachShared(layout):
+    """ pool initializer - attaches this worker to the shared CSR arrays for all of its tasks """
+    global SHARED
+    from multiprocessing import shared_memory
+    blocks = [shared_memory.SharedMemory(name=name) for name, _ in layout]
+    arrays = [np.ndarray((n,), dtype=np.int64, buffer=block.buf) for block, (_, n) in zip(blocks, layout)]
+    SHARED = (blocks, arrays)
+
+def brandesChunk(sources):
+    """ accumulates the dependencies of one chunk of sources on the shared CSR arrays of this worker """
+    indptr, indices = SHARED[1]
+    return brandes(indptr, indices, sources)
+
+def rescale(bc, N, sources=None):
+    """ normalizes betweenness accumulated by the brandes function the same way as networkx
+    Parameters
+    ----------
+    bc : numpy array
+        unnormalized betweenness as output by the brandes function
+    N : int
+        number of vertices of the graph
+    sources : iterable of int, optional
+        sampled source vertices, when only a sample was accumulated
+
+    Returns
+    -------
+    numpy array
+        betweenness normalized by the number of (source, target) pairs that could pass through each vertex.
+        A sampled source is scaled over the other k-1 sources, or, with a single source, over that source
+        like every other vertex, which estimates its own betweenness as 0.
+    """
+    bc = np.asarray(bc, dtype=float)
+    if N <= 2:
+        return bc
+    if sources is None:
+        return bc / ((N - 1) * (N - 2))
+
+    #sampled sources cannot pass through themselves, so they are scaled over one source fewer
+    k = len(sources)
+    scale = np.full(N, 1 / (k * (N - 2)))
+    if k > 1:
+        scale[np.asarray(sources, dtype=np.int64)] = 1 / ((k - 1) * (N - 2))
+    return bc * scale
+
+def betweennessApprox(indptr, indices, k, seed=None, delta=0.05, backend=None):
+    """ Approximate Betweenness Algorithm - estimates betweenness from k sampled source vertices (pivots)
+    Parameters
+    ----------
+    indptr : numpy array
+        CSR row pointer array of length N+1, as output by pagerank.dictToCSR
+    indices : numpy array
+        CSR column index array, as output by pagerank.dictToCSR
+    k : int
+        number of pivots to sample, the result is exact when k >= N
+    seed : int, optional
+        seed for the pivot sampling, by default None
+    delta : float, optional
+        probability that any score is further than the error bound from the exact score, by default 0.05
+    backend : string, optional
+        "networkx", "native" or "parallel", by default networkx when it is installed. The native and
+        parallel backends draw the same pivots for a seed, networkx draws different ones.
+
+    Returns
+    -------
+    tuple
+        (scores, bound) where scores is a vector of estimated betweenness scores and bound is the
+        Hoeffding bound on the absolute error of every score, holding with probability 1-delta
+    """
+    N = len(indptr) - 1
+    k = min(k, N)
+    backend = selectBackend(backend)
+    if backend != "networkx":
+        sources = np.random.default_rng(seed).choice(N, size=k, replace=False)
+        accumulate = brandes if backend == "native" else brandesParallel
+        return rescale(accumulate(indptr, indices, sources), N, sources), errorBound(N, k, delta)
+
+    bc = networkx().betweenness_centrality(csrToGraph(indptr, indices), k=k, seed=seed)
+    return np.array([bc[i] for i in range(N)]), errorBound(N, k, delta)
+
+def errorBound(N, k, delta=0.05):
+    """ Hoeffding bound on the error of normalized betweenness estimated from k of N pivots
+    Parameters
+    ----------
+    N : int
+        number of vertices of the graph
+    k : int
+        number of sampled pivots
+    delta : float, optional
+        probability that the bound is exceeded by any vertex, by default 0.05
+
+    Returns
+    -------
+    float
+        bound on the absolute error of every normalized score, 0.0 when every vertex is a pivot
+    """
+    if k >= N or N <= 2:
+        return 0.0
+    #each pivot adds at most (N-2) to a score, so per pivot terms lie in [0, 1] after normalization
+    return N/(N-1) * math.sqrt(math.log(2*N/delta) / (2*k))
+
+def interior(indptr, indices):
+    """ exact test for non-zero betweenness - is a vertex ever an interior vertex of a shortest path
+    Parameters
+    ----------
+    indptr : numpy array
+        CSR row pointer array of length N+1, as output by pagerank.dictToCSR
+    indices : numpy array
+        CSR column index array, as output by pagerank.dictToCSR
+
+    Returns
+    -------
+    numpy array
+        a vector with 1.0 for each vertex whose betweenness is above zero and 0.0 otherwise.
+        Every sub-path of a shortest path is a shortest path, so vertex v is interior exactly when
+        some in-neighbour u and out-neighbour w (u != w) have no direct edge u -> w.
+    """
+    N = len(indptr) - 1
+    src = np.repeat(np.arange(N), np.diff(indptr))
+    dst = np.asarray(indices)
+    loop = src == dst
+    src, dst = src[~loop], dst[~loop]
+    keys = np.unique(src * N + dst)
+
+    order = np.argsort(dst, kind="stable")
+    in_src = src[order]
+    in_ptr = np.concatenate(([0], np.cumsum(np.bincount(dst, minlength=N))))
+    out_ptr = np.concatenate(([0], np.cumsum(np.bincount(src, minlength=N))))
+    out_dst = dst[np.argsort(src, kind="stable")]
+
+    result = np.zeros(N)
+    for v in np.flatnonzero((np.diff(in_ptr) > 0) & (np.diff(out_ptr) > 0)):
+        u = in_src[in_ptr[v]:in_ptr[v+1]]
+        w = out_dst[out_ptr[v]:out_ptr[v+1]]
+        pairs = (u[:, None] * N + w[None, :]).ravel()
+        distinct = (u[:, None] != w[None, :]).ravel()
+        pos = np.minimum(np.searchsorted(keys, pairs), len(keys) - 1)
+        if np.any(distinct & (keys[pos] != pairs)):
+            result[v] = 1.0
+
+    return result
+
+def csrToGraph(indptr, indices):
+    """ builds a networkx DiGraph from a graph in CSR form without a dense matrix
+    Parameters
+    ----------
+    indptr : numpy array
+        CSR row pointer array of length N+1
+    indices : numpy array
+        CSR column index array
+
+    Returns
+    -------
+    networkx DiGraph
+        graph with vertices 0..N-1 and one edge per CSR entry
+    """
+    N = len(indptr) - 1
+    G = networkx().DiGraph()
+    G.add_nodes_from(range(N))
+    G.add_edges_from(zip(np.repeat(np.arange(N), np.diff(indptr)).tolist(), np.asarray(indices).tolist()))
+    return G
+
 def classify(v):
     """ classify for computed Betweenness scores
     Parameters
@@ -39,11 +398,19 @@ def classify(v):
         low = equals zero
 
     """
-    c = np.copy(v)
-    for i in range(0,len(v)):
-        if v[i] > 0:
-            c[i] = 1
-        else:
-            c[i] = 0
+    return classifyBatch(v)
+
+def classifyBatch(V):
+    """ classify for many vectors of computed Betweenness scores at once
+    Parameters
+    ----------
+    V : numpy array
+        matrix with one vector of computed scores per row, e.g. one row per scenario
+
+    Returns
+    -------
+    numpy array
+        equivalent matrix with scores classified high or low (0 or 1), as the classify function does for a single vector
 
-    return c.astype(int)
+    """
+    return (np.asarray(V) > 0).astype(int)
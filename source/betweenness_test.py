@@ -6,6 +6,7 @@
 import unittest
 import numpy as np
 import betweenness as bt
+import pagerank as pr
 
 class TestBetweenness(unittest.TestCase):
 
@@ -34,6 +35,131 @@ class TestBetweenness(unittest.TestCase):
         expected = np.array([0, 0, 0.03333333, 0, 0, 0.05, 0.01666667])
         assert np.allclose(v, expected)
 
+    def test_whenGivenLargerExampleTeamToplogyThenInteriorVerticesAreAsExpected(self):
+        TT = np.array([[0, 0, 1, 0, 1, 1, 0],
+                       [0, 0, 1, 1, 1, 1, 0],
+                       [0, 0, 0, 0, 0, 1, 1],
+                       [0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 1, 0, 1],
+                       [0, 0, 0, 0, 1, 0, 0]])
+
+        v = bt.interior(*pr.arrayToCSR(TT))
+
+        expected = np.array([0, 0, 1, 0, 0, 1, 1])
+        assert np.array_equal(v, expected)
+
+    def test_whenGivenRandomGraphsThenInteriorVerticesAreThoseWithBetweennessAboveZero(self):
+        rng = np.random.default_rng(3)
+
+        for n in range(1, 12):
+            TT = (rng.random((n, n)) < 0.3).astype(int)
+
+            v = bt.interior(*pr.arrayToCSR(TT))
+
+            assert np.array_equal(v, (bt.betweenness(TT) > 0).astype(float))
+
+    def test_whenSamplingEveryPivotThenApproxBetweennessIsExact(self):
+        TT = np.array([[0, 0, 1, 0, 1, 1, 0],
+                       [0, 0, 1, 1, 1, 1, 0],
+                       [0, 0, 0, 0, 0, 1, 1],
+                       [0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 1, 0, 1],
+                       [0, 0, 0, 0, 1, 0, 0]])
+
+        v, bound = bt.betweennessApprox(*pr.arrayToCSR(TT), k=7, seed=1)
+
+        expected = np.array([0, 0, 0.03333333, 0, 0, 0.05, 0.01666667])
+        assert np.allclose(v, expected)
+        assert bound == 0.0
+
+    def test_whenSamplingOnePivotThenScoresAreFinite(self):
+        TT = np.array([[0, 0, 1, 0, 1, 1, 0],
+                       [0, 0, 1, 1, 1, 1, 0],
+                       [0, 0, 0, 0, 0, 1, 1],
+                       [0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 1, 0, 1],
+                       [0, 0, 0, 0, 1, 0, 0]])
+        indptr, indices = pr.arrayToCSR(TT)
+
+        for seed in range(7):
+            v, bound = bt.betweennessApprox(indptr, indices, k=1, seed=seed, backend="native")
+            source = np.random.default_rng(seed).choice(7, size=1, replace=False)
+
+            assert np.all(np.isfinite(v)) and v[source[0]] == 0
+            assert np.allclose(v, bt.brandes(indptr, indices, source) / 5)
+            assert bound == bt.errorBound(7, 1)
+
+    def test_whenSamplingFewerPivotsThenErrorBoundShrinksWithSamples(self):
+        assert bt.errorBound(1000, 1000) == 0.0
+        assert 0 < bt.errorBound(1000, 400) < bt.errorBound(1000, 100)
+
+    def test_whenGivenLargerExampleTeamToplogyThenNativeBetweennessIsAsExpected(self):
+        TT = np.array([[0, 0, 1, 0, 1, 1, 0],
+                       [0, 0, 1, 1, 1, 1, 0],
+                       [0, 0, 0, 0, 0, 1, 1],
+                       [0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 1, 0, 1],
+                       [0, 0, 0, 0, 1, 0, 0]])
+
+        v = bt.betweenness(TT, backend="native")
+
+        expected = np.array([0, 0, 0.03333333, 0, 0, 0.05, 0.01666667])
+        assert np.allclose(v, expected)
+
+    def test_whenGivenRandomGraphsThenNativeBetweennessMatchesNetworkx(self):
+        rng = np.random.default_rng(11)
+
+        for n in range(1, 25):
+            TT = (rng.random((n, n)) < 0.2).astype(int)
+            indptr, indices = pr.arrayToCSR(TT)
+
+            v = bt.betweennessCSR(indptr, indices, backend="native")
+
+            assert np.allclose(v, bt.betweennessCSR(indptr, indices, backend="networkx"))
+
+    def test_whenSamplingEveryPivotThenNativeApproxBetweennessIsExact(self):
+        TT = np.array([[0,1,1,1],
+                       [0,0,0,0],
+                       [0,1,0,1],
+                       [0,1,1,0]])
+        indptr, indices = pr.arrayToCSR(TT)
+
+        v, bound = bt.betweennessApprox(indptr, indices, k=4, seed=5, backend="native")
+
+        assert np.allclose(v, bt.betweenness(TT))
+        assert bound == 0.0
+
+    def test_whenSplitAcrossProcessesThenBetweennessMatchesNative(self):
+        rng = np.random.default_rng(12)
+        TT = (rng.random((60, 60)) < 0.05).astype(int)
+        indptr, indices = pr.arrayToCSR(TT)
+
+        for processes in (1, 2, 3):
+            v = bt.brandesParallel(indptr, indices, processes=processes)
+            assert np.allclose(v, bt.brandes(indptr, indices))
+
+        sources = [3, 17, 42]
+        assert np.allclose(bt.brandesParallel(indptr, indices, sources, processes=2), bt.brandes(indptr, indices, sources))
+        assert np.allclose(bt.betweenness(TT, backend="parallel"), bt.betweenness(TT, backend="native"))
+
+    def test_whenSamplingWithParallelBackendThenSamePivotsAsNativeAreUsed(self):
+        rng = np.random.default_rng(13)
+        indptr, indices = pr.arrayToCSR((rng.random((40, 40)) < 0.08).astype(int))
+
+        v, bound = bt.betweennessApprox(indptr, indices, k=10, seed=3, backend="parallel")
+        w, _ = bt.betweennessApprox(indptr, indices, k=10, seed=3, backend="native")
+
+        assert np.allclose(v, w)
+        assert bound > 0
+
+    def test_whenGivenUnknownBackendThenError(self):
+        with self.assertRaises(ValueError):
+            bt.betweenness(np.zeros((2, 2)), backend="igraph")
+
     def test_whenGivenGenericTeamToplogyClassifyIsAsExpected(self):
         v = np.array([0, 0, 0, 0])
 
@@ -50,5 +176,15 @@ class TestBetweenness(unittest.TestCase):
         expected = np.array([0,0,1,0,0,1,1])
         assert np.array_equal(hilo, expected)
 
+    def test_whenGivenManyScoreVectorsThenBatchClassifyIsAsExpected(self):
+        V = np.array([[0, 0, 0.03333333, 0, 0, 0.05, 0.01666667],
+                      [0, 0, 0, 0, 0, 0, 0]])
+
+        hilo = bt.classifyBatch(V)
+
+        expected = np.array([[0,0,1,0,0,1,1],
+                             [0,0,0,0,0,0,0]])
+        assert np.array_equal(hilo, expected)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
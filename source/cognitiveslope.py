@@ -5,15 +5,31 @@
 
 import numpy as np
 import pagerank as pr
+import components as cc
 import flowratio as fr
+import analysiscache as ac
+import instrumentation as im
 import math
 
-def findCognitiveSlope(teamflow, sum=False, flow=False, imp=False, need=False, energy=True, resilience=False):
+#interaction mode codes used by the edge-list engine, code 0 is an unrecognised interaction
+MODES = {"F": 1, "C": 2, "X": 3}
+WEIGHTS = np.array([0.0, 0.25, 0.5, 0.75])
+
+def findCognitiveSlope(teamflow, sum=False, flow=False, imp=False, need=False, energy=True, resilience=False, sparse=False, cache=None, pagerankMethod="iteration"):
     """ Computes the cognitive slope for each node of a given graph.
     Parameters
     ----------
     teamflow : dictionary
         dependency relationship dictionaly in the form: {"A":[("B","C"),("C","F")],"B":[("C","X")],"C":[]}
+        or a TeamFlowGraph (see the teamflowgraph and edgelist modules), which is always analysed sparse
+    sparse: boolean
+        use the O(N+E) edge-list engine and sparse page rank instead of dense N x N matrices
+    cache: AnalysisCache
+        reuse the matrices and page rank of earlier calls on the same team flow (see the analysiscache module)
+    pagerankMethod: "iteration" or "components"
+        iteration is the pagerank iteration of the default output, components solves page rank separately for each
+        weakly connected component as in teamtopology.findTopology, implies sparse. The component ranks differ from
+        the iteration ranks, and so do the impediments and all values derived from them
 
     Returns
     -------
@@ -21,17 +37,79 @@ def findCognitiveSlope(teamflow, sum=False, flow=False, imp=False, need=False, e
         dictionary containing congnitive slope value for each team
     """  
 
-    t = dictToArrayTwoSided(teamflow)
-    p = pr.pagerank(dictToArray(teamflow, adjMatrix=True), 100, 0.8, normalize=True)
+    if pagerankMethod not in ("iteration", "components"):
+        raise ValueError("pagerankMethod must be one of: iteration or components")
 
-    names = list(teamflow.keys())
-    result = {}
+    if isinstance(teamflow, dict):
+        names = list(teamflow.keys())
+    else:
+        names = teamflow.names
+        sparse = True
+    sparse = sparse or pagerankMethod == "components"
+
+    #with a cache, matrices and page rank are looked up by team flow content and solver parameters
+    h = cache.key(teamflow) if cache is not None else None
+
+    #stages are timed when instrumentation is enabled (see the instrumentation module)
+    if sparse:
+        with im.stage("matrix"):
+            if isinstance(teamflow, dict):
+                src, dst, mode = ac.memoize(cache, (h, "edges"), lambda: dictToEdges(teamflow))
+                indptr, indices = ac.memoize(cache, (h, "edges", "csr"), lambda: pr.edgesToCSR(src, dst, len(names)))
+            else:
+                src, dst, mode = teamflow.src, teamflow.dst, teamflow.mode
+                indptr, indices = teamflow.toCSR()
+            im.matrix("edges", len(names), len(src), src, dst, mode)
+            im.matrix("csr", len(names), len(indices), indptr, indices)
+        with im.stage("pagerank"):
+            if pagerankMethod == "components":
+                labels = ac.memoize(cache, (h, "components"), lambda: cc.weakComponents(indptr, indices))
+                p = ac.memoize(cache, (h, "pagerank", "components", 0.8), lambda: cc.pagerankSolve(indptr, indices, labels, d=0.8, normalize=True))
+            else:
+                p = ac.memoize(cache, (h, "pagerank", "edges", 0.8), lambda: pr.pagerankSparse(indptr, indices, 100, 0.8, normalize=True))
+        with im.stage("cognitive slope"):
+            slopesSum, nonZeroCount = edgeSlopes(src, dst, mode, len(names))
+    else:
+        with im.stage("matrix"):
+            t = ac.memoize(cache, (h, "slopes"), lambda: dictToArrayTwoSided(teamflow))
+            adjacency = ac.memoize(cache, (h, "adjacency", "slopes"), lambda: dictToArray(teamflow, adjMatrix=True))
+            im.matrix("two sided", len(names), None, t)
+            im.matrix("dense", len(names), None, adjacency)
+        with im.stage("pagerank"):
+            p = ac.memoize(cache, (h, "pagerank", "slopes", 0.8), lambda: pr.pagerank(adjacency, 100, 0.8, normalize=True))
+        with im.stage("cognitive slope"):
+            #slopesAve = np.average(t, axis=0)
+            slopesSum = np.sum(t, axis=0)
+            nonZeroCount = np.count_nonzero(t, axis=0)
+
+    with im.stage("output"):
+        return slopeResult(names, p, slopesSum, nonZeroCount, sum, flow, imp, need, energy, resilience)
 
-    #slopesAve = np.average(t, axis=0)
-    slopesSum = np.sum(t, axis=0)
-    nonZeroCount = np.count_nonzero(t, axis=0)
+
+def slopeResult(names, p, slopesSum, nonZeroCount, sum=False, flow=False, imp=False, need=False, energy=True, resilience=False):
+    """ Builds the findCognitiveSlope output from page ranks and cognitive slope column statistics.
+    Parameters
+    ----------
+    names : list
+        team names in matrix order
+    p : numpy array
+        normalized page rank of each team, used as impediments
+    slopesSum, nonZeroCount : numpy arrays
+        column sums and non-zero counts of the two sided cognitive slope matrix
+
+    Returns
+    -------
+    dictionary
+        dictionary containing congnitive slope value for each team
+    """
+    result = {}
     slopesAve = slopesSum / nonZeroCount
 
+    if resilience == True:
+        #resilience for every team in a single closed form call (flowRatio = 0.1), flowratio.computeResilience is the reference
+        with im.stage("resilience"):
+            resiliences = fr.computeResilienceArray(bad=1, good=10, batchSize=1, imps=p, energy=slopesAve).tolist()
+
     for x in range(0,len(names)):
 
       #Uses the FINE flow circle equations
@@ -41,7 +119,6 @@ def findCognitiveSlope(teamflow, sum=False, flow=False, imp=False, need=False, e
         i = p[x] #impedements (page rank)
         f = math.sqrt(e/i) #flow
         n = math.sqrt(e*i) #need
-        r = fr.computeResilience(bad=1, good=10, batchSize=1, imps=i, energy=e) #resilience (flowRatio = 0.1)
 
         tout = list()
         if flow == True:
@@ -55,7 +132,7 @@ def findCognitiveSlope(teamflow, sum=False, flow=False, imp=False, need=False, e
         if sum == True:
           tout.append(round(s, 4))
         if resilience == True:
-          tout.append(r)
+          tout.append(resiliences[x])
 
         result[names[x]] = tout
 
@@ -144,3 +221,67 @@ def dictToArrayTwoSided(d):
   
 
 
+def dictToEdges(d):
+  """ converts a dictionary to an edge list with interaction mode codes
+  Parameters
+  ----------
+  d : dictionary
+      dependency relationship dictionaly in the form: {"A":[("B","C"),("C","F")],"B":[("C","X")],"C":[]}
+      plain team names, as used by teamtopology, are read as dependencies with no interaction
+
+  Returns
+  -------
+  tuple
+      (src, dst, mode) numpy arrays with one entry per distinct (team, dependency) pair. As in
+      dictToArray, the last recognised interaction listed for a pair wins and pairs naming
+      unknown teams are dropped. Mode codes index the WEIGHTS lookup table.
+  """
+  index = {k: i for i, k in enumerate(d.keys())}
+  src = []
+  dst = []
+  mode = []
+
+  for row, row_vals in enumerate(d.values()):
+    modes = {}
+    for pair in row_vals:
+      team, m = (pair[0], MODES.get(pair[1], 0)) if isinstance(pair, (tuple, list)) else (pair, 0)
+      col = index.get(team)
+      if col is None:
+        continue
+      if m or col not in modes:
+        modes[col] = m
+
+    src.extend([row] * len(modes))
+    dst.extend(modes.keys())
+    mode.extend(modes.values())
+
+  return np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64), np.array(mode, dtype=np.uint8)
+
+
+def edgeSlopes(src, dst, mode, N):
+  """ computes the column sums and non-zero counts of the two sided cognitive slope matrix from an edge list
+  Parameters
+  ----------
+  src, dst, mode : numpy arrays
+      edge list as output by the dictToEdges function
+  N : int
+      number of teams
+
+  Returns
+  -------
+  tuple
+      (slopesSum, nonZeroCount) numpy arrays equal to the column sums and column non-zero counts
+      of dictToArrayTwoSided, computed in O(N+E) without building the matrix
+  """
+  w = WEIGHTS[mode]
+  keep = (src != dst) & (w > 0.0)
+  src, dst, w = src[keep].astype(np.int64), dst[keep].astype(np.int64), w[keep]
+
+  #each edge adds its weight to the dependency column and the remainder to the dependent column
+  slopesSum = 1.0 + np.bincount(dst, weights=w, minlength=N) + np.bincount(src, weights=1.0 - w, minlength=N)
+
+  #a neighbour linked in both directions fills a single cell of the column
+  reciprocal = np.isin(src * N + dst, dst * N + src)
+  nonZeroCount = 1 + np.bincount(dst, minlength=N) + np.bincount(src, minlength=N) - np.bincount(src[reciprocal], minlength=N)
+
+  return slopesSum, nonZeroCount
@@ -135,5 +135,54 @@ class TestCognitiveSlope(unittest.TestCase):
 
         assert ttopology == expected
 
+    def test_whenGivenExampleFlowAndInteractionsThenSparseValuesMatchDenseValues(self):
+
+        dense = cs.findCognitiveSlope(self.exampleTeamFlow, flow=True, imp=True, need=True, energy=True, sum=True, resilience=True)
+        ttopology = cs.findCognitiveSlope(self.exampleTeamFlow, flow=True, imp=True, need=True, energy=True, sum=True, resilience=True, sparse=True)
+
+        if ttopology != dense:
+            print('\nUnexpected result! \nExpected:', dense, '\nInstead :', ttopology)
+
+        assert ttopology == dense
+
+
+    def test_whenGivenGenericTeamFlowAndInteractionsThenEdgeListIsAsExpected(self):
+
+        src, dst, mode = cs.dictToEdges(self.genericTeamFlowAndInteractions)
+
+        assert np.array_equal(src, np.array([0, 0, 0, 2, 2, 3]))
+        assert np.array_equal(dst, np.array([1, 2, 3, 1, 3, 1]))
+        assert np.array_equal(cs.WEIGHTS[mode], np.array([0.25, 0.5, 0.75, 0.25, 0.75, 0.25]))
+
+
+    def test_whenGivenIntegerTeamNamesThenSparseValuesMatchDenseValues(self):
+
+        teamflow = {1: [(2, 'F'), (3, 'C'), (4, 'X')],
+                    2: [],
+                    3: [(2, 'F'), (4, 'X')],
+                    4: [(2, 'F')]
+        }
+
+        src, dst, mode = cs.dictToEdges(teamflow)
+        assert np.array_equal(src, np.array([0, 0, 0, 2, 2, 3]))
+        assert np.array_equal(dst, np.array([1, 2, 3, 1, 3, 1]))
+
+        dense = cs.findCognitiveSlope(teamflow, flow=True, imp=True, need=True, energy=True, sum=True, resilience=True)
+        assert cs.findCognitiveSlope(teamflow, flow=True, imp=True, need=True, energy=True, sum=True, resilience=True, sparse=True) == dense
+
+
+    def test_whenGivenReciprocalAndRepeatedInteractionsThenEdgeSlopesMatchTwoSidedArray(self):
+
+        teamflow = {'T1': [('T2', 'X'), ('T3', 'F'), ('T2', 'C'), ('T1', 'X')],
+                    'T2': [('T1', 'F'), ('T4', '?')],
+                    'T3': [('T2', 'X'), ('Unknown', 'C')],
+                    'T4': [('T3', 'Q'), ('T3', 'C'), ('T1', 'F')]}
+
+        t = cs.dictToArrayTwoSided(teamflow)
+        slopesSum, nonZeroCount = cs.edgeSlopes(*cs.dictToEdges(teamflow), len(teamflow))
+
+        assert np.allclose(slopesSum, np.sum(t, axis=0))
+        assert np.array_equal(nonZeroCount, np.count_nonzero(t, axis=0))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
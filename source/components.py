@@ -0,0 +1,203 @@
+# components.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import numpy as np
+import betweenness as bt
+import instrumentation as im
+
+#estimated betweenness cost, in vertices and edges searched, below which the parallel backend runs in process
+PARALLEL_COST = 10**6
+
+#relative change at which the page rank of a component is solved, checked every CHECK_EVERY iterations
+TOL = 1e-12
+CHECK_EVERY = 4
+
+def weakComponents(indptr, indices):
+    """ Weakly Connected Components - the value streams of an organization, teams linked by dependencies in either direction
+    Parameters
+    ----------
+    indptr : numpy array
+        CSR row pointer array of length N+1, as output by pagerank.dictToCSR
+    indices : numpy array
+        CSR column index array, as output by pagerank.dictToCSR
+
+    Returns
+    -------
+    numpy array
+        component label of each team, from 0, numbered in order of the first team of each component.
+        Labels are found by array-wide hooking of each edge to its smaller label followed by pointer
+        jumping, which takes a few passes over the edges rather than one per step of the longest path.
+    """
+    N = len(indptr) - 1
+    src = np.repeat(np.arange(N), np.diff(indptr))
+    dst = np.asarray(indices, dtype=np.int64)
+    labels = np.arange(N)
+
+    while True:
+        lu, lv = labels[src], labels[dst]
+        differ = lu != lv
+        if not differ.any():
+            break
+        #hook the root of the larger label under the smaller one, then point every team at its root
+        lu, lv = lu[differ], lv[differ]
+        np.minimum.at(labels, np.maximum(lu, lv), np.minimum(lu, lv))
+        while True:
+            roots = labels[labels]
+            if np.array_equal(roots, labels):
+                break
+            labels = roots
+
+    return np.unique(labels, return_inverse=True)[1].reshape(-1)
+
+
+def pagerankSolve(indptr, indices, labels, d=0.85, tol=TOL, num_iterations=1000, normalize=False):
+    """ PageRank Solver - pagerank.pagerankSolve solved separately for each weakly connected component
+    Parameters
+    ----------
+    indptr : numpy array
+        CSR row pointer array of length N+1, as output by pagerank.dictToCSR
+    indices : numpy array
+        CSR column index array, as output by pagerank.dictToCSR
+    labels : numpy array
+        component of each team, as output by the weakComponents function
+    d : float, optional
+        damping factor, by default 0.85
+    tol : float, optional
+        relative L1 change at which each component is solved, by default TOL
+    num_iterations : int, optional
+        maximum number of iterations, by default 1000
+    normalize : bool, optional
+        normalize the output vector to unit length, by default False
+
+    Returns
+    -------
+    numpy array
+        the ranks of pagerank.pagerankSolve(indptr, indices, d) with dangling rank redistributed, a
+        probability distribution. Ranks are split over each team's dependencies and the rank of teams
+        without dependencies is spread over all teams, so the ranks are x = z / sum(z) where
+        z = (I - d P^T)^-1 1 and P is the transition matrix. P has one block per component, so each
+        component solves its own z_c = 1 + d P_c^T z_c and stops once it has converged, a component without
+        cycles after as many iterations as its longest dependency chain, and only the normalization by the
+        sum over all components is global. The ranks of the pagerank function, used by the analyses by default,
+        do not split this way: its teleport is scaled by the ranks of all teams and it stops on the change of
+        all ranks at once, so this solver is only used by the "components" pagerankMethod of findTopology and
+        findCognitiveSlope, whose ranks differ from the default ranks.
+    """
+    N = len(indptr) - 1
+    degree = np.diff(indptr)
+    share = np.divide(d, degree, out=np.zeros(N), where=degree > 0)
+    z = np.ones(N)
+
+    #teams, edges and components still iterating, in local ids of the teams still iterating
+    nodes = np.arange(N)
+    rows = np.repeat(nodes, degree)
+    cols = np.asarray(indices, dtype=np.int64)
+    weights = share[rows]
+    comp = np.asarray(labels, dtype=np.int64)
+    C = int(comp.max()) + 1 if N else 0
+    x = z.copy()
+    iterations = 0
+    residual = 0.0
+
+    while len(nodes) and iterations < num_iterations:
+        current = 1.0 + np.bincount(cols, weights=weights * x[rows], minlength=len(nodes))
+        iterations += 1
+        if iterations % CHECK_EVERY and iterations < num_iterations:
+            x = current
+            continue
+
+        change = np.bincount(comp, weights=np.abs(current - x), minlength=C) / np.bincount(comp, weights=current, minlength=C)
+        x = current
+        residual = float(np.max(change, initial=0.0))
+        if residual <= tol:
+            break
+
+        #drop the solved components once they are a quarter of the teams still iterating, renumbering the
+        #remaining teams, edges and components - until then they keep iterating at their solution
+        keep = change[comp] > tol
+        if np.count_nonzero(keep) > 0.75 * len(nodes):
+            continue
+        z[nodes] = x
+        local = np.cumsum(keep) - 1
+        edges = keep[rows]
+        nodes, comp, x = nodes[keep], comp[keep], x[keep]
+        rows, cols, weights = local[rows[edges]], local[cols[edges]], weights[edges]
+        comp = np.unique(comp, return_inverse=True)[1].reshape(-1)
+        C = int(comp.max()) + 1 if len(comp) else 0
+
+    z[nodes] = x
+    im.record("pagerank", {'method': "components", 'teams': N, 'iterations': iterations, 'residual': residual})
+
+    v = z / np.sum(z) if N else z
+    if normalize and N:
+        v = v / np.linalg.norm(v)
+    return v
+
+
+def betweenness(indptr, indices, labels, sources=None, backend=None, processes=None):
+    """ Betweenness Algorithm - Brandes' accumulation split by weakly connected component
+    Parameters
+    ----------
+    indptr : numpy array
+        CSR row pointer array of length N+1, as output by pagerank.dictToCSR
+    indices : numpy array
+        CSR column index array, as output by pagerank.dictToCSR
+    labels : numpy array
+        component of each team, as output by the weakComponents function
+    sources : numpy array, optional
+        sampled source vertices (see the betweennessApprox function), by default all vertices
+    backend : string, optional
+        "native" to accumulate in process or "parallel" to spread the components across a process pool,
+        by default native
+    processes : int, optional
+        number of worker processes of the parallel backend, by default one per CPU
+
+    Returns
+    -------
+    numpy array
+        a vector of betweenness scores for each vertex, equal to those of the betweenness.betweennessCSR
+        function with the native backend. Shortest paths never leave a component, so the searches from the
+        sources of each component only cover that component, and sources in components of one or two
+        teams, or without dependencies, are skipped as they add nothing. The parallel backend orders the
+        sources by component and cuts them into tasks of equal estimated cost, so small components are
+        batched whole and a component larger than a task is split by source, and it only starts a pool
+        when the estimated cost is above PARALLEL_COST.
+    """
+    if backend not in (None, "native", "parallel"):
+        raise ValueError("components mode accumulates betweenness natively, backend must be one of: native or parallel")
+
+    N = len(indptr) - 1
+    labels = np.asarray(labels, dtype=np.int64)
+    degree = np.diff(indptr)
+    candidates = np.arange(N) if sources is None else np.asarray(sources, dtype=np.int64)
+
+    #teams and edges searched from a source of each component
+    size = np.bincount(labels, minlength=1)
+    edges = np.bincount(labels, weights=degree, minlength=1)
+    active = candidates[(size[labels[candidates]] > 2) & (degree[candidates] > 0)]
+
+    cost = size[labels[active]] + edges[labels[active]]
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if backend != "parallel" or processes == 1 or cost.sum() < PARALLEL_COST:
+        bc = bt.brandes(indptr, indices, active)
+    else:
+        order = np.argsort(labels[active], kind="stable")
+        active, cost = active[order], cost[order]
+        count = min(len(active), processes * bt.CHUNKS_PER_PROCESS)
+        cuts = np.searchsorted(np.cumsum(cost), np.arange(1, count) * cost.sum() / count)
+        chunks = [chunk for chunk in np.split(active, cuts) if len(chunk)]
+        bc = bt.brandesParallel(indptr, indices, active, processes, chunks)
+
+    return bt.rescale(bc, N, None if sources is None else candidates)
+
+
+def betweennessApprox(indptr, indices, labels, k, seed=None, backend=None, processes=None):
+    """ Approximate Betweenness Algorithm - betweenness.betweennessApprox with the native backend, split by weakly connected component
+    Returns the estimated scores alone, drawn from the same pivots as betweenness.betweennessApprox for the seed """
+    N = len(indptr) - 1
+    sources = np.random.default_rng(seed).choice(N, size=min(k, N), replace=False)
+    return betweenness(indptr, indices, labels, sources, backend, processes)
@@ -0,0 +1,124 @@
+# components_test.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import unittest
+import numpy as np
+import components as cc
+import pagerank as pr
+import betweenness as bt
+import teamtopology as tt
+import cognitiveslope as cs
+
+class TestComponents(unittest.TestCase):
+
+    def setUp(self):
+
+        #Team flow for Bakers Unlimited Example
+        self.BU_TeamFlow = {'StoreRO':  ['CRM', 'QE', 'DataEC'],
+                            'OnlineRO': ['CRM', 'UX', 'QE', 'DataEC'],
+                            'CRM':      ['DataEC', 'CloudES'],
+                            'UX':       [],
+                            'QE':       [],
+                            'DataEC':   ['QE', 'CloudES'],
+                            'CloudES':  ['QE']
+        }
+
+        #Team flow for Bakers Unlimited Example with interactions
+        self.BU_TeamFlowWithInteractions = {'StoreRO':  [('CRM', 'C'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'OnlineRO': [('CRM', 'C'), ('UX', 'F'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'CRM':      [('DataEC', 'X'), ('CloudES', 'X')],
+                                            'UX':       [],
+                                            'QE':       [],
+                                            'DataEC':   [('QE', 'F'), ('CloudES', 'X')],
+                                            'CloudES':  [('QE', 'F')]
+        }
+
+    def test_whenGivenSeparateValueStreamsThenComponentsAreFound(self):
+        TT = np.array([[0, 1, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 0, 0],
+                       [0, 0, 1, 0, 0, 0],
+                       [0, 0, 0, 1, 0, 0],
+                       [0, 0, 0, 0, 0, 0]])
+
+        labels = cc.weakComponents(*pr.arrayToCSR(TT))
+
+        assert labels.tolist() == [0, 0, 1, 1, 1, 2]
+
+    def test_whenGivenRandomGraphsThenComponentCentralitiesMatchWholeGraph(self):
+        rng = np.random.default_rng(17)
+
+        for n in range(1, 40):
+            TT = (rng.random((n, n)) < 0.06).astype(int)
+            indptr, indices = pr.arrayToCSR(TT)
+            labels = cc.weakComponents(indptr, indices)
+
+            #every dependency links two teams of the same component
+            assert all(labels[i] == labels[j] for i, j in zip(*np.nonzero(TT)))
+
+            v = cc.pagerankSolve(indptr, indices, labels, d=0.8, normalize=True)
+            w, _ = pr.pagerankSolve(indptr, indices, d=0.8, tol=1e-14, num_iterations=1000, normalize=True)
+            assert np.allclose(v, w, atol=1e-10)
+
+            assert np.array_equal(cc.betweenness(indptr, indices, labels), bt.betweennessCSR(indptr, indices, "native"))
+            approx = cc.betweennessApprox(indptr, indices, labels, k=max(1, n // 2), seed=n)
+            assert np.allclose(approx, bt.betweennessApprox(indptr, indices, max(1, n // 2), seed=n, backend="native")[0], equal_nan=True)
+
+    def test_whenSplitAcrossProcessesThenComponentBetweennessIsUnchanged(self):
+        rng = np.random.default_rng(18)
+        indptr, indices = pr.arrayToCSR((rng.random((120, 120)) < 0.012).astype(int))
+        labels = cc.weakComponents(indptr, indices)
+
+        default = cc.PARALLEL_COST
+        cc.PARALLEL_COST = 0
+        try:
+            v = cc.betweenness(indptr, indices, labels, backend="parallel", processes=2)
+        finally:
+            cc.PARALLEL_COST = default
+
+        assert np.allclose(v, bt.betweennessCSR(indptr, indices, "native"))
+        with self.assertRaises(ValueError):
+            cc.betweenness(indptr, indices, labels, backend="networkx")
+
+    def test_whenAnalysingByComponentThenOutputEqualsDefaultOutput(self):
+        #Bakers Unlimited, and two copies of it as two value streams
+        twice = dict(self.BU_TeamFlowWithInteractions, **{f"{k}2": [(f"{d}2", m) for d, m in v] for k, v in self.BU_TeamFlowWithInteractions.items()})
+
+        for teamflow in (self.BU_TeamFlowWithInteractions, twice):
+            plain = {team: [dependency for dependency, _ in row] for team, row in teamflow.items()}
+            assert tt.findTopology(plain, True, True, components=True) == tt.findTopology(plain, True, True)
+
+    def test_whenGivenRandomOrganizationsOfManyValueStreamsThenOutputEqualsDefaultOutput(self):
+        rng = np.random.default_rng(19)
+
+        for _ in range(40):
+            teamflow = {}
+            for stream in range(rng.integers(1, 6)):
+                names = [f"{stream}/T{i}" for i in range(rng.integers(1, 15))]
+                for name in names:
+                    teamflow[name] = [(names[j], rng.choice(["X", "C", "F"])) for j in rng.integers(0, len(names), rng.integers(0, 4))]
+            plain = {team: [dependency for dependency, _ in row] for team, row in teamflow.items()}
+
+            assert tt.findTopology(plain, True, True, components=True) == tt.findTopology(plain, True, True)
+
+    def test_whenSolvingPageRankByComponentThenRanksAreTheComponentRanks(self):
+        twice = dict(self.BU_TeamFlowWithInteractions, **{f"{k}2": [(f"{d}2", m) for d, m in v] for k, v in self.BU_TeamFlowWithInteractions.items()})
+        plain = {team: [dependency for dependency, _ in row] for team, row in twice.items()}
+        indptr, indices = pr.dictToCSR(plain)
+        ranks = np.round(cc.pagerankSolve(indptr, indices, cc.weakComponents(indptr, indices), d=0.8, normalize=True), 4).tolist()
+
+        topology = tt.findTopology(plain, centralities=True, pagerankMethod="components")
+        assert [row[1] for row in topology.values()] == ranks
+        assert [row[0] for row in topology.values()] == [row[0] for row in tt.findTopology(plain, centralities=True).values()]
+        assert [row[0] for row in cs.findCognitiveSlope(twice, imp=True, energy=False, pagerankMethod="components").values()] == ranks
+
+    def test_whenGivenUnknownPageRankMethodThenValueErrorIsRaised(self):
+        with self.assertRaises(ValueError):
+            tt.findTopology(self.BU_TeamFlow, pagerankMethod="power")
+        with self.assertRaises(ValueError):
+            cs.findCognitiveSlope(self.BU_TeamFlowWithInteractions, pagerankMethod="power")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+# edgelist.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import csv
+import json
+import operator
+import itertools
+import numpy as np
+import cognitiveslope as cs
+import teamflowgraph as tfg
+
+#number of lines parsed and interned per chunk
+CHUNK_SIZE = 200000
+
+def loadCSV(path, chunkSize=CHUNK_SIZE, header=True, delimiter=","):
+    """ Streams a team,depends_on,mode edge list CSV file into a TeamFlowGraph
+    Parameters
+    ----------
+    path : string
+        file to read, one dependency per line in the form: team,depends_on,mode
+
+            OnlineRO,QE,X
+            OnlineRO,Payments,C
+            Payments,,
+
+        the mode column is optional, and a line with an empty depends_on only declares a team
+    chunkSize : int, optional
+        number of lines parsed at a time, by default CHUNK_SIZE
+    header : True/False
+        skip the first line of the file
+    delimiter : string, optional
+        column delimiter, by default ","
+
+    Returns
+    -------
+    TeamFlowGraph
+        graph of the team flow as output by loadEdges
+    """
+    with open(path, newline="") as file:
+        if header:
+            next(file, None)
+        return internChunks(csvChunks(file, chunkSize, delimiter))
+
+
+def csvChunks(file, chunkSize, delimiter):
+    """ yields the (teams, dependencies, modes) columns of a CSV file, chunkSize lines at a time """
+    while True:
+        lines = list(itertools.islice(file, chunkSize))
+        if not lines:
+            return
+
+        #chunks where every line has three plain columns are split in one call, anything else (quotes, spaces
+        #after the delimiter, blank lines, any line with missing or extra columns) is parsed by the csv module
+        text = "".join(lines)
+        if '"' not in text and delimiter + " " not in text:
+            rows = text.splitlines()
+            if set(map(operator.methodcaller("count", delimiter), rows)) == {2}:
+                fields = delimiter.join(rows).split(delimiter)
+                yield fields[0::3], fields[1::3], fields[2::3]
+                continue
+
+        yield columns(csv.reader(lines, delimiter=delimiter, skipinitialspace=True))
+
+
+def loadJSONL(path, chunkSize=CHUNK_SIZE):
+    """ Streams a JSON lines edge list file into a TeamFlowGraph
+    Parameters
+    ----------
+    path : string
+        file to read, one dependency per line in the form: {"team": "OnlineRO", "depends_on": "QE", "mode": "X"}
+        the mode key is optional, and a line without depends_on only declares a team
+    chunkSize : int, optional
+        number of lines parsed at a time, by default CHUNK_SIZE
+
+    Returns
+    -------
+    TeamFlowGraph
+        graph of the team flow as output by loadEdges
+    """
+    with open(path) as file:
+        records = (json.loads(line) for line in file if line.strip())
+        rows = ((r["team"], r.get("depends_on"), r.get("mode")) for r in records)
+        #a missing or null depends_on only declares the team, other values, such as a team id of 0, are teams
+        return loadEdges(((team, "" if dependency is None else dependency, "" if mode is None else mode) for team, dependency, mode in rows), chunkSize)
+
+
+def loadEdges(rows, chunkSize=CHUNK_SIZE):
+    """ Interns an iterable of (team, depends_on, mode) rows into a TeamFlowGraph, chunk by chunk
+    Parameters
+    ----------
+    rows : iterable
+        sequences of team, depends_on and an optional interaction mode X, C or F
+    chunkSize : int, optional
+        number of rows converted at a time, by default CHUNK_SIZE
+
+    Returns
+    -------
+    TeamFlowGraph
+        graph of the team flow as output by internChunks
+    """
+    rows = iter(rows)
+    chunks = iter(lambda: list(itertools.islice(rows, chunkSize)), [])
+    return internChunks(columns(chunk) for chunk in chunks)
+
+
+def columns(rows):
+    """ returns the (teams, dependencies, modes) columns of a list of rows, padding rows without a mode """
+    return tuple(zip(*((*row, "", "", "")[:3] for row in rows))) or ((), (), ())
+
+
+def internChunks(chunks):
+    """ Interns (teams, dependencies, modes) column chunks into a TeamFlowGraph
+    Parameters
+    ----------
+    chunks : iterable
+        tuples of equal length team, dependency and mode sequences, an empty dependency only declares a team
+
+    Returns
+    -------
+    TeamFlowGraph
+        graph whose names list the teams in order of first appearance, and whose src, dst and mode
+        arrays hold one entry per distinct (team, dependency) pair, sorted by team then dependency. As in cognitiveslope.dictToEdges, the last recognised
+        interaction listed for a pair wins.
+    """
+    ids = Interner()
+    src, dst, mode = [], [], []
+
+    for teams, dependencies, modes in chunks:
+        s = np.fromiter(map(ids.__getitem__, teams), dtype=np.int32, count=len(teams))
+        d = np.fromiter(map(ids.__getitem__, dependencies), dtype=np.int32, count=len(teams))
+        m = np.fromiter(map(cs.MODES.get, modes, itertools.repeat(0)), dtype=np.uint8, count=len(teams))
+
+        #rows with an empty dependency only declare their team, blank rows declare nothing
+        keep = (s >= 0) & (d >= 0)
+        src.append(s[keep])
+        dst.append(d[keep])
+        mode.append(m[keep])
+
+    src = np.concatenate(src) if src else np.empty(0, dtype=np.int32)
+    dst = np.concatenate(dst) if dst else np.empty(0, dtype=np.int32)
+    mode = np.concatenate(mode) if mode else np.empty(0, dtype=np.uint8)
+
+    #keep one edge per pair - the last one with a recognised mode, or the last one when none is recognised
+    key = src.astype(np.int64) * len(ids) + dst
+    order = np.lexsort((np.arange(len(key)), mode > 0, key))
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = key[order[1:]] != key[order[:-1]]
+    order = order[last]
+
+    return tfg.TeamFlowGraph(list(ids), src[order], dst[order], mode[order])
+
+
+class Interner(dict):
+    """ maps team names to consecutive integer ids, assigning the next id to each new name and -1 to an empty name, "" or None """
+
+    def __missing__(self, name):
+        if name is None or name == "":
+            return -1
+        id = self[name] = len(self)
+        return id
@@ -0,0 +1,96 @@
+# edgelist_test.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import json
+import tempfile
+import unittest
+import numpy as np
+import edgelist as el
+import teamtopology as tt
+import cognitiveslope as cs
+
+class TestEdgeList(unittest.TestCase):
+
+    def setUp(self):
+
+        #Team flow for Bakers Unlimited Example with interactions
+        self.BU_TeamFlowWithInteractions = {'StoreRO':  [('CRM', 'C'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'OnlineRO': [('CRM', 'C'), ('UX', 'F'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'CRM':      [('DataEC', 'X'), ('CloudES', 'X')],
+                                            'UX':       [],
+                                            'QE':       [],
+                                            'DataEC':   [('QE', 'F'), ('CloudES', 'X')],
+                                            'CloudES':  [('QE', 'F')]
+        }
+
+        #the same team flow as an edge list, teams declared first so that ids follow the dictionary order
+        self.BU_Lines = [(team, "", "") for team in self.BU_TeamFlowWithInteractions]
+        self.BU_Lines += [(team, dependency, mode) for team, row in self.BU_TeamFlowWithInteractions.items() for dependency, mode in row]
+
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as file:
+            file.write(text)
+        return path
+
+    def test_whenGivenCSVEdgeListThenTopologyMatchesDictionary(self):
+        text = "team,depends_on,mode\n" + "".join(f"{t},{d},{m}\n" for t, d, m in self.BU_Lines)
+        edges = el.loadCSV(self.write("bu.csv", text), chunkSize=4)
+        teamflow = {team: [dependency for dependency, _ in row] for team, row in self.BU_TeamFlowWithInteractions.items()}
+
+        assert edges.names == list(teamflow.keys())
+        assert tt.findTopology(edges, True, True) == tt.findTopology(teamflow, True, True)
+
+    def test_whenGivenJSONLEdgeListThenCognitiveSlopeMatchesDictionary(self):
+        text = "".join(json.dumps({"team": t, "depends_on": d, "mode": m}) + "\n" for t, d, m in self.BU_Lines)
+        edges = el.loadJSONL(self.write("bu.jsonl", text), chunkSize=3)
+
+        expected = cs.findCognitiveSlope(self.BU_TeamFlowWithInteractions, True, True, True, True, True, True, sparse=True)
+        assert cs.findCognitiveSlope(edges, True, True, True, True, True, True) == expected
+
+    def test_whenGivenQuotedAndPartialLinesThenTheyAreParsedAsCSV(self):
+        text = 'team,depends_on,mode\n"Team, A",B, X\nB,C\n\nC,,\n"Team, A",B,F\n'
+        edges = el.loadCSV(self.write("quoted.csv", text))
+
+        assert edges.names == ["Team, A", "B", "C"]
+        assert edges.src.tolist() == [0, 1]
+        assert edges.dst.tolist() == [1, 2]
+        assert edges.mode.tolist() == [cs.MODES["F"], 0]
+
+    def test_whenGivenLinesOfMixedWidthThenEachLineIsParsedAsCSV(self):
+        #two and four column lines add up to three columns a line, and must not be read as one chunk of triples
+        text = "team,depends_on,mode\nA,B\nB,C,X,note\nC,A,F\n"
+        edges = el.loadCSV(self.write("mixed.csv", text))
+
+        assert edges.names == ["A", "B", "C"]
+        assert list(zip(edges.src.tolist(), edges.dst.tolist(), edges.mode.tolist())) == [(0, 1, 0), (1, 2, cs.MODES["X"]), (2, 0, cs.MODES["F"])]
+
+    def test_whenGivenIntegerTeamIdsThenTeamZeroAndItsEdgesAreKept(self):
+        text = "".join(json.dumps(r) + "\n" for r in [{"team": 0, "depends_on": 1, "mode": "X"}, {"team": 1, "depends_on": None}, {"team": 2, "depends_on": 0}])
+        edges = el.loadJSONL(self.write("ids.jsonl", text))
+
+        assert edges.names == [0, 1, 2]
+        assert list(zip(edges.src.tolist(), edges.dst.tolist(), edges.mode.tolist())) == [(0, 1, cs.MODES["X"]), (2, 0, 0)]
+
+    def test_whenGivenRepeatedPairsThenLastRecognisedModeWins(self):
+        edges = el.loadEdges([("A", "B", "X"), ("A", "B", "C"), ("A", "B", ""), ("B", "A", ""), ("B", "A", "")])
+
+        assert edges.src.dtype == np.int32 and edges.mode.dtype == np.uint8
+        assert list(zip(edges.src.tolist(), edges.dst.tolist(), edges.mode.tolist())) == [(0, 1, cs.MODES["C"]), (1, 0, 0)]
+
+    def test_whenTeamsAreNamedAfterModesThenEdgeListHasNoCollision(self):
+        edges = el.loadEdges([("X", "C", "F"), ("C", "F", "X"), ("F", "", "")])
+
+        assert edges.names == ["X", "C", "F"]
+        assert edges.mode.tolist() == [cs.MODES["F"], cs.MODES["X"]]
+
+if __name__ == '__main__':
+    unittest.main()
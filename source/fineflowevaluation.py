@@ -3,22 +3,27 @@
 # Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
-import cognitiveslope as cs
 import math
+import numpy as np
 
-def evaluate(teamflow, sum=False, flow=False, imp=False, need=False, energy=True, resilience=False):
+def evaluate(teamflow, sum=False, flow=False, imp=False, need=False, energy=True, resilience=False, cache=None):
     """ Computes the FINE flow values using cognitive slope.
     Parameters
     ----------
     teamflow : dictionary
         dependency relationship dictionaly in the form: {"A":[("B","C"),("C","F")],"B":[("C","X")],"C":[]}
+        or a TeamFlowGraph (see the teamflowgraph module)
+    cache : AnalysisCache, optional
+        reuse the matrices and page rank of earlier calls on the same team flow (see the analysiscache module)
 
     Returns
     -------
     dictionary
         dictionary containing FINE flow values for the selected outputs
     """  
-    return cs.findCognitiveSlope(teamflow, sum, flow, imp, need, energy, resilience)
+    #imported here, so that compute and the flowratio functions load with numpy alone
+    import cognitiveslope as cs
+    return cs.findCognitiveSlope(teamflow, sum, flow, imp, need, energy, resilience, cache=cache)
 
 
 def compute(flow=None, imps=None, need=None, energy=None):
@@ -69,3 +74,62 @@ def compute(flow=None, imps=None, need=None, energy=None):
     
     return result
 
+
+def computeArray(flow=None, imps=None, need=None, energy=None, decimals=None):
+    """ Implements the FINE flow relationships for numpy arrays - requires at least two inputs to deliver the FINE set.
+    Parameters
+    ----------
+    flow: Value or numpy array for flow (F)
+    imps: Value or numpy array for Impediments (I)
+    need: Value or numpy array for need (N)
+    energy: Value or numpy array enery/cognitive load (E)
+    decimals: Number of decimal places to round the results to, by default no rounding
+
+    Returns
+    -------
+    dictionary
+        dictionary containing the set of FINE flow values for the given inputs, as numpy arrays
+        broadcast against each other. The equations are selected once per call from the inputs
+        given, in the same order as the compute function, rather than once per element.
+    """
+    values = {'flow': flow, 'imps': imps, 'need': need, 'energy': energy}
+    given = [k for k, v in values.items() if v is not None]
+    if len(given) < 2:
+        return {'error' : 'Too few values, must have least two inputs'}
+
+    f, i, n, e = (None if v is None else np.asarray(v, dtype=float) for v in values.values())
+
+    if f is not None and i is not None:
+        if n is None: n = f * i
+        if e is None: e = (n**2)/i
+
+    if f is not None and n is not None:
+        if i is None: i = n/f
+        if e is None: e = n * f
+
+    if f is not None and e is not None:
+        if i is None: i = e/(f**2)
+        if n is None: n = e/f
+
+    if i is not None and n is not None:
+        if f is None: f = n/i
+        if e is None: e = (n**2)/i
+
+    if i is not None and e is not None:
+        if f is None: f = np.sqrt(e/i)
+        if n is None: n = np.sqrt(e*i)
+
+    if n is not None and e is not None:
+        if f is None: f = e/n
+        if i is None: i = (n**2)/e
+
+    f, i, n, e = np.broadcast_arrays(f, i, n, e)
+    if decimals is not None:
+        f, i, n, e = (np.round(x, decimals) for x in (f, i, n, e))
+    else:
+        f, i, n, e = (np.array(x) for x in (f, i, n, e))
+
+    return {'flow'  : f,
+            'imps'  : i,
+            'need'  : n,
+            'energy': e}
@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import unittest
+import numpy as np
 import fineflowevaluation as fine
 
 class TestFineFlowEvaluation(unittest.TestCase):
@@ -166,5 +167,39 @@ class TestFineFlowEvaluation(unittest.TestCase):
         
         assert finevalues == expected
 
+    def test_whenGivenArraysForAnyTwoValuesThenArrayResultsMatchCompute(self):
+
+        flow = np.array([2.4498, 0.7084, 1.7192])
+        imps = np.array([0.1041, 0.8718, 0.2115])
+        need = flow * imps
+        energy = need**2 / imps
+        inputs = {'flow': flow, 'imps': imps, 'need': need, 'energy': energy}
+
+        for a in inputs:
+            for b in inputs:
+                if a < b:
+                    finevalues = fine.computeArray(**{a: inputs[a], b: inputs[b]}, decimals=4)
+
+                    for x in range(len(flow)):
+                        expected = fine.compute(**{a: float(inputs[a][x]), b: float(inputs[b][x])})
+                        assert {k: v[x] for k, v in finevalues.items()} == expected
+
+
+    def test_whenGivenArrayAndScalarThenResultsAreBroadcast(self):
+
+        finevalues = fine.computeArray(imps=np.array([0.25, 1.0, 4.0]), energy=1.0)
+
+        assert np.allclose(finevalues['flow'], np.array([2.0, 1.0, 0.5]))
+        assert np.allclose(finevalues['need'], np.array([0.5, 1.0, 2.0]))
+        assert np.allclose(finevalues['energy'], np.array([1.0, 1.0, 1.0]))
+
+
+    def test_whenGivenLessThanTwoArraysThenError(self):
+
+        finevalues = fine.computeArray(flow=np.array([1.2345]))
+
+        expected = {'error' : 'Too few values, must have least two inputs'}
+        assert finevalues == expected
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -4,7 +4,12 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import math
+import numpy as np
 import fineflowevaluation as fine
+import instrumentation as im
+
+#cycle count reported by computeResilience when energy never exceeds its maximum
+RESILIENCE_LIMIT = 999999999
 
 def computeRatio(bad=0, good=1, batchSize=1):
     """ Computes flow ratio
@@ -118,6 +123,89 @@ def computeEntropy(bad, good, batchSize, cycles, imps, energy, fixedFlow=False,
     return result
 
 
+def computeEntropyArray(bad, good, batchSize, cycles, imps, energy, fixedFlow=False, energyMax=None, drop=False, exact=False):
+    """ Computes flow entropy for many teams and all cycles at once
+    Parameters
+    ----------
+    bad: Number (or numpy array, one per team) of units of bad flow
+    good: Number (or numpy array) of units of good flow
+    batchSize: Number (or numpy array) of units in each batch
+    cycles: Number of cycles over which to compute the results
+    imps: Starting value (or numpy array) of impedements (I)
+    energy: Starting value (or numpy array) for energy/cognitive load (E)
+    fixedFlow: Boolean that controls of flow should be maintained
+    energyMax: Value (or numpy array) of maximum energy if capped
+    drop: Boolean that controls if flow drop should be output
+    exact: Boolean that reproduces the per cycle rounding of computeEntropy exactly
+
+    Returns
+    -------
+    dictionary
+        Computed flow entropy results with a 'ratio' vector (teams) and 'flow', 'imps', 'need' and
+        'energy' matrices (teams x cycles), plus a 'drop' vector if requested. Impediments grow
+        geometrically by (1+ratio) each cycle, so all cycles are computed in closed form unless exact
+        is set, which steps through the cycles (for all teams at once) rounding as computeEntropy does.
+    """
+    bad, good, batchSize, imps, energy = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float)) for x in (bad, good, batchSize, imps, energy)))
+    if energyMax is not None:
+        energyMax = np.broadcast_to(np.asarray(energyMax, dtype=float), imps.shape)
+
+    if exact:
+        ratio = np.array([computeRatio(b, g, n) for b, g, n in zip(bad.tolist(), good.tolist(), batchSize.tolist())])
+        values = entropyCycles(ratio, cycles, imps, energy, fixedFlow, energyMax)
+        fstart = roundExact(np.sqrt(energy/imps))
+    else:
+        ratio = computeRatioArray(bad, good, batchSize)
+        i = imps[:, None] * (1+ratio[:, None])**np.arange(cycles)
+        fstart = np.sqrt(energy/imps)
+        if fixedFlow:
+            e = fstart[:, None]**2 * i
+            if energyMax is not None:
+                e = np.minimum(e, energyMax[:, None])
+        else:
+            e = np.broadcast_to(energy[:, None], i.shape)
+        values = fine.computeArray(imps=i, energy=e)
+
+    result = {'ratio': ratio, **values}
+    if drop:
+        fend = values['flow'][:, -1] if cycles > 0 else fstart
+        result['drop'] = roundExact((fstart-fend)/fstart, 2) if exact else np.round((fstart-fend)/fstart, 2)
+
+    return result
+
+
+def entropyCycles(ratio, cycles, imps, energy, fixedFlow, energyMax):
+    """ steps computeEntropy through the cycles for all teams at once, with its per cycle rounding """
+    shape = (len(imps), cycles)
+    result = {k: np.empty(shape) for k in ('flow', 'imps', 'need', 'energy')}
+
+    f = roundExact(np.sqrt(energy/imps))
+    i = imps
+    e = energy
+
+    for x in range(cycles):
+        if fixedFlow:
+            n = f * i
+            fineValues = (f, i, n, n**2/i)
+            if energyMax is not None:
+                e = np.minimum(roundExact(fineValues[3]), energyMax)
+                fineValues = (np.sqrt(e/i), i, np.sqrt(e*i), e)
+        else:
+            fineValues = (np.sqrt(e/i), i, np.sqrt(e*i), e)
+
+        for k, v in zip(('flow', 'imps', 'need', 'energy'), fineValues):
+            result[k][:, x] = roundExact(v)
+
+        i = roundExact((1+ratio)*i)
+
+    return result
+
+
+def roundExact(x, decimals=4):
+    """ rounds every element with the built-in round function, which rounds ties by decimal value unlike np.round """
+    return np.frompyfunc(lambda v: round(v, decimals), 1, 1)(np.asarray(x, dtype=float)).astype(float)
+
+
 def computeResilience(bad, good, batchSize, imps, energy, energyMax=1):
     """ Computes flow resilience (number of cycles before flow entropy begins)
     Parameters
@@ -139,12 +227,84 @@ def computeResilience(bad, good, batchSize, imps, energy, energyMax=1):
     i = imps
     f = fine.compute(imps=imps, energy=energy)['flow']
 
-    while resilience<999999999:
+    while resilience<RESILIENCE_LIMIT:
         fineValues = fine.compute(flow=f, imps=i)
         if fineValues['energy'] > energyMax: break
         i = (1+ratio)*i
         resilience += 1
 
+    im.record("resilience", resilience)
     return resilience
 
-    
+
+def computeRatioArray(bad=0, good=1, batchSize=1):
+    """ Computes flow ratio for arrays of inputs
+    Parameters
+    ----------
+    bad: Number (or numpy array) of units of bad flow
+    good: Number (or numpy array) of units of good flow
+    batchSize: Number (or numpy array) of units in each batch
+
+    Returns
+    -------
+    numpy array
+        Computed values for flow ratio rounded to 4 decimal places, as computeRatio for each element
+    """
+    bad, good, batchSize = np.broadcast_arrays(np.asarray(bad, dtype=float), np.asarray(good, dtype=float), np.asarray(batchSize, dtype=float))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(good!=0, bad/good, math.nan)
+        probGoodBatch = np.round(good/(good+bad), 4)**batchSize
+        ratio = np.where(batchSize!=1, (1-probGoodBatch)/probGoodBatch, ratio)
+
+    return np.round(ratio, 4)
+
+
+def computeResilienceArray(bad, good, batchSize, imps, energy, energyMax=1):
+    """ Computes flow resilience in closed form (number of cycles before flow entropy begins)
+    Parameters
+    ----------
+    bad: Number (or numpy array) of units of bad flow
+    good: Number (or numpy array) of units of good flow
+    batchSize: Number (or numpy array) of units in each batch
+    imps: Starting value (or numpy array) of impedements (I)
+    energy: Starting value (or numpy array) for energy/cognitive load (E)
+    energyMax: Value (or numpy array) of maximum energy if capped
+
+    Returns
+    -------
+    integer or numpy array
+        Computed resilience for the given inputs, matching computeResilience for each element.
+        Energy at cycle k is f**2 * imps * (1+ratio)**k for the starting flow f, so the cycle count
+        is solved with a logarithm and then corrected for the 4 decimal place rounding of energy.
+    """
+    ratio = computeRatioArray(bad, good, batchSize)
+    ratio, imps, energy, energyMax = np.broadcast_arrays(ratio, np.asarray(imps, dtype=float), np.asarray(energy, dtype=float), np.asarray(energyMax, dtype=float))
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        f = np.round(np.sqrt(energy/imps), 4)
+
+        def exceeded(k):
+            i = imps*(1+ratio)**k
+            return np.round((f*i)**2/i, 4) > energyMax
+
+        #smallest value that rounds to above energyMax at 4 decimal places
+        threshold = (np.floor(energyMax*10000) + 0.5)/10000
+        cycles = np.ceil(np.log(threshold/(f*f*imps))/np.log1p(ratio))
+        cycles = np.where(np.isfinite(cycles) & (ratio>0), np.clip(cycles, 0, RESILIENCE_LIMIT), RESILIENCE_LIMIT)
+        cycles = np.where(exceeded(0), 0, cycles).astype(np.int64)
+
+        #correct the estimate by single cycles where rounding moves the crossing point
+        while True:
+            late = (cycles>0) & exceeded(cycles-1)
+            if not late.any(): break
+            cycles[late] -= 1
+        while True:
+            early = (cycles<RESILIENCE_LIMIT) & ~exceeded(cycles)
+            if not early.any(): break
+            cycles[early] += 1
+
+    im.extend("resilience", cycles.reshape(-1))
+    if cycles.ndim == 0:
+        return int(cycles)
+    return cycles
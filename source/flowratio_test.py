@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import unittest
+import numpy as np
 import fineflowevaluation as fine
 import flowratio as fr
 
@@ -211,6 +212,38 @@ class TestFineFlowEvaluation(unittest.TestCase):
         assert flowEntropy == expected
 
 
+    def test_whenGivenFlowMetricsForEnablingTeamAndBatch4WithCappedEnergyThenExactEntropyArrayMatchesEntropy(self):
+
+        flowEntropy = fr.computeEntropy(bad=15, good=85, batchSize=4, cycles=10, imps=0.8718, energy=0.4375, fixedFlow=True, energyMax=1, drop=True)
+        flowEntropyArray = fr.computeEntropyArray(bad=15, good=85, batchSize=4, cycles=10, imps=0.8718, energy=0.4375, fixedFlow=True, energyMax=1, drop=True, exact=True)
+
+        assert flowEntropyArray['ratio'][0] == flowEntropy['ratio']
+        assert flowEntropyArray['drop'][0] == flowEntropy['drop']
+        for x in range(1, 11):
+            assert {k: flowEntropyArray[k][0, x-1] for k in ('flow', 'imps', 'need', 'energy')} == flowEntropy[x]
+
+
+    def test_whenGivenFlowMetricsForManyTeamsThenEntropyArrayHasOneRowPerTeam(self):
+
+        flowEntropy = fr.computeEntropyArray(bad=15, good=85, batchSize=[1, 4], cycles=5, imps=[0.1041, 0.1041], energy=0.625)
+
+        assert flowEntropy['flow'].shape == (2, 5)
+        assert np.array_equal(flowEntropy['ratio'], np.array([0.1765, 0.9157]))
+        assert np.allclose(flowEntropy['imps'][0], 0.1041 * 1.1765**np.arange(5))
+        assert np.allclose(flowEntropy['energy'], 0.625)
+        assert np.allclose(flowEntropy['flow'][0], [2.4503, 2.2588, 2.0826, 1.9202, 1.7704], atol=0.0005)
+        assert np.allclose(flowEntropy['flow'][1], [2.4503, 1.7704, 1.2791, 0.9242, 0.6677], atol=0.0005)
+
+
+    def test_whenGivenFlowMetricsWithCappedEnergyThenEntropyArrayCapsEnergy(self):
+
+        flowEntropy = fr.computeEntropyArray(bad=15, good=85, batchSize=1, cycles=5, imps=0.1041, energy=0.625, fixedFlow=True, energyMax=1, drop=True)
+
+        assert np.allclose(flowEntropy['energy'][0], [0.625, 0.7355, 0.8652, 1, 1], atol=0.0005)
+        assert np.allclose(flowEntropy['flow'][0], [2.4503, 2.4503, 2.4503, 2.4289, 2.2394], atol=0.0005)
+        assert flowEntropy['drop'][0] == 0.09
+
+
     def test_whenGivenFlowMetricsForEnablingTeamAndBatch1ThenResilienceIsAsExpected(self):
 
         resilience = fr.computeResilience(bad=15, good=85, batchSize=1, imps=0.8718, energy=0.4375)
@@ -233,5 +266,33 @@ class TestFineFlowEvaluation(unittest.TestCase):
         assert resilience == expected
 
 
+    def test_whenGivenFlowMetricsForEnablingTeamThenClosedFormResilienceMatchesLoop(self):
+
+        for batchSize in (1, 2, 4):
+            for energyMax in (0.5, 1, 2):
+                expected = fr.computeResilience(bad=15, good=85, batchSize=batchSize, imps=0.8718, energy=0.4375, energyMax=energyMax)
+                resilience = fr.computeResilienceArray(bad=15, good=85, batchSize=batchSize, imps=0.8718, energy=0.4375, energyMax=energyMax)
+
+                assert resilience == expected
+
+
+    def test_whenGivenArraysOfFlowMetricsThenResilienceIsComputedPerTeam(self):
+
+        resilience = fr.computeResilienceArray(bad=[15, 15, 0, 15], good=85, batchSize=[1, 4, 1, 1], imps=[0.8718, 0.8718, 0.8718, 0.1], energy=[0.4375, 0.4375, 0.4375, 2])
+
+        expected = np.array([6, 2, fr.RESILIENCE_LIMIT, 0])
+        if not np.array_equal(resilience, expected):
+            print('\nUnexpected result! \nExpected:', expected, '\nInstead :', resilience)
+
+        assert np.array_equal(resilience, expected)
+
+
+    def test_whenGivenArraysOfBadAndGoodFlowThenFlowRatiosMatchScalarRatios(self):
+
+        ratios = fr.computeRatioArray(bad=[1, 15, 15], good=[10, 85, 85], batchSize=[1, 1, 4])
+
+        assert np.array_equal(ratios, np.array([fr.computeRatio(1, 10), fr.computeRatio(15, 85), fr.computeRatio(15, 85, 4)]))
+
+
 if __name__ == '__main__':
     unittest.main()
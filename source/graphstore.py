@@ -0,0 +1,342 @@
+# graphstore.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import json
+import itertools
+import numpy as np
+import cognitiveslope as cs
+import teamflowgraph as tfg
+import edgelist as el
+import instrumentation as im
+
+#files of a graph store directory
+INDPTR = "indptr.npy"
+INDICES = "indices.npy"
+MODE = "mode.npy"
+NAMES = "names.json"
+
+#scratch files of the streaming writer, removed once the store is written
+SCRATCH = ("src.tmp", "dst.tmp", "mode.tmp", "rows.tmp", "rowmodes.tmp")
+
+#dependencies read from disk at a time by the streaming analyses, bounding their working memory
+BLOCK_EDGES = 2**22
+
+class GraphStore:
+    """ Graph Store - a team flow kept on disk in CSR form and memory mapped, for organizations too large to hold in memory
+
+    A store is a directory written by the saveGraph function, holding:
+
+        - indptr.npy (int64) CSR row pointers of length N+1, row 'i' lists the teams that team 'i' depends on
+        - indices.npy (int32) the dependencies of each team, sorted within each row
+        - mode.npy (uint8) the interaction mode code of each dependency, see cognitiveslope.MODES
+        - names.json the team names, in id order
+
+    Opening a store maps the arrays without reading them, and the team names are only read when first
+    used, so opening is immediate whatever the size. Page rank and cognitive slope stream over the
+    dependencies in row blocks of about BLOCK_EDGES, so only vectors of one value per team are held in
+    memory and the analyses are bound by disk bandwidth rather than memory.
+
+    Parameters
+    ----------
+    path : string
+        directory of the store
+    """
+
+    __slots__ = ("path", "indptr", "indices", "mode", "table")
+
+    def __init__(self, path):
+        self.path = path
+        self.indptr = np.load(os.path.join(path, INDPTR), mmap_mode="r")
+        self.indices = np.load(os.path.join(path, INDICES), mmap_mode="r")
+        self.mode = np.load(os.path.join(path, MODE), mmap_mode="r")
+        self.table = None
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def names(self):
+        """ team names in id order, read on first use """
+        if self.table is None:
+            with open(os.path.join(self.path, NAMES), encoding="utf-8") as file:
+                self.table = json.load(file)
+        return self.table
+
+    def rowBlocks(self, blockEdges=BLOCK_EDGES):
+        """ returns (first row, end row, first edge, end edge) blocks of about blockEdges dependencies each, a row is never split """
+        return rowBlocks(self.indptr, blockEdges)
+
+    def edges(self, blockEdges=BLOCK_EDGES):
+        """ yields the (src, dst, mode) numpy arrays of each row block, as cognitiveslope.dictToEdges outputs them """
+        for r0, r1, e0, e1 in self.rowBlocks(blockEdges):
+            src = np.repeat(np.arange(r0, r1, dtype=np.int64), np.diff(self.indptr[r0:r1 + 1]))
+            yield src, np.asarray(self.indices[e0:e1], dtype=np.int64), np.asarray(self.mode[e0:e1])
+
+    def find(self, rows, cols):
+        """ returns the position of each (row, col) dependency in indices, -1 where there is none
+
+        Every row is sorted, so all lookups run as one vectorized binary search over the row ranges,
+        reading only the pages of indices they probe.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        lo = np.asarray(self.indptr[rows], dtype=np.int64)
+        hi = np.asarray(self.indptr[rows + 1], dtype=np.int64)
+        end = hi.copy()
+
+        active = np.flatnonzero(lo < hi)
+        while active.size:
+            mid = (lo[active] + hi[active]) // 2
+            below = self.indices[mid] < cols[active]
+            lo[active[below]] = mid[below] + 1
+            hi[active[~below]] = mid[~below]
+            active = active[lo[active] < hi[active]]
+
+        found = lo < end
+        found[found] = self.indices[lo[found]] == cols[found]
+        return np.where(found, lo, -1)
+
+    def pagerank(self, num_iterations=100, d=0.85, normalize=False, tol=None, blockEdges=BLOCK_EDGES):
+        """ PageRank Algorithm - pagerank.pagerankSparse streamed over the row blocks of the store
+        Parameters
+        ----------
+        num_iterations, d, normalize, tol:
+            as for pagerank.pagerankSparse
+        blockEdges : int, optional
+            dependencies read per block, by default BLOCK_EDGES
+
+        Returns
+        -------
+        numpy array
+            a vector of ranks equal to pagerankSparse on the same graph, up to floating point summation order
+        """
+        N = len(self)
+        blocks = self.rowBlocks(blockEdges)
+        v = np.ones(N) / N
+        v_next = v
+        residual = np.inf
+        iterations = 0
+
+        for i in range(num_iterations):
+            links = np.zeros(N)
+            for r0, r1, e0, e1 in blocks:
+                links += np.bincount(self.indices[e0:e1], weights=np.repeat(v[r0:r1], np.diff(self.indptr[r0:r1 + 1])), minlength=N)
+            v = d * links + (1 - d) / N * np.sum(v)
+            iterations += 1
+
+            if tol is None:
+                #Convergence check - average error of all ranks
+                residual = np.abs(np.average(v - v_next))
+                if residual < 0.005:
+                    break
+            else:
+                v = v / np.sum(v)
+                residual = np.sum(np.abs(v - v_next))
+                if residual < tol:
+                    break
+            v_next = v
+
+        im.record("pagerank", {'method': "store", 'teams': N, 'iterations': iterations, 'residual': float(residual)})
+
+        if normalize:
+            v = v / np.linalg.norm(v)
+        return v
+
+    def edgeSlopes(self, blockEdges=BLOCK_EDGES):
+        """ cognitiveslope.edgeSlopes streamed over the row blocks of the store, returning (slopesSum, nonZeroCount) """
+        N = len(self)
+        slopesSum = np.ones(N)
+        nonZeroCount = np.ones(N, dtype=np.int64)
+
+        for src, dst, mode in self.edges(blockEdges):
+            w = cs.WEIGHTS[mode]
+            keep = (src != dst) & (w > 0.0)
+            src, dst, w = src[keep], dst[keep], w[keep]
+
+            #each edge adds its weight to the dependency column and the remainder to the dependent column
+            slopesSum += np.bincount(dst, weights=w, minlength=N) + np.bincount(src, weights=1.0 - w, minlength=N)
+
+            #a neighbour linked in both directions fills a single cell of the column
+            position = self.find(dst, src)
+            reciprocal = position >= 0
+            reciprocal[reciprocal] = cs.WEIGHTS[self.mode[position[reciprocal]]] > 0.0
+            nonZeroCount += np.bincount(dst, minlength=N) + np.bincount(src, minlength=N) - np.bincount(src[reciprocal], minlength=N)
+
+        return slopesSum, nonZeroCount
+
+    def evaluate(self, sum=False, flow=False, imp=False, need=False, energy=True, resilience=False, blockEdges=BLOCK_EDGES):
+        """ returns the same output as cognitiveslope.findCognitiveSlope(teamflow, sparse=True) for the stored team flow """
+        #stages are timed when instrumentation is enabled (see the instrumentation module)
+        with im.stage("pagerank"):
+            p = self.pagerank(100, 0.8, normalize=True, blockEdges=blockEdges)
+        with im.stage("cognitive slope"):
+            slopesSum, nonZeroCount = self.edgeSlopes(blockEdges)
+        with im.stage("output"):
+            return cs.slopeResult(self.names, p, slopesSum, nonZeroCount, sum, flow, imp, need, energy, resilience)
+
+    def toGraph(self):
+        """ reads the whole store into memory as a TeamFlowGraph, for the analyses that need one such as betweenness """
+        src = np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.indptr))
+        return tfg.TeamFlowGraph(self.names, src, self.indices, self.mode)
+
+
+def saveGraph(teamflow, path):
+    """ Writes a team flow to disk as a graph store
+    Parameters
+    ----------
+    teamflow : dictionary
+        dependency relationship dictionaly in the form: {"A":[("B","C"),("C","F")],"B":[("C","X")],"C":[]}
+        or a TeamFlowGraph, such as one streamed from an edge list by the edgelist module
+    path : string
+        directory to write the store to, created if needed
+
+    Returns
+    -------
+    GraphStore
+        the written store, opened
+    """
+    graph = tfg.asGraph(teamflow)
+    N = len(graph)
+    src, dst, mode = graph.src, graph.dst, graph.mode
+
+    #rows must be sorted for the binary search of reciprocal dependencies
+    key = src.astype(np.int64) * N + dst
+    if np.any(key[1:] < key[:-1]):
+        order = np.argsort(key, kind="stable")
+        src, dst, mode = src[order], dst[order], mode[order]
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, INDPTR), np.concatenate(([0], np.cumsum(np.bincount(src, minlength=N)))).astype(np.int64))
+    np.save(os.path.join(path, INDICES), dst.astype(np.int32))
+    np.save(os.path.join(path, MODE), mode.astype(np.uint8))
+    with open(os.path.join(path, NAMES), "w", encoding="utf-8") as file:
+        json.dump(graph.names, file)
+    return GraphStore(path)
+
+
+def saveEdges(chunks, path, blockEdges=BLOCK_EDGES):
+    """ Writes a team flow to disk as a graph store, streaming it from edge list chunks
+    Parameters
+    ----------
+    chunks : iterable
+        (teams, dependencies, modes) column chunks as read by edgelist.csvChunks, an empty dependency
+        only declares a team (see edgelist.internChunks)
+    path : string
+        directory to write the store to, created if needed
+    blockEdges : int, optional
+        dependencies sorted in memory at a time, by default BLOCK_EDGES
+
+    Returns
+    -------
+    GraphStore
+        the written store, opened, equal to saveGraph of the TeamFlowGraph edgelist.internChunks builds from
+        the same chunks. Only the team names and a few values per team are held in memory: the chunks are
+        appended to scratch files, placed in their rows of a memory mapped scratch array by a counting sort
+        over the teams, then sorted and deduplicated one row block at a time.
+    """
+    os.makedirs(path, exist_ok=True)
+    scratch = [os.path.join(path, name) for name in SCRATCH]
+    ids = el.Interner()
+    counts = np.zeros(0, dtype=np.int64)
+
+    #first pass - intern the names and append the dependencies, counting those of each team
+    with open(scratch[0], "wb") as srcFile, open(scratch[1], "wb") as dstFile, open(scratch[2], "wb") as modeFile:
+        for teams, dependencies, modes in chunks:
+            s = np.fromiter(map(ids.__getitem__, teams), dtype=np.int32, count=len(teams))
+            d = np.fromiter(map(ids.__getitem__, dependencies), dtype=np.int32, count=len(teams))
+            m = np.fromiter(map(cs.MODES.get, modes, itertools.repeat(0)), dtype=np.uint8, count=len(teams))
+            keep = (s >= 0) & (d >= 0)
+            srcFile.write(s[keep].tobytes())
+            dstFile.write(d[keep].tobytes())
+            modeFile.write(m[keep].tobytes())
+            counts = np.pad(counts, (0, len(ids) - len(counts)))
+            counts += np.bincount(s[keep], minlength=len(ids))
+
+    N = len(ids)
+    E = int(counts.sum())
+    indptr = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+    rowCounts = np.zeros(N, dtype=np.int64)
+    kept = 0
+    src = dst = mode = rows = rowModes = None
+
+    if E:
+        src = np.memmap(scratch[0], dtype=np.int32, mode="r")
+        dst = np.memmap(scratch[1], dtype=np.int32, mode="r")
+        mode = np.memmap(scratch[2], dtype=np.uint8, mode="r")
+        rows = np.memmap(scratch[3], dtype=np.int32, mode="w+", shape=(E,))
+        rowModes = np.memmap(scratch[4], dtype=np.uint8, mode="w+", shape=(E,))
+
+        #second pass - place each dependency in its row, rows keeping the order the dependencies were read in
+        cursor = indptr[:-1].copy()
+        for e0 in range(0, E, blockEdges):
+            s = np.asarray(src[e0:e0 + blockEdges], dtype=np.int64)
+            order = np.argsort(s, kind="stable")
+            s = s[order]
+            first = np.flatnonzero(np.concatenate(([True], s[1:] != s[:-1])))
+            sizes = np.diff(np.append(first, len(s)))
+            position = cursor[s] + np.arange(len(s)) - np.repeat(first, sizes)
+            rows[position] = dst[e0:e0 + blockEdges][order]
+            rowModes[position] = mode[e0:e0 + blockEdges][order]
+            cursor[s[first]] += sizes
+
+        #third pass - sort each row block and keep one dependency per pair as edgelist.internChunks does,
+        #compacting in place, as no block is ever written past where it was read from
+        for r0, r1, e0, e1 in rowBlocks(indptr, blockEdges):
+            s = np.repeat(np.arange(r1 - r0, dtype=np.int64), counts[r0:r1])
+            d = np.array(rows[e0:e1])
+            m = np.array(rowModes[e0:e1])
+            key = s * N + d
+            order = np.lexsort((np.arange(len(key)), m > 0, key))
+            last = np.ones(len(order), dtype=bool)
+            last[:-1] = key[order[1:]] != key[order[:-1]]
+            order = order[last]
+            rows[kept:kept + len(order)] = d[order]
+            rowModes[kept:kept + len(order)] = m[order]
+            rowCounts[r0:r1] = np.bincount(s[order], minlength=r1 - r0)
+            kept += len(order)
+
+    #the deduplicated rows are copied to the store files block by block
+    np.save(os.path.join(path, INDPTR), np.concatenate(([0], np.cumsum(rowCounts))).astype(np.int64))
+    indices = np.lib.format.open_memmap(os.path.join(path, INDICES), mode="w+", dtype=np.int32, shape=(kept,))
+    modes = np.lib.format.open_memmap(os.path.join(path, MODE), mode="w+", dtype=np.uint8, shape=(kept,))
+    for e0 in range(0, kept, blockEdges):
+        e1 = min(e0 + blockEdges, kept)
+        indices[e0:e1] = rows[e0:e1]
+        modes[e0:e1] = rowModes[e0:e1]
+    indices.flush()
+    modes.flush()
+
+    #the maps are closed before their files are removed
+    del indices, modes, src, dst, mode, rows, rowModes
+    for name in scratch:
+        if os.path.exists(name):
+            os.remove(name)
+
+    with open(os.path.join(path, NAMES), "w", encoding="utf-8") as file:
+        json.dump(list(ids), file)
+    return GraphStore(path)
+
+
+def saveCSV(source, path, chunkSize=el.CHUNK_SIZE, header=True, delimiter=",", blockEdges=BLOCK_EDGES):
+    """ streams a team,depends_on,mode edge list CSV file (see edgelist.loadCSV) into a graph store with saveEdges """
+    with open(source, newline="") as file:
+        if header:
+            next(file, None)
+        return saveEdges(el.csvChunks(file, chunkSize, delimiter), path, blockEdges)
+
+
+def rowBlocks(indptr, blockEdges=BLOCK_EDGES):
+    """ returns (first row, end row, first edge, end edge) blocks of about blockEdges dependencies each of CSR rows, a row is never split """
+    N = len(indptr) - 1
+    E = int(indptr[N])
+    starts = np.searchsorted(indptr, np.arange(blockEdges, E, blockEdges), side="left")
+    bounds = np.unique(np.concatenate(([0], starts, [N]))).tolist()
+    return [(r0, r1, int(indptr[r0]), int(indptr[r1])) for r0, r1 in zip(bounds[:-1], bounds[1:])]
+
+
+def openGraph(path):
+    """ opens the graph store in directory path, mapping its arrays without reading them """
+    return GraphStore(path)
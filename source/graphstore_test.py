@@ -0,0 +1,97 @@
+# graphstore_test.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import graphstore as gs
+import pagerank as pr
+import cognitiveslope as cs
+import teamflowgraph as tfg
+import edgelist as el
+
+class TestGraphStore(unittest.TestCase):
+
+    def setUp(self):
+
+        #Team flow for Bakers Unlimited Example with interactions
+        self.BU_TeamFlowWithInteractions = {'StoreRO':  [('CRM', 'C'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'OnlineRO': [('CRM', 'C'), ('UX', 'F'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'CRM':      [('DataEC', 'X'), ('CloudES', 'X')],
+                                            'UX':       [],
+                                            'QE':       [],
+                                            'DataEC':   [('QE', 'F'), ('CloudES', 'X')],
+                                            'CloudES':  [('QE', 'F')]
+        }
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "bu")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_whenStoredThenGraphIsMemoryMappedAndReadBack(self):
+        gs.saveGraph(self.BU_TeamFlowWithInteractions, self.path)
+        store = gs.openGraph(self.path)
+
+        assert isinstance(store.indices, np.memmap) and len(store) == 7
+        assert store.table is None
+        assert store.names == list(self.BU_TeamFlowWithInteractions.keys())
+        assert store.toGraph().toDict() == tfg.asGraph(self.BU_TeamFlowWithInteractions).toDict()
+
+    def test_whenStreamedInSmallBlocksThenCognitiveSlopeMatchesDictionary(self):
+        store = gs.saveGraph(self.BU_TeamFlowWithInteractions, self.path)
+        expected = cs.findCognitiveSlope(self.BU_TeamFlowWithInteractions, True, True, True, True, True, True, sparse=True)
+
+        for blockEdges in (1, 2, 5, gs.BLOCK_EDGES):
+            assert store.evaluate(True, True, True, True, True, True, blockEdges=blockEdges) == expected
+
+    def test_whenGivenRandomGraphsThenPageRankAndSlopesMatchInMemoryGraph(self):
+        rng = np.random.default_rng(7)
+
+        for n in range(1, 30):
+            names = [f"T{i}" for i in range(n)]
+            teamflow = {k: [(names[j], rng.choice(["X", "C", "F", ""])) for j in rng.integers(0, n, 5)] for k in names}
+            graph = tfg.asGraph(teamflow)
+            store = gs.saveGraph(graph, self.path)
+
+            assert np.allclose(store.pagerank(d=0.8, blockEdges=3), pr.pagerankSparse(*graph.toCSR(), d=0.8))
+            slopesSum, nonZeroCount = cs.edgeSlopes(graph.src, graph.dst, graph.mode, n)
+            streamed = store.edgeSlopes(blockEdges=3)
+            assert np.allclose(streamed[0], slopesSum) and np.array_equal(streamed[1], nonZeroCount)
+
+    def test_whenStreamedFromEdgeListChunksThenStoreMatchesSavedGraph(self):
+        rng = np.random.default_rng(11)
+        source = os.path.join(self.directory.name, "edges.csv")
+
+        for n in (1, 5, 40):
+            names = [f"T{i}" for i in range(n)]
+            lines = [(names[i], names[j] if j < n else "", m) for i, j, m in zip(rng.integers(0, n, 6 * n), rng.integers(0, n + 2, 6 * n), rng.choice(["X", "C", "F", ""], 6 * n))]
+            with open(source, "w") as file:
+                file.write("team,depends_on,mode\n" + "".join(f"{t},{d},{m}\n" for t, d, m in lines))
+
+            store = gs.saveCSV(source, self.path, chunkSize=7, blockEdges=5)
+            expected = el.loadCSV(source, chunkSize=7)
+
+            assert store.names == expected.names
+            assert store.toGraph().toDict() == expected.toDict()
+            assert np.array_equal(store.indptr, expected.toCSR()[0])
+            assert sorted(os.listdir(self.path)) == sorted([gs.INDPTR, gs.INDICES, gs.MODE, gs.NAMES])
+
+        store = gs.saveEdges([(["A", "B"], ["", ""], ["", ""])], self.path)
+        assert store.names == ["A", "B"] and len(store.indices) == 0
+
+    def test_whenLookingUpDependenciesThenPositionsAreFoundByBinarySearch(self):
+        store = gs.saveGraph(self.BU_TeamFlowWithInteractions, self.path)
+
+        #StoreRO depends on CRM, QE and DataEC, but not on UX, and QE depends on no team
+        position = store.find([0, 0, 0, 0, 4], [2, 4, 5, 3, 0])
+
+        assert store.indices[position[:3]].tolist() == [2, 4, 5]
+        assert position[3:].tolist() == [-1, -1]
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+# instrumentation.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+from contextlib import contextmanager, nullcontext
+
+#recorder of the innermost instrument block, None when instrumentation is disabled
+ACTIVE = None
+
+#stage returned while disabled, entering and leaving it does nothing
+DISABLED = nullcontext()
+
+class Recorder:
+    """ Recorder - per stage wall times, counters and solver values of the analyses run inside an instrument block
+
+    stages maps each stage name to its number of 'calls' and total 'seconds', counters maps each counter
+    name to its total, and values maps each value name to the list of values recorded, in call order:
+
+        - 'pagerank' a dict of the 'method', 'teams', 'iterations' and final 'residual' of each solve
+        - 'matrix' a dict of the 'kind', 'teams', 'nonzeros' and 'bytes' of each matrix built
+        - 'resilience' the number of cycles iterated for each team
+
+    Parameters
+    ----------
+    callback : callable, optional
+        called with (kind, name, value) as each stage ends (kind 'stage', value its seconds) and as each
+        value is recorded (kind 'value'), for example to stream events to a log
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.stages = {}
+        self.counters = {}
+        self.values = {}
+
+    @contextmanager
+    def stage(self, name):
+        """ times the enclosed block as one call of stage name """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            totals = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            totals['calls'] += 1
+            totals['seconds'] += seconds
+            if self.callback:
+                self.callback('stage', name, seconds)
+
+    def count(self, name, n=1):
+        """ adds n to counter name """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, name, value):
+        """ appends value to the values recorded under name """
+        self.values.setdefault(name, []).append(value)
+        if self.callback:
+            self.callback('value', name, value)
+
+    def extend(self, name, values):
+        """ appends every element of a list or numpy array to the values recorded under name """
+        values = values.tolist() if hasattr(values, 'tolist') else list(values)
+        self.values.setdefault(name, []).extend(values)
+        if self.callback:
+            self.callback('value', name, values)
+
+    def toDict(self):
+        """ returns the stages, counters and values recorded so far as plain dictionaries and lists """
+        return {'stages': {k: dict(v) for k, v in self.stages.items()},
+                'counters': dict(self.counters),
+                'values': {k: list(v) for k, v in self.values.items()}}
+
+    def toJSON(self, **kwargs):
+        """ returns toDict() as a JSON string, keyword arguments are passed to json.dumps """
+        import json
+        return json.dumps(self.toDict(), **kwargs)
+
+
+@contextmanager
+def instrument(callback=None):
+    """ Enables instrumentation of the analyses run inside the block, yielding their Recorder
+    Instrumentation is per process: analyses run in worker processes, as by evaluateScenarios, are not recorded.
+
+        with im.instrument() as recorder:
+            tt.findTopology(teamflow)
+        print(recorder.toJSON(indent=2))
+    """
+    global ACTIVE
+    previous = ACTIVE
+    ACTIVE = Recorder(callback)
+    try:
+        yield ACTIVE
+    finally:
+        ACTIVE = previous
+
+
+def enabled():
+    """ returns True inside an instrument block """
+    return ACTIVE is not None
+
+
+def stage(name):
+    """ returns a context manager timing stage name while enabled, and doing nothing otherwise """
+    return DISABLED if ACTIVE is None else ACTIVE.stage(name)
+
+
+def count(name, n=1):
+    """ adds n to counter name while enabled """
+    if ACTIVE is not None:
+        ACTIVE.count(name, n)
+
+
+def record(name, value):
+    """ records value under name while enabled """
+    if ACTIVE is not None:
+        ACTIVE.record(name, value)
+
+
+def extend(name, values):
+    """ records each of values under name while enabled """
+    if ACTIVE is not None:
+        ACTIVE.extend(name, values)
+
+
+def matrix(kind, teams, nonzeros, *arrays):
+    """ records the size of a matrix built from the given numpy arrays while enabled, nonzeros None counts them in the first array """
+    if ACTIVE is not None:
+        if nonzeros is None:
+            nonzeros = (arrays[0] != 0).sum()
+        ACTIVE.record("matrix", {'kind': kind, 'teams': int(teams), 'nonzeros': int(nonzeros), 'bytes': sum(a.nbytes for a in arrays)})
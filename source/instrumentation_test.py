@@ -0,0 +1,96 @@
+# instrumentation_test.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import unittest
+import instrumentation as im
+import analysis as an
+import analysiscache as ac
+import teamtopology as tt
+import betweenness as bt
+import fineflowevaluation as fine
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+
+        #Team flow for Bakers Unlimited Example
+        self.BU_TeamFlow = {'StoreRO':  ['CRM', 'QE', 'DataEC'],
+                            'OnlineRO': ['CRM', 'UX', 'QE', 'DataEC'],
+                            'CRM':      ['DataEC', 'CloudES'],
+                            'UX':       [],
+                            'QE':       [],
+                            'DataEC':   ['QE', 'CloudES'],
+                            'CloudES':  ['QE']
+        }
+
+        #Team flow for Bakers Unlimited Example with interactions
+        self.BU_TeamFlowWithInteractions = {'StoreRO':  [('CRM', 'C'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'OnlineRO': [('CRM', 'C'), ('UX', 'F'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'CRM':      [('DataEC', 'X'), ('CloudES', 'X')],
+                                            'UX':       [],
+                                            'QE':       [],
+                                            'DataEC':   [('QE', 'F'), ('CloudES', 'X')],
+                                            'CloudES':  [('QE', 'F')]
+        }
+
+    def test_whenInstrumentedThenTopologyStagesAndSolverValuesAreRecorded(self):
+        with im.instrument() as recorder:
+            tt.findTopology(self.BU_TeamFlow, sparse=True)
+
+        assert set(recorder.stages) == {"matrix", "pagerank", "betweenness", "classification", "output"}
+        assert all(s['calls'] == 1 and s['seconds'] >= 0 for s in recorder.stages.values())
+
+        solve = recorder.values["pagerank"][0]
+        assert solve['method'] == "sparse" and solve['teams'] == 7
+        assert solve['iterations'] > 0 and solve['residual'] >= 0
+        assert recorder.values["matrix"][0] == {'kind': "csr", 'teams': 7, 'nonzeros': 12, 'bytes': 8 * 8 + 12 * 8}
+
+    def test_whenInstrumentedThenEvaluationRecordsResilienceCyclesOfEachTeam(self):
+        with im.instrument() as recorder:
+            dense = fine.evaluate(self.BU_TeamFlowWithInteractions, resilience=True)
+        with im.instrument() as sparse:
+            an.analyze(self.BU_TeamFlowWithInteractions)
+
+        assert recorder.values["resilience"] == [row[-1] for row in dense.values()]
+        assert sparse.values["resilience"] == recorder.values["resilience"]
+        assert {"cognitive slope", "resilience"} <= set(sparse.stages)
+
+    def test_whenInstrumentedThenApproxBetweennessErrorBoundIsRecorded(self):
+        with im.instrument() as recorder:
+            tt.findTopology(self.BU_TeamFlow, betweennessMethod="approx", samples=3, seed=1)
+            an.analyze(self.BU_TeamFlowWithInteractions, betweennessMethod="approx", samples=3, seed=1)
+
+        expected = {'method': "approx", 'teams': 7, 'samples': 3, 'bound': bt.errorBound(7, 3)}
+        assert recorder.values["betweenness"] == [expected, expected]
+
+    def test_whenNotInstrumentedThenNothingIsRecorded(self):
+        recorder = im.Recorder()
+        assert not im.enabled()
+        with im.stage("matrix"):
+            im.count("cache.hits")
+            im.record("pagerank", {})
+
+        with im.instrument() as outer:
+            with im.instrument() as inner:
+                im.count("cache.hits")
+            assert im.ACTIVE is outer
+        assert im.ACTIVE is None
+        assert outer.counters == {} and inner.counters == {'cache.hits': 1}
+        assert recorder.toDict() == {'stages': {}, 'counters': {}, 'values': {}}
+
+    def test_whenCallbackIsGivenThenEventsAreStreamedAndReportIsJSON(self):
+        events = []
+        cache = ac.AnalysisCache()
+        with im.instrument(lambda kind, name, value: events.append((kind, name))) as recorder:
+            an.analyze(self.BU_TeamFlowWithInteractions, cache=cache)
+            an.analyze(self.BU_TeamFlowWithInteractions, cache=cache)
+
+        assert recorder.counters == {'cache.misses': 2, 'cache.hits': 2}
+        assert ('stage', "pagerank") in events and ('value', "pagerank") in events
+        assert json.loads(recorder.toJSON()) == recorder.toDict()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,13 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import numpy as np
+import instrumentation as im
+
+#contiguous blocks of teams updated in turn by each Gauss-Seidel sweep
+GS_BLOCKS = 4
+
+#consecutive residual ratios that must agree before Aitken extrapolation is tried
+AITKEN_WINDOW = 3
 
 def pagerank(M, num_iterations: int = 100, d: float = 0.85, normalize: bool = False):
     """ PageRank Algorithm - adapted from https://en.wikipedia.org/wiki/PageRank#Python
@@ -28,24 +35,344 @@ def pagerank(M, num_iterations: int = 100, d: float = 0.85, normalize: bool = Fa
     v = np.ones(N) / N
     v_next = v
     M_hat = (d * M + (1 - d) / N)
+    residual = np.inf
+    iterations = 0
 
     for i in range(num_iterations):
         v = v @ M_hat
+        iterations += 1
 
         #Convergence check - average error of all ranks
-        if np.abs(np.average(v - v_next)) < 0.005:
+        residual = np.abs(np.average(v - v_next))
+        if residual < 0.005:
             break
         v_next = v
     
         if i == num_iterations:
            print("WARNING: Convergence not met!")
 
+    im.record("pagerank", {'method': "dense", 'teams': N, 'iterations': iterations, 'residual': float(residual)})
+
+    if normalize:
+        n = np.linalg.norm(v)
+        v = v/n
+
+    return v
+
+def pagerankSparse(indptr, indices, num_iterations: int = 100, d: float = 0.85, normalize: bool = False, start=None, tol=None):
+    """ PageRank Algorithm - sparse variant of the pagerank function for graphs in CSR form
+    Parameters
+    ----------
+    indptr : numpy array
+        CSR row pointer array of length N+1, row 'i' lists the teams that 'i' links to
+    indices : numpy array
+        CSR column index array, as output by the dictToCSR function
+    num_iterations : int, optional
+        number of iterations, by default 100
+    d : float, optional
+        damping factor, by default 0.85
+    normalize : bool, optional
+        normalize the output vector to unit length, by default False
+    start : numpy array, optional
+        starting vector, e.g. the ranks of a previous solve to warm start from, by default uniform
+    tol : float, optional
+        when given, ranks are rescaled to sum to 1 every iteration and iteration stops once the
+        L1 change is below tol, instead of using the pagerank convergence check
+
+    Returns
+    -------
+    numpy array
+        a vector of ranks equivalent to pagerank(M) for the matching adjacency matrix M,
+        computed in O(E) per iteration without materializing M or M_hat
+
+    """
+    N = len(indptr) - 1
+    rows = np.repeat(np.arange(N), np.diff(indptr))
+    v = np.ones(N) / N if start is None else np.array(start, dtype=float)
+    v_next = v
+    residual = np.inf
+    iterations = 0
+
+    for i in range(num_iterations):
+        #equivalent of v @ (d * M + (1 - d) / N) - the teleport term is applied as a scalar
+        v = d * np.bincount(indices, weights=v[rows], minlength=N) + (1 - d) / N * np.sum(v)
+        iterations += 1
+
+        if tol is None:
+            #Convergence check - average error of all ranks
+            residual = np.abs(np.average(v - v_next))
+            if residual < 0.005:
+                break
+        else:
+            v = v / np.sum(v)
+            residual = np.sum(np.abs(v - v_next))
+            if residual < tol:
+                break
+        v_next = v
+
+    im.record("pagerank", {'method': "sparse", 'teams': N, 'iterations': iterations, 'residual': float(residual)})
+
     if normalize:
         n = np.linalg.norm(v)
         v = v/n
 
     return v
 
+def pagerankSolve(indptr, indices, d: float = 0.85, tol: float = 1e-10, norm: str = "l1", num_iterations: int = 100,
+                  dangling: bool = True, method: str = "power", personalization=None, start=None, normalize: bool = False):
+    """ PageRank Solver - PageRank of the transition matrix of a graph in CSR form with convergence diagnostics
+    Parameters
+    ----------
+    indptr : numpy array
+        CSR row pointer array of length N+1, as output by dictToCSR
+    indices : numpy array
+        CSR column index array, as output by dictToCSR
+    d : float, optional
+        damping factor, by default 0.85
+    tol : float, optional
+        residual tolerance between successive iterations, by default 1e-10
+    norm : str, optional
+        residual norm, "l1" or "linf", by default "l1"
+    num_iterations : int, optional
+        maximum number of iterations, by default 100
+    dangling : bool, optional
+        redistribute the rank of dangling teams (teams with no dependencies) by the personalization
+        vector, by default True. Without it their rank leaks out and the ranks sum to less than 1.
+    method : str, optional
+        "power" for power iteration, "gauss-seidel" for block sweeps that use ranks already updated in the
+        same sweep (see the gaussSeidel function), or "aitken" for power iteration with Aitken extrapolation
+        once the residual shrinks by a steady ratio, kept only when it lowers the residual, by default "power"
+    personalization : numpy array, optional
+        teleport distribution, by default uniform
+    start : numpy array, optional
+        starting vector, e.g. the ranks of a previous solve to warm start from, by default the personalization
+    normalize : bool, optional
+        normalize the output vector to unit length, by default False
+
+    Returns
+    -------
+    tuple
+        (v, diagnostics) where v is the vector of ranks and diagnostics is a dictionary with the number of
+        'iterations' used, the final 'residual' and whether the solve 'converged'.
+        Unlike the pagerank function, each team's rank is split evenly over its dependencies,
+        so that v is a probability distribution when dangling is True.
+
+    """
+    if norm not in ("l1", "linf"):
+        raise ValueError("norm must be one of: l1 or linf")
+    if method not in ("power", "gauss-seidel", "aitken"):
+        raise ValueError("method must be one of: power, gauss-seidel or aitken")
+
+    N = len(indptr) - 1
+    degree = np.diff(indptr)
+    rows = np.repeat(np.arange(N), degree)
+    share = np.divide(1.0, degree, out=np.zeros(N), where=degree > 0)
+    isDangling = degree == 0
+
+    u = np.ones(N) / N if personalization is None else np.asarray(personalization, dtype=float) / np.sum(personalization)
+    v = u.copy() if start is None else np.array(start, dtype=float)
+    residualOf = (lambda x: np.sum(np.abs(x))) if norm == "l1" else (lambda x: np.max(np.abs(x), initial=0.0))
+
+    def step(v):
+        leaked = d * np.sum(v[isDangling]) if dangling else 0.0
+        return d * np.bincount(indices, weights=(v * share)[rows], minlength=N) + (leaked + 1 - d) * u
+
+    if method == "gauss-seidel":
+        v, iterations, residual = gaussSeidel(indptr, indices, share, isDangling, u, v, d, tol, num_iterations, dangling, residualOf)
+    else:
+        history = []
+        ratios = []
+        window = AITKEN_WINDOW
+        residual = np.inf
+        iterations = 0
+        while iterations < num_iterations:
+            v_next = step(v)
+            iterations += 1
+
+            previous = residual
+            residual = residualOf(v_next - v)
+            v = v_next
+            if residual < tol:
+                break
+            if method != "aitken":
+                continue
+
+            #once the residual shrinks by a steady ratio a single eigenvalue dominates the error and the
+            #iterates are extrapolated along it. The extrapolated ranks cost one more iteration to check and
+            #are dropped if they do not lower the residual, after which a longer steady run is required.
+            history = (history + [v])[-3:]
+            ratios = (ratios + [residual / previous])[-window:]
+            if len(ratios) < window or np.ptp(ratios) > 1e-3 * ratios[-1] or iterations == num_iterations:
+                continue
+            candidate = aitken(*history)
+            history = []
+            ratios = []
+            if candidate is None:
+                continue
+            if dangling:
+                candidate = candidate / np.sum(candidate)
+            trial = step(candidate)
+            iterations += 1
+            trialResidual = residualOf(trial - candidate)
+            if trialResidual < residual:
+                v, residual = trial, trialResidual
+                if residual < tol:
+                    break
+            else:
+                window *= 2
+    if normalize:
+        v = v / np.linalg.norm(v)
+
+    im.record("pagerank", {'method': method, 'teams': N, 'iterations': iterations, 'residual': float(residual)})
+    return v, {'iterations': iterations, 'residual': float(residual), 'converged': bool(residual < tol)}
+
+def pagerankBlock(indptr, indices, d=0.85, personalization=None, tol: float = 1e-10, norm: str = "l1",
+                  num_iterations: int = 100, dangling: bool = True, normalize: bool = False):
+    """ PageRank Solver for many damping factors and personalizations at once, as pagerankSolve for each column
+    Parameters
+    ----------
+    indptr : numpy array
+        CSR row pointer array of length N+1, as output by dictToCSR
+    indices : numpy array
+        CSR column index array, as output by dictToCSR
+    d : float or numpy array, optional
+        damping factor, or a vector of K damping factors, by default 0.85
+    personalization : numpy array, optional
+        teleport distribution, or an N x K matrix with one distribution per column, by default uniform
+    tol : float, optional
+        residual tolerance between successive iterations, by default 1e-10
+    norm : str, optional
+        residual norm, "l1" or "linf", by default "l1"
+    num_iterations : int, optional
+        maximum number of iterations, by default 100
+    dangling : bool, optional
+        redistribute the rank of dangling teams by the personalization vector, by default True
+    normalize : bool, optional
+        normalize each output column to unit length, by default False
+
+    Returns
+    -------
+    tuple
+        (V, diagnostics) where V is an N x K matrix of ranks, one column per damping factor and
+        personalization pair, and diagnostics holds the number of 'iterations' used and the final
+        'residual' and 'converged' flag of each column. Every iteration is a single sparse
+        matrix-matrix product over the columns of the N x K block that have not yet converged.
+
+    """
+    if norm not in ("l1", "linf"):
+        raise ValueError("norm must be one of: l1 or linf")
+
+    N = len(indptr) - 1
+    degree = np.diff(indptr)
+    rows = np.repeat(np.arange(N), degree)
+    share = np.divide(1.0, degree, out=np.zeros(N), where=degree > 0)
+    isDangling = degree == 0
+
+    d = np.atleast_1d(np.asarray(d, dtype=float))
+    U = np.ones((N, 1)) / N if personalization is None else np.asarray(personalization, dtype=float).reshape(N, -1)
+    K = max(len(d), U.shape[1])
+    d = np.broadcast_to(d, (K,))
+    U = np.broadcast_to(U / np.sum(U, axis=0), (N, K))
+
+    #each product is one gather of the block rows and one bincount over all (team, column) cells,
+    #with edges ordered by target so the bincount writes sequentially
+    order = np.argsort(indices, kind="stable")
+    rows = rows[order]
+    targets = np.asarray(indices, dtype=np.int64)[order]
+    V = U.copy()
+    residual = np.full(K, np.inf)
+
+    #the working block X holds the active columns only, compacted whenever some of them converge
+    active = np.arange(K)
+    X, dX, UX = V.copy(), d.copy(), np.ascontiguousarray(U)
+    cells = (targets[:, None] * K + np.arange(K)).ravel()
+    iterations = 0
+    while iterations < num_iterations:
+        k = len(active)
+        W = np.take(X * share[:, None], rows, axis=0)
+        product = np.bincount(cells, weights=W.ravel(), minlength=N * k).reshape(N, k)
+
+        leaked = dX * np.sum(X[isDangling], axis=0) if dangling else 0.0
+        X_next = dX * product + (leaked + 1 - dX) * UX
+        iterations += 1
+
+        delta = np.abs(X_next - X)
+        r = np.sum(delta, axis=0) if norm == "l1" else np.max(delta, axis=0, initial=0.0)
+        X = X_next
+        residual[active] = r
+
+        done = r < tol
+        if done.any():
+            V[:, active[done]] = X[:, done]
+            if done.all():
+                break
+            keep = ~done
+            active, X, dX, UX = active[keep], X[:, keep], dX[keep], np.ascontiguousarray(UX[:, keep])
+            cells = (targets[:, None] * len(active) + np.arange(len(active))).ravel()
+    else:
+        V[:, active] = X
+
+    if normalize:
+        V = V / np.linalg.norm(V, axis=0)
+
+    im.record("pagerank", {'method': "block", 'teams': N, 'iterations': iterations, 'residual': residual.tolist()})
+    return V, {'iterations': iterations, 'residual': residual, 'converged': residual < tol}
+
+def gaussSeidel(indptr, indices, share, isDangling, u, v, d, tol, num_iterations, dangling, residualOf):
+    """ Block Gauss-Seidel sweeps for pagerankSolve, returning (v, iterations, residual)
+
+    The teams are split into GS_BLOCKS contiguous blocks, updated in turn from the in-edges of the block, so
+    each block uses the ranks of the blocks already updated in the same sweep. The in-edges of a block are
+    read in source order, so a sweep costs about one power iteration on graphs of thousands of teams, while
+    taking fewer sweeps than power iteration takes iterations. On small graphs the per block overhead
+    dominates and power iteration is faster.
+    """
+    N = len(indptr) - 1
+    rows = np.repeat(np.arange(N), np.diff(indptr))
+    cuts = np.linspace(0, N, min(GS_BLOCKS, N) + 1).astype(np.int64)
+    block = np.searchsorted(cuts, indices, side="right") - 1
+    order = np.lexsort((rows, block))
+    sources = rows[order]
+    targets = np.asarray(indices, dtype=np.int64)[order]
+    weights = d * share[sources]
+
+    #the in-edges of each block are one slice of the edges sorted by target block, then by source
+    ends = np.searchsorted(block[order], np.arange(len(cuts)))
+    blocks = [(lo, hi, sources[a:b], targets[a:b] - lo, weights[a:b])
+              for lo, hi, a, b in zip(cuts[:-1].tolist(), cuts[1:].tolist(), ends[:-1].tolist(), ends[1:].tolist())]
+
+    x = v.copy()
+    residual = np.inf
+    iterations = 0
+    while iterations < num_iterations:
+        previous = x.copy()
+        teleport = (d * np.sum(previous[isDangling]) if dangling else 0.0) + 1 - d
+        for lo, hi, src, dst, w in blocks:
+            x[lo:hi] = np.bincount(dst, weights=x[src] * w, minlength=hi - lo) + teleport * u[lo:hi]
+        if dangling:
+            x /= np.sum(x)
+        iterations += 1
+
+        residual = residualOf(x - previous)
+        if residual < tol:
+            break
+
+    return x, iterations, residual
+
+def aitken(x0, x1, x2):
+    """ Aitken delta-squared extrapolation of three successive iterates along their dominant ratio
+
+    The ratio of the two differences estimates the eigenvalue dominating the error, and the geometric
+    series of the remaining differences is summed. Returns None when the ratio is not in (0, 1).
+    """
+    a = x1 - x0
+    b = x2 - x1
+    scale = np.dot(a, a)
+    ratio = np.dot(a, b) / scale if scale > 0 else 0.0
+    if not 0 < ratio < 1:
+        return None
+    return np.maximum(x2 + b * ratio / (1 - ratio), 0.0)
+
 def classify(v):
     """ classify for computed PageRanks
     Parameters
@@ -61,14 +388,49 @@ def classify(v):
         low = below 10% higher than median
 
     """
-    c = np.copy(v)
-    for i in range(0,len(v)):
-        if v[i] < np.median(v)*1.1:
-            c[i] = 0
-        else:
-            c[i] = 1
+    return classifyBatch(v)
+
 
-    return c.astype(int)
+def classifyBatch(V):
+    """ classify for many vectors of computed PageRanks at once
+    Parameters
+    ----------
+    V : numpy array
+        matrix with one vector of computed ranks per row, e.g. one row per scenario
+
+    Returns
+    -------
+    numpy array
+        equivalent matrix with each row classified high or low (0 or 1) against the median of that row,
+        as the classify function does for a single vector
+
+    """
+    V = np.asarray(V)
+    return np.where(V < median(V)*1.1, 0, 1)
+
+
+def median(V):
+    """ median of the last axis using a selection-based partition, O(N) per vector
+    Parameters
+    ----------
+    V : numpy array
+        vector, or matrix with one vector per row
+
+    Returns
+    -------
+    numpy array
+        median of each vector, shaped so that it broadcasts against V
+
+    """
+    n = V.shape[-1]
+    if n == 0:
+        return np.full(V.shape[:-1] + (1,), np.nan)
+
+    k = n // 2
+    if n % 2:
+        return np.partition(V, k, axis=-1)[..., k:k+1]
+    part = np.partition(V, (k-1, k), axis=-1)
+    return (part[..., k-1:k] + part[..., k:k+1]) / 2
 
 
 def dictToArray(d):
@@ -87,3 +449,65 @@ def dictToArray(d):
     dic = {k: [1 if x in v else 0 for x in vals] for k, v in d.items()}
     lst = list(dic.values())
     return np.array(lst)
+
+
+def dictToCSR(d):
+    """ converts a dictionary to a sparse adjacency matrix in CSR form
+    Parameters
+    ----------
+    d : dictionary
+        dependency relationship dictionaly in the form: {"A":["B","C"],"B":["C"]}
+        entries may also be (team, interaction) tuples as used by the cognitiveslope module
+
+    Returns
+    -------
+    tuple
+        (indptr, indices) numpy arrays describing the same adjacency as dictToArray,
+        built in O(N+E) and usable as input to the pagerankSparse function
+    """
+    index = {k: i for i, k in enumerate(d.keys())}
+    indptr = [0]
+    indices = []
+    for v in d.values():
+        row = {index[x] for x in (e[0] if isinstance(e, (tuple, list)) else e for e in v) if x in index}
+        indices.extend(sorted(row))
+        indptr.append(len(indices))
+
+    return np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64)
+
+
+def edgesToCSR(src, dst, N):
+    """ converts an edge list to a sparse adjacency matrix in CSR form
+    Parameters
+    ----------
+    src : numpy array
+        index of the team each edge starts from
+    dst : numpy array
+        index of the team each edge points to
+    N : int
+        number of teams
+
+    Returns
+    -------
+    tuple
+        (indptr, indices) numpy arrays usable as input to the pagerankSparse function
+    """
+    order = np.argsort(src, kind="stable")
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(src, minlength=N))))
+    return indptr.astype(np.int64), np.asarray(dst, dtype=np.int64)[order]
+
+
+def arrayToCSR(M):
+    """ converts an adjacency matrix to a sparse adjacency matrix in CSR form
+    Parameters
+    ----------
+    M : numpy array
+        adjacency matrix as output by the dictToArray function
+
+    Returns
+    -------
+    tuple
+        (indptr, indices) numpy arrays with one entry per non-zero cell of M
+    """
+    rows, cols = np.nonzero(M)
+    return edgesToCSR(rows, cols, M.shape[0])
@@ -62,6 +62,24 @@ class TestPageRank(unittest.TestCase):
         expected = np.array([0,0,0,0,1,1,1])
         assert np.array_equal(hilo, expected)
 
+    def test_whenGivenManyRankVectorsThenBatchClassifyMatchesClassifyPerRow(self):
+        V = np.array([[0.00430928, 0.03607688, 0.0087505, 0.01776775],
+                      [0.4, 0.1, 0.1, 0.1],
+                      [0.1, 0.2, 0.3, 0.4]])
+
+        hilo = pr.classifyBatch(V)
+
+        expected = np.array([pr.classify(v) for v in V])
+        assert np.array_equal(hilo, expected)
+        assert np.array_equal(hilo[0], np.array([0,1,0,1]))
+
+    def test_whenGivenVectorsOfOddAndEvenLengthThenMedianMatchesNumpyMedian(self):
+        rng = np.random.default_rng(7)
+
+        for n in (1, 2, 7, 10):
+            V = rng.random((3, n))
+            assert np.allclose(pr.median(V)[:, 0], np.median(V, axis=1))
+
     def test_whenGivenSimpleTwoNodeDictionaryThenAdjMatrixIsAsExpected(self):
         d = {"A":["B"],"B":[]}
 
@@ -86,5 +104,178 @@ class TestPageRank(unittest.TestCase):
 
         assert np.array_equal(v, expected)
 
+    def test_whenGivenGenericTeamToplogyDictionaryThenCSRMatchesAdjMatrix(self):
+        tt = {"SA":["EN", "CS","PF"],
+              "EN":[],
+              "CS":["EN","PF"],
+              "PF":["EN"]
+        }
+
+        indptr, indices = pr.dictToCSR(tt)
+
+        assert np.array_equal(indptr, np.array([0,3,3,5,6]))
+        assert np.array_equal(indices, np.array([1,2,3,1,3,1]))
+
+    def test_whenGivenInteractionDictionaryThenCSRUsesTeamNames(self):
+        tt = {"SA":[("EN","F"), ("PF","X"), ("PF","C")],
+              "EN":[],
+              "PF":[("EN","F"), ("Unknown","X")]
+        }
+
+        indptr, indices = pr.dictToCSR(tt)
+
+        assert np.array_equal(indptr, np.array([0,2,2,3]))
+        assert np.array_equal(indices, np.array([1,2,1]))
+
+    def test_whenGivenIntegerTeamNamesThenCSRMatchesAdjMatrix(self):
+        tt = {1:[2, 3, 4],
+              2:[],
+              3:[2, 4],
+              4:[(2, "F")]
+        }
+
+        indptr, indices = pr.dictToCSR(tt)
+
+        assert np.array_equal(indptr, np.array([0,3,3,5,6]))
+        assert np.array_equal(indices, np.array([1,2,3,1,3,1]))
+        assert np.array_equal(indices, np.nonzero(pr.dictToArray({1:[2, 3, 4], 2:[], 3:[2, 4], 4:[2]}))[1])
+
+    def test_whenGivenLargerExampleTeamToplogyThenSparseRanksMatchDenseRanks(self):
+        TT = np.array([[0, 0, 1, 0, 1, 1, 0],
+                       [0, 0, 1, 1, 1, 1, 0],
+                       [0, 0, 0, 0, 0, 1, 1],
+                       [0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 1, 0, 1],
+                       [0, 0, 0, 0, 1, 0, 0]])
+        indptr = np.concatenate(([0], np.cumsum(np.sum(TT, axis=1))))
+        indices = np.nonzero(TT)[1]
+
+        v = pr.pagerankSparse(indptr, indices, 100, 0.8)
+        vn = pr.pagerankSparse(indptr, indices, 100, 0.8, normalize=True)
+
+        assert np.allclose(v, pr.pagerank(TT, 100, 0.8))
+        assert np.allclose(vn, pr.pagerank(TT, 100, 0.8, normalize=True))
+
+    def directSolve(self, TT, d, u):
+        #closed form for the transition matrix with dangling rank redistributed by u
+        N = TT.shape[0]
+        degree = np.sum(TT, axis=1)
+        P = np.where(degree[:, None] > 0, TT / np.maximum(degree, 1)[:, None], u[None, :])
+        return np.linalg.solve(np.eye(N) - d * P.T, (1 - d) * u)
+
+    def test_whenGivenLargerExampleWithDanglingTeamsThenSolverMatchesDirectSolve(self):
+        TT = np.array([[0, 0, 1, 0, 1, 1, 0],
+                       [0, 0, 1, 1, 1, 1, 0],
+                       [0, 0, 0, 0, 0, 1, 1],
+                       [0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 1, 0, 1],
+                       [0, 0, 0, 0, 1, 0, 0]])
+        expected = self.directSolve(TT, 0.8, np.ones(7) / 7)
+
+        for method in ("power", "gauss-seidel", "aitken"):
+            v, diagnostics = pr.pagerankSolve(*pr.arrayToCSR(TT), d=0.8, tol=1e-12, method=method)
+
+            assert diagnostics['converged']
+            assert diagnostics['residual'] < 1e-12
+            assert np.allclose(v, expected)
+            assert np.isclose(np.sum(v), 1.0)
+
+    def test_whenGivenWeaklyLinkedValueStreamsThenAitkenAndGaussSeidelNeedFewerIterations(self):
+        #two dense value streams joined by a handful of dependencies converge slowly under power iteration
+        rng = np.random.default_rng(1)
+        stream = np.repeat([0, 1], 150)
+        TT = (rng.random((300, 300)) < np.where(stream[:, None] == stream[None, :], 0.05, 0.0005)).astype(int)
+        np.fill_diagonal(TT, 0)
+        indptr, indices = pr.arrayToCSR(TT)
+
+        power, powerDiagnostics = pr.pagerankSolve(indptr, indices, d=0.99, num_iterations=1000)
+        for method, fraction in (("aitken", 0.5), ("gauss-seidel", 0.9)):
+            v, diagnostics = pr.pagerankSolve(indptr, indices, d=0.99, num_iterations=1000, method=method)
+
+            assert diagnostics['converged']
+            assert diagnostics['iterations'] < fraction * powerDiagnostics['iterations']
+            assert np.allclose(v, power, atol=1e-9)
+
+    def test_whenGivenPersonalizationAndInfinityNormThenSolverMatchesDirectSolve(self):
+        TT = np.array([[0,1,1,1],
+                       [0,0,0,0],
+                       [0,1,0,1],
+                       [0,1,1,0]])
+        u = np.array([0.7, 0.1, 0.1, 0.1])
+
+        v, diagnostics = pr.pagerankSolve(*pr.arrayToCSR(TT), d=0.85, norm="linf", personalization=u)
+
+        assert diagnostics['converged']
+        assert np.allclose(v, self.directSolve(TT, 0.85, u))
+
+    def test_whenDanglingRedistributionIsOffThenRankLeaks(self):
+        TT = np.array([[0,1,1,1],
+                       [0,0,0,0],
+                       [0,1,0,1],
+                       [0,1,0,0]])
+
+        v, diagnostics = pr.pagerankSolve(*pr.arrayToCSR(TT), d=0.8, dangling=False)
+
+        assert diagnostics['converged']
+        assert np.sum(v) < 1.0
+        assert np.argmax(v) == 1
+
+    def test_whenIterationsRunOutThenSolverReportsNotConverged(self):
+        TT = np.array([[0,1,0],
+                       [0,0,1],
+                       [1,0,0]])
+
+        v, diagnostics = pr.pagerankSolve(*pr.arrayToCSR(TT), d=0.99, tol=1e-15, num_iterations=3, start=np.array([1.0, 0.0, 0.0]))
+
+        assert diagnostics['iterations'] == 3
+        assert not diagnostics['converged']
+
+    def test_whenGivenSeveralDampingFactorsThenBlockColumnsMatchSolver(self):
+        TT = np.array([[0,1,1,0,0],
+                       [0,0,1,1,0],
+                       [1,0,0,1,0],
+                       [0,0,0,0,1],
+                       [0,0,0,0,0]])
+        d = np.array([0.5, 0.8, 0.85, 0.95])
+
+        V, diagnostics = pr.pagerankBlock(*pr.arrayToCSR(TT), d=d, num_iterations=1000)
+
+        assert V.shape == (5, 4)
+        assert diagnostics['converged'].all()
+        for k in range(len(d)):
+            v = pr.pagerankSolve(*pr.arrayToCSR(TT), d=d[k], num_iterations=1000)[0]
+            assert np.allclose(V[:, k], v)
+
+    def test_whenGivenPersonalizationMatrixThenBlockColumnsMatchSolver(self):
+        TT = np.array([[0,1,1,1],
+                       [0,0,0,0],
+                       [0,1,0,1],
+                       [0,1,0,0]])
+        U = np.array([[1.0, 0.0, 0.25],
+                      [0.0, 0.0, 0.25],
+                      [0.0, 1.0, 0.25],
+                      [0.0, 0.0, 0.25]])
+
+        V, diagnostics = pr.pagerankBlock(*pr.arrayToCSR(TT), d=0.85, personalization=U, norm="linf", normalize=True)
+
+        assert diagnostics['converged'].all()
+        for k in range(U.shape[1]):
+            v = pr.pagerankSolve(*pr.arrayToCSR(TT), d=0.85, personalization=U[:, k], norm="linf", normalize=True)[0]
+            assert np.allclose(V[:, k], v)
+
+    def test_whenIterationsRunOutThenBlockReportsConvergencePerColumn(self):
+        TT = np.array([[0,1,0],
+                       [0,0,1],
+                       [1,0,0]])
+
+        V, diagnostics = pr.pagerankBlock(*pr.arrayToCSR(TT), d=[0.1, 0.99], tol=1e-6, num_iterations=20,
+                                          personalization=np.array([1.0, 0.0, 0.0]))
+
+        assert diagnostics['iterations'] == 20
+        assert list(diagnostics['converged']) == [True, False]
+        assert diagnostics['residual'][1] > diagnostics['residual'][0]
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
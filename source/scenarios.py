@@ -0,0 +1,123 @@
+# scenarios.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import multiprocessing
+import numpy as np
+import pagerank as pr
+import flowratio as fr
+import cognitiveslope as cs
+import teamflowgraph as tfg
+
+#FINE values returned for every team of every scenario, in output order
+COLUMNS = ("flow", "imps", "need", "energy", "sum", "resilience")
+
+#base structures of the worker processes, set once per worker by the pool initializer
+BASE = None
+
+def evaluateScenarios(teamflow, scenarios, processes=None, decimals=4):
+    """ Evaluates many interaction mode variants of one organization across a process pool
+    Parameters
+    ----------
+    teamflow : dictionary
+        base dependency relationship dictionaly in the form: {"A":[("B","C"),("C","F")],"B":[("C","X")],"C":[]}
+        or a TeamFlowGraph
+    scenarios : list
+        one list of edits per scenario, each edit a tuple (team, dependency, mode) that sets the interaction
+        mode X, C or F of a dependency, adding the dependency if needed, or removes it when mode is None.
+        For example [("OnlineRO", "QE", "X"), ("DataEC", "QE", "X")] moves the QE team to x-as-a-service.
+    processes : int, optional
+        number of worker processes, by default one per CPU. With 1 the scenarios are evaluated in process.
+    decimals : int, optional
+        decimal places to round the FINE values to, by default 4 as evaluate does, None for no rounding
+
+    Returns
+    -------
+    tuple
+        (names, values) where values is a numpy array of shape (scenarios, teams, len(COLUMNS)) holding the
+        FINE values of fineflowevaluation.evaluate(variant, sum=True, flow=True, imp=True, need=True,
+        energy=True, resilience=True) for each team of each variant. The base edge arrays are built
+        once and handed to each worker when it starts, so tasks only carry their edits.
+    """
+    graph = tfg.asGraph(teamflow)
+    names = graph.names
+    base = (len(names), graph.src, graph.dst, graph.mode)
+    edits = [encodeEdits(graph.index, scenario) for scenario in scenarios]
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(1, min(processes, len(edits)))
+
+    if processes == 1:
+        initWorker(base)
+        values = evaluateChunk(edits)
+    else:
+        chunks = [edits[i::processes] for i in range(processes)]
+        with multiprocessing.Pool(processes, initializer=initWorker, initargs=(base,)) as pool:
+            results = pool.map(evaluateChunk, chunks)
+        values = np.empty((len(edits), len(names), len(COLUMNS)))
+        for i, result in enumerate(results):
+            values[i::processes] = result
+
+    if decimals is not None:
+        values = np.round(values, decimals)
+    return names, values
+
+
+def encodeEdits(index, scenario):
+    """ converts the edits of one scenario to (team index, dependency index, mode code) tuples, mode code None removes """
+    encoded = []
+    for team, dependency, mode in scenario:
+        for name in (team, dependency):
+            if name not in index:
+                raise ValueError(f"unknown team: {name}")
+        if mode is not None and mode not in cs.MODES:
+            raise ValueError(f"unknown interaction mode: {mode}")
+        encoded.append((index[team], index[dependency], None if mode is None else cs.MODES[mode]))
+    return encoded
+
+
+def initWorker(base):
+    """ pool initializer - keeps the base structures of the organization for all tasks of this worker """
+    global BASE
+    N, src, dst, mode = base
+    positions = {(s, d): i for i, (s, d) in enumerate(zip(src.tolist(), dst.tolist()))}
+    BASE = (N, src, dst, mode, positions)
+
+
+def evaluateChunk(edits):
+    """ evaluates a list of encoded scenarios against the base structures of this worker """
+    return np.stack([evaluateEdits(scenario) for scenario in edits]) if edits else np.empty((0, BASE[0], len(COLUMNS)))
+
+
+def evaluateEdits(scenario):
+    """ applies one scenario to the base edge arrays and returns its (teams, len(COLUMNS)) FINE values """
+    N, src, dst, mode, positions = BASE
+    mode = mode.copy()
+    keep = np.ones(len(src), dtype=bool)
+    added = {}
+
+    for s, d, m in scenario:
+        i = positions.get((s, d))
+        if i is not None:
+            keep[i] = m is not None
+            if m is not None:
+                mode[i] = m
+        elif m is None:
+            added.pop((s, d), None)
+        else:
+            added[(s, d)] = m
+
+    src = np.concatenate((src[keep], np.array([s for s, _ in added], dtype=np.int64)))
+    dst = np.concatenate((dst[keep], np.array([d for _, d in added], dtype=np.int64)))
+    mode = np.concatenate((mode[keep], np.array(list(added.values()), dtype=np.uint8)))
+
+    p = pr.pagerankSparse(*pr.edgesToCSR(src, dst, N), 100, 0.8, normalize=True)
+    slopesSum, nonZeroCount = cs.edgeSlopes(src, dst, mode, N)
+    e = slopesSum / nonZeroCount
+
+    #Uses the FINE flow circle equations for all teams at once
+    r = fr.computeResilienceArray(bad=1, good=10, batchSize=1, imps=p, energy=e)
+    return np.column_stack((np.sqrt(e/p), p, np.sqrt(e*p), e, slopesSum, r))
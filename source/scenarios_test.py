@@ -0,0 +1,81 @@
+# scenarios_test.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import unittest
+import numpy as np
+import scenarios as sc
+import fineflowevaluation as fine
+
+class TestScenarios(unittest.TestCase):
+
+    def setUp(self):
+
+        #Team flow for Bakers Unlimited Example with interactions
+        self.BU_TeamFlowWithInteractions = {'StoreRO':  [('CRM', 'C'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'OnlineRO': [('CRM', 'C'), ('UX', 'F'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'CRM':      [('DataEC', 'X'), ('CloudES', 'X')],
+                                            'UX':       [],
+                                            'QE':       [],
+                                            'DataEC':   [('QE', 'F'), ('CloudES', 'X')],
+                                            'CloudES':  [('QE', 'F')]
+        }
+
+        #Team flow for Bakers Unlimited Example with interactions with QE team using x-as-a-service
+        self.BU_TeamFlowWithInteractionsWithQEX = {'StoreRO':  [('CRM', 'C'), ('QE', 'X'), ('DataEC', 'X')],
+                                                   'OnlineRO': [('CRM', 'C'), ('UX', 'F'), ('QE', 'X'), ('DataEC', 'X')],
+                                                   'CRM':      [('DataEC', 'X'), ('CloudES', 'X')],
+                                                   'UX':       [],
+                                                   'QE':       [],
+                                                   'DataEC':   [('QE', 'X'), ('CloudES', 'X')],
+                                                   'CloudES':  [('QE', 'X')]
+        }
+
+        self.QEX = [('StoreRO', 'QE', 'X'), ('OnlineRO', 'QE', 'X'), ('DataEC', 'QE', 'X'), ('CloudES', 'QE', 'X')]
+
+    def expected(self, teamflow):
+        values = fine.evaluate(teamflow, sum=True, flow=True, imp=True, need=True, energy=True, resilience=True)
+        #evaluate orders the columns flow, imps, need, energy, sum, resilience as COLUMNS
+        return np.array(list(values.values()), dtype=float)
+
+
+    def test_whenFlippingQETeamToXAsAServiceThenValuesMatchEvaluate(self):
+
+        names, values = sc.evaluateScenarios(self.BU_TeamFlowWithInteractions, [[], self.QEX], processes=1)
+
+        assert names == list(self.BU_TeamFlowWithInteractions.keys())
+        assert values.shape == (2, 7, len(sc.COLUMNS))
+        assert np.allclose(values[0], self.expected(self.BU_TeamFlowWithInteractions))
+        assert np.allclose(values[1], self.expected(self.BU_TeamFlowWithInteractionsWithQEX))
+
+
+    def test_whenAddingAndRemovingDependenciesThenValuesMatchEvaluate(self):
+
+        scenario = [('CRM', 'DataEC', None), ('UX', 'CloudES', 'F'), ('UX', 'CloudES', 'C')]
+        teamflow = dict(self.BU_TeamFlowWithInteractions, CRM=[('CloudES', 'X')], UX=[('CloudES', 'C')])
+
+        names, values = sc.evaluateScenarios(self.BU_TeamFlowWithInteractions, [scenario], processes=1)
+
+        assert np.allclose(values[0], self.expected(teamflow))
+
+
+    def test_whenEvaluatedAcrossAProcessPoolThenValuesMatchInProcessValues(self):
+
+        variants = [[(team, 'QE', mode)] for team in ('StoreRO', 'OnlineRO', 'DataEC', 'CloudES') for mode in 'XCF']
+
+        names, pooled = sc.evaluateScenarios(self.BU_TeamFlowWithInteractions, variants, processes=3)
+        names, inline = sc.evaluateScenarios(self.BU_TeamFlowWithInteractions, variants, processes=1)
+
+        assert np.array_equal(pooled, inline)
+
+
+    def test_whenGivenUnknownTeamOrModeThenError(self):
+
+        with self.assertRaises(ValueError):
+            sc.evaluateScenarios(self.BU_TeamFlowWithInteractions, [[('Bakery', 'QE', 'X')]], processes=1)
+        with self.assertRaises(ValueError):
+            sc.evaluateScenarios(self.BU_TeamFlowWithInteractions, [[('UX', 'QE', 'Z')]], processes=1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,226 @@
+# service.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import analysis as an
+import analysiscache as ac
+import teamtopology as tt
+import fineflowevaluation as fine
+import batch
+
+#address the service listens on by default, local connections only
+HOST = "127.0.0.1"
+PORT = 8765
+
+#largest request body accepted, in bytes
+MAX_BODY = 64 * 2**20
+
+#analysis requests whose latency is kept for the stats
+LATENCY_WINDOW = 1000
+
+#analyses served, by path
+ENDPOINTS = {"/analyze": an.analyze, "/topology": tt.findTopology, "/evaluate": fine.evaluate}
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+class AnalysisService:
+    """ Analysis Service - a local JSON over HTTP service keeping the tool kit warm between requests
+
+    Each analysis is requested by POSTing {"teamflow": {...}, "options": {...}} to one of:
+
+        - /analyze the analysis.analyze output of the team flow
+        - /topology the teamtopology.findTopology output
+        - /evaluate the fineflowevaluation.evaluate output
+
+    where the teamflow is in the form {"A":[["B","C"],["C","F"]],"B":[["C","X"]],"C":[]} (plain team names for
+    findTopology) and the options are the keyword arguments of the analysis. Analyses run in a pool of worker
+    processes which import the tool kit once. Identical requests arriving while one is being computed, those
+    with the same path, team flow content hash (see analysiscache.contentKey) and options, wait for that one
+    computation instead of starting their own. GET /stats returns the request, computation and coalesced
+    counts, the queue depth and the latency of recent analysis requests.
+
+    Parameters
+    ----------
+    host : string, optional
+        address to listen on, by default HOST
+    port : int, optional
+        port to listen on, by default PORT, 0 for any free port
+    processes : int, optional
+        number of worker processes, by default one per CPU
+    """
+
+    def __init__(self, host=HOST, port=PORT, processes=None):
+        self.host = host
+        self.port = port
+        self.processes = processes or os.cpu_count() or 1
+        self.executor = None
+        self.server = None
+        self.running = {}
+        self.waiting = 0
+        self.requests = 0
+        self.computations = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.latency = deque(maxlen=LATENCY_WINDOW)
+
+    async def start(self):
+        """ starts the worker processes and begins listening, setting port to the port bound """
+        loop = asyncio.get_running_loop()
+        self.executor = ProcessPoolExecutor(self.processes)
+        #workers start and import the tool kit now rather than on the first requests
+        await asyncio.gather(*[loop.run_in_executor(self.executor, runAnalysis, "/analyze", {"A": []}, {}) for _ in range(self.processes)])
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """ stops listening and shuts the worker processes down """
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown()
+
+    async def handle(self, reader, writer):
+        """ serves the HTTP/1.1 requests of one connection, keeping it open unless asked to close it """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                request = line.decode("latin-1").split()
+                length = int(headers.get("content-length", 0) or 0)
+                if len(request) != 3:
+                    await self.respond(writer, 400, {"error": "malformed request line"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, {"error": f"request body over {MAX_BODY} bytes"}, False)
+                    break
+                method, path, version = request
+                body = await reader.readexactly(length)
+
+                status, payload = await self.dispatch(method, path, body)
+                keepAlive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self.respond(writer, status, payload, keepAlive)
+                if not keepAlive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, keepAlive):
+        """ writes one response, payload being JSON text or an object to encode """
+        body = (payload if isinstance(payload, str) else json.dumps(payload)).encode()
+        head = (f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keepAlive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def dispatch(self, method, path, body):
+        """ returns the (status, payload) response to one request """
+        if path == "/stats":
+            return (200, self.stats()) if method == "GET" else (405, {"error": "use GET"})
+        if path not in ENDPOINTS:
+            return 404, {"error": f"unknown path: {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+
+        start = time.perf_counter()
+        self.requests += 1
+        try:
+            request = json.loads(body)
+            teamflow = batch.parseTeamFlow(request["teamflow"])
+            options = request.get("options") or {}
+            if not isinstance(options, dict) or "cache" in options:
+                raise ValueError("options must be an object of analysis keyword arguments")
+            payload = await self.compute(path, teamflow, options)
+            status = 200
+        except (ValueError, TypeError, KeyError) as e:
+            status, payload = 400, {"error": f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+        if status != 200:
+            self.errors += 1
+        self.latency.append(time.perf_counter() - start)
+        return status, payload
+
+    async def compute(self, path, teamflow, options):
+        """ returns the JSON text of an analysis, sharing the computation of an identical request already running """
+        key = (path, ac.contentKey(teamflow), json.dumps(options, sort_keys=True))
+        future = self.running.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, runAnalysis, path, teamflow, options)
+            self.running[key] = future
+            future.add_done_callback(lambda _: self.running.pop(key, None))
+            self.computations += 1
+        else:
+            self.coalesced += 1
+
+        #shielded, so a client going away does not cancel the computation other clients wait for
+        self.waiting += 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self.waiting -= 1
+
+    def stats(self):
+        """ returns the request counters, queue depth and recent analysis latency in seconds """
+        latency = np.array(self.latency)
+        summary = {"count": len(latency)}
+        if len(latency):
+            summary.update({"mean": float(latency.mean()), "p50": float(np.percentile(latency, 50)),
+                            "p95": float(np.percentile(latency, 95)), "max": float(latency.max())})
+        return {"requests": self.requests, "computations": self.computations, "coalesced": self.coalesced,
+                "errors": self.errors, "queueDepth": len(self.running), "waiting": self.waiting,
+                "processes": self.processes, "latency": summary}
+
+
+def runAnalysis(path, teamflow, options):
+    """ runs the analysis of path in a worker process, returning its output as JSON text """
+    return json.dumps(ENDPOINTS[path](teamflow, **options), default=lambda value: value.tolist())
+
+
+async def serve(host=HOST, port=PORT, processes=None):
+    """ runs the service until cancelled """
+    service = AnalysisService(host, port, processes)
+    await service.start()
+    print(f"FINE Flow Tool Kit service listening on http://{service.host}:{service.port}", file=sys.stderr)
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    """ runs the service from the command line """
+    parser = argparse.ArgumentParser(description="FINE Flow Tool Kit local analysis service")
+    parser.add_argument("--host", default=HOST, help="address to listen on")
+    parser.add_argument("--port", type=int, default=PORT, help="port to listen on")
+    parser.add_argument("--processes", type=int, help="worker processes, by default one per CPU")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.processes))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# service_test.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import asyncio
+import unittest
+import service
+import analysis as an
+import teamtopology as tt
+import fineflowevaluation as fine
+
+async def request(port, method, path, body=None):
+    """ sends one request to the service on localhost, returning (status, decoded body) """
+    reader, writer = await asyncio.open_connection(service.HOST, port)
+    data = b"" if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode())
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+    response = await reader.read()
+    writer.close()
+    head, _, text = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(text)
+
+class TestService(unittest.TestCase):
+
+    def setUp(self):
+
+        #Team flow for Bakers Unlimited Example
+        self.BU_TeamFlow = {'StoreRO':  ['CRM', 'QE', 'DataEC'],
+                            'OnlineRO': ['CRM', 'UX', 'QE', 'DataEC'],
+                            'CRM':      ['DataEC', 'CloudES'],
+                            'UX':       [],
+                            'QE':       [],
+                            'DataEC':   ['QE', 'CloudES'],
+                            'CloudES':  ['QE']
+        }
+
+        #Team flow for Bakers Unlimited Example with interactions
+        self.BU_TeamFlowWithInteractions = {'StoreRO':  [('CRM', 'C'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'OnlineRO': [('CRM', 'C'), ('UX', 'F'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'CRM':      [('DataEC', 'X'), ('CloudES', 'X')],
+                                            'UX':       [],
+                                            'QE':       [],
+                                            'DataEC':   [('QE', 'F'), ('CloudES', 'X')],
+                                            'CloudES':  [('QE', 'F')]
+        }
+
+    def serve(self, test):
+        """ runs the coroutine test(service) against a service on a free localhost port """
+        async def run():
+            server = service.AnalysisService(port=0, processes=1)
+            await server.start()
+            try:
+                await test(server)
+            finally:
+                await server.close()
+        asyncio.run(run())
+
+    def test_whenRequestingAnalysesThenResultsMatchTheToolKit(self):
+        async def test(server):
+            status, result = await request(server.port, "POST", "/analyze", {"teamflow": self.BU_TeamFlowWithInteractions})
+            assert status == 200
+            assert result == json.loads(json.dumps(an.analyze(self.BU_TeamFlowWithInteractions)))
+
+            status, result = await request(server.port, "POST", "/topology", {"teamflow": self.BU_TeamFlow, "options": {"centralities": True}})
+            assert result == json.loads(json.dumps(tt.findTopology(self.BU_TeamFlow, centralities=True)))
+
+            status, result = await request(server.port, "POST", "/evaluate", {"teamflow": self.BU_TeamFlowWithInteractions, "options": {"flow": True}})
+            assert result == json.loads(json.dumps(fine.evaluate(self.BU_TeamFlowWithInteractions, flow=True)))
+
+        self.serve(test)
+
+    def test_whenIdenticalRequestsArriveTogetherThenTheyAreComputedOnce(self):
+        async def test(server):
+            body = {"teamflow": self.BU_TeamFlowWithInteractions}
+            other = {"teamflow": self.BU_TeamFlowWithInteractions, "options": {"betweennessMethod": "interior"}}
+            responses = await asyncio.gather(*[request(server.port, "POST", "/analyze", body) for _ in range(5)],
+                                             request(server.port, "POST", "/analyze", other))
+
+            assert all(status == 200 for status, _ in responses)
+            assert all(result == responses[0][1] for _, result in responses[:5])
+
+            status, stats = await request(server.port, "GET", "/stats")
+            assert stats["requests"] == 6 and stats["computations"] == 2 and stats["coalesced"] == 4
+            assert stats["queueDepth"] == 0 and stats["latency"]["count"] == 6 and stats["latency"]["max"] > 0
+
+        self.serve(test)
+
+    def test_whenGivenBadRequestsThenErrorsAreReported(self):
+        async def test(server):
+            assert (await request(server.port, "POST", "/analyze", b"{not json"))[0] == 400
+            assert (await request(server.port, "POST", "/analyze", {"teamflow": self.BU_TeamFlow, "options": {"fast": True}}))[0] == 400
+            assert (await request(server.port, "POST", "/analyze", {"teamflow": ["A"]}))[0] == 400
+            assert (await request(server.port, "GET", "/analyze"))[0] == 405
+            assert (await request(server.port, "POST", "/unknown", {}))[0] == 404
+
+            status, stats = await request(server.port, "GET", "/stats")
+            assert stats["errors"] == 3 and stats["computations"] == 1
+
+        self.serve(test)
+
+if __name__ == '__main__':
+    unittest.main()
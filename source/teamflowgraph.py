@@ -0,0 +1,75 @@
+# teamflowgraph.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+import pagerank as pr
+import cognitiveslope as cs
+
+class TeamFlowGraph:
+    """ Team Flow Graph - a team flow parsed once into compact arrays, accepted by every analysis in place of a dictionary
+
+    Each team has an integer id, its position in the names table, and each distinct dependency is one
+    entry of three contiguous arrays sorted by team then dependency:
+
+        - src (int32) the team that depends on another
+        - dst (int32) the team it depends on
+        - mode (uint8) the interaction mode code, see cognitiveslope.MODES, 0 for no interaction
+
+    Interaction modes are read from the position of each tuple, so teams named X, C or F do not collide
+    with the mode letters as they do in the dense dictionary parsers. The CSR adjacency used by page rank
+    and betweenness is built on first use and kept with the graph.
+
+    Parameters
+    ----------
+    names : list
+        team names, in id order
+    src, dst, mode : numpy arrays
+        one entry per distinct (team, dependency) pair
+    """
+
+    __slots__ = ("names", "index", "src", "dst", "mode", "csr")
+
+    def __init__(self, names, src, dst, mode):
+        self.names = list(names)
+        self.index = {k: i for i, k in enumerate(self.names)}
+        self.src = np.ascontiguousarray(src, dtype=np.int32)
+        self.dst = np.ascontiguousarray(dst, dtype=np.int32)
+        self.mode = np.ascontiguousarray(mode, dtype=np.uint8)
+        self.csr = None
+
+    @classmethod
+    def fromDict(cls, teamflow):
+        """ parses a teamflow dictionary, with or without interactions, as cognitiveslope.dictToEdges does """
+        src, dst, mode = cs.dictToEdges(teamflow)
+        order = np.lexsort((dst, src))
+        return cls(teamflow.keys(), src[order], dst[order], mode[order])
+
+    def __len__(self):
+        return len(self.names)
+
+    def toCSR(self):
+        """ returns the (indptr, indices) CSR adjacency of the graph as pagerank.dictToCSR does, built once """
+        if self.csr is None:
+            self.csr = pr.edgesToCSR(self.src, self.dst, len(self.names))
+        return self.csr
+
+    def toArray(self):
+        """ returns the dense adjacency matrix of the graph as pagerank.dictToArray does """
+        M = np.zeros((len(self.names), len(self.names)), dtype=int)
+        M[self.src, self.dst] = 1
+        return M
+
+    def toDict(self):
+        """ returns the graph as a teamflow dictionary with (team, mode) tuples """
+        letters = {m: k for k, m in cs.MODES.items()}
+        teamflow = {name: [] for name in self.names}
+        for s, d, m in zip(self.src.tolist(), self.dst.tolist(), self.mode.tolist()):
+            teamflow[self.names[s]].append((self.names[d], letters.get(m)))
+        return teamflow
+
+
+def asGraph(teamflow):
+    """ returns teamflow as a TeamFlowGraph, parsing it when given a dictionary """
+    return TeamFlowGraph.fromDict(teamflow) if isinstance(teamflow, dict) else teamflow
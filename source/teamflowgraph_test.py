@@ -0,0 +1,87 @@
+# teamflowgraph_test.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import unittest
+import numpy as np
+import teamflowgraph as tfg
+import pagerank as pr
+import teamtopology as tt
+import cognitiveslope as cs
+import fineflowevaluation as fine
+import teamgraph as tg
+import scenarios as sc
+
+class TestTeamFlowGraph(unittest.TestCase):
+
+    def setUp(self):
+
+        #Team flow for Bakers Unlimited Example
+        self.BU_TeamFlow = {'StoreRO':  ['CRM', 'QE', 'DataEC'],
+                            'OnlineRO': ['CRM', 'UX', 'QE', 'DataEC'],
+                            'CRM':      ['DataEC', 'CloudES'],
+                            'UX':       [],
+                            'QE':       [],
+                            'DataEC':   ['QE', 'CloudES'],
+                            'CloudES':  ['QE']
+        }
+
+        #Team flow for Bakers Unlimited Example with interactions
+        self.BU_TeamFlowWithInteractions = {'StoreRO':  [('CRM', 'C'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'OnlineRO': [('CRM', 'C'), ('UX', 'F'), ('QE', 'F'), ('DataEC', 'X')],
+                                            'CRM':      [('DataEC', 'X'), ('CloudES', 'X')],
+                                            'UX':       [],
+                                            'QE':       [],
+                                            'DataEC':   [('QE', 'F'), ('CloudES', 'X')],
+                                            'CloudES':  [('QE', 'F')]
+        }
+
+    def test_whenGivenDictionaryThenGraphHoldsCompactSortedArrays(self):
+        g = tfg.TeamFlowGraph.fromDict({'A': [('C', 'X'), ('B', 'F')], 'B': [('C', 'C')], 'C': []})
+
+        assert g.names == ['A', 'B', 'C'] and len(g) == 3
+        assert g.src.dtype == np.int32 and g.dst.dtype == np.int32 and g.mode.dtype == np.uint8
+        assert g.src.tolist() == [0, 0, 1]
+        assert g.dst.tolist() == [1, 2, 2]
+        assert g.mode.tolist() == [cs.MODES['F'], cs.MODES['X'], cs.MODES['C']]
+        assert not hasattr(g, '__dict__')
+
+    def test_whenGivenPlainDictionaryThenAdjacencyMatchesDictionaryParsers(self):
+        g = tfg.asGraph(self.BU_TeamFlow)
+
+        assert np.array_equal(g.toArray(), pr.dictToArray(self.BU_TeamFlow))
+        assert all(np.array_equal(a, b) for a, b in zip(g.toCSR(), pr.dictToCSR(self.BU_TeamFlow)))
+        assert g.toCSR() is g.toCSR()
+
+    def test_whenGivenGraphThenEveryAnalysisMatchesDictionary(self):
+        plain = tfg.asGraph(self.BU_TeamFlow)
+        g = tfg.asGraph(self.BU_TeamFlowWithInteractions)
+
+        assert tt.findTopology(plain, True, True) == tt.findTopology(self.BU_TeamFlow, True, True)
+        assert cs.findCognitiveSlope(g, True, True, True, True, True, True) == cs.findCognitiveSlope(self.BU_TeamFlowWithInteractions, True, True, True, True, True, True)
+        assert fine.evaluate(g) == fine.evaluate(self.BU_TeamFlowWithInteractions)
+        assert tg.TeamGraph(g).evaluate() == tg.TeamGraph(self.BU_TeamFlowWithInteractions).evaluate()
+
+        scenario = [[('StoreRO', 'QE', 'X')]]
+        assert np.array_equal(sc.evaluateScenarios(g, scenario, processes=1)[1], sc.evaluateScenarios(self.BU_TeamFlowWithInteractions, scenario, processes=1)[1])
+
+    def test_whenTeamsAreNamedAfterModesThenGraphHasNoCollision(self):
+        named = {'X': [('C', 'F'), ('F', 'X')], 'C': [('F', 'C')], 'F': []}
+        renamed = {'TX': [('TC', 'F'), ('TF', 'X')], 'TC': [('TF', 'C')], 'TF': []}
+
+        result = cs.findCognitiveSlope(tfg.asGraph(named), True, True, True, True, True, True)
+        expected = cs.findCognitiveSlope(renamed, True, True, True, True, True, True)
+
+        assert list(result.values()) == list(expected.values())
+
+    def test_whenGraphIsConvertedToDictionaryThenItParsesToTheSameGraph(self):
+        g = tfg.asGraph(self.BU_TeamFlowWithInteractions)
+        h = tfg.asGraph(g.toDict())
+
+        assert tfg.asGraph(g) is g
+        assert h.names == g.names
+        assert np.array_equal(h.src, g.src) and np.array_equal(h.dst, g.dst) and np.array_equal(h.mode, g.mode)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+# teamgraph.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+import pagerank as pr
+import betweenness as bt
+import cognitiveslope as cs
+import teamtopology as tt
+import teamflowgraph as tfg
+
+class TeamGraph:
+    """ Incremental Team Graph - keeps the analysis state of an organization between small edits
+
+    Intended for what-if reorganisation work where findTopology and evaluate are re-run on a team flow
+    that differs from the previous one by one or two edges. The graph keeps its edge list, its last
+    page rank vector and its unnormalized betweenness between edits:
+
+        - page rank is warm started from the previous vector after each change
+        - betweenness is only re-accumulated for the sources that can reach the edited edge, as no
+          other shortest path can pass through it
+        - interaction mode changes leave both centralities untouched
+
+    Parameters
+    ----------
+    teamflow : dictionary
+        dependency relationship dictionaly in the form: {"A":[("B","C"),("C","F")],"B":[("C","X")],"C":[]}
+        or, without interactions, {"A":["B","C"],"B":[],"C":[]}, or a TeamFlowGraph
+
+    warmStart : True/False
+        warm start page rank from the previous vector and iterate to the tolerance tol. When disabled, page rank
+        is solved from scratch exactly as findTopology and findCognitiveSlope do, so results match them.
+        The findTopology convergence check usually stops after very few iterations, so warm started ranks
+        are closer to the fixed point and can differ slightly from a cold start.
+
+    tol : float
+        L1 tolerance of the warm started page rank iterations
+    """
+
+    def __init__(self, teamflow, warmStart=True, tol=1e-10):
+        graph = tfg.asGraph(teamflow)
+        self.names = list(graph.names)
+        self.index = dict(graph.index)
+        self.warmStart = warmStart
+        self.tol = tol
+
+        self.edges = [dict() for _ in self.names]
+        for s, d, m in zip(graph.src.tolist(), graph.dst.tolist(), graph.mode.tolist()):
+            self.edges[s][d] = m
+
+        self.csr = None
+        self.rank = None
+        self.dependencies = None
+
+    def addEdge(self, team, dependency, mode=None):
+        """ adds a dependency of team on dependency, or updates the interaction mode of an existing one
+        Parameters
+        ----------
+        team, dependency : string
+            names of existing teams
+        mode : string, optional
+            interaction mode X, C or F, by default no interaction
+        """
+        s, d = self.lookup(team, dependency)
+        if d in self.edges[s]:
+            self.setMode(team, dependency, mode)
+            return
+
+        self.update(s, lambda: self.edges[s].__setitem__(d, cs.MODES.get(mode, 0)))
+
+    def removeEdge(self, team, dependency):
+        """ removes the dependency of team on dependency
+        Parameters
+        ----------
+        team, dependency : string
+            names of existing teams with a dependency between them
+        """
+        s, d = self.lookup(team, dependency)
+        if d not in self.edges[s]:
+            raise ValueError(f"{team} has no dependency on {dependency}")
+
+        self.update(s, lambda: self.edges[s].__delitem__(d))
+
+    def setMode(self, team, dependency, mode):
+        """ sets the interaction mode of an existing dependency, leaving the centralities untouched
+        Parameters
+        ----------
+        team, dependency : string
+            names of existing teams with a dependency between them
+        mode : string
+            interaction mode X, C or F
+        """
+        s, d = self.lookup(team, dependency)
+        if d not in self.edges[s]:
+            raise ValueError(f"{team} has no dependency on {dependency}")
+
+        self.edges[s][d] = cs.MODES.get(mode, 0)
+        self.csr = None
+
+    def lookup(self, team, dependency):
+        """ returns the indices of two team names, raising an error for unknown teams """
+        for name in (team, dependency):
+            if name not in self.index:
+                raise ValueError(f"unknown team: {name}")
+        return self.index[team], self.index[dependency]
+
+    def update(self, s, edit):
+        """ applies an adjacency edit to the edges of team s, re-accumulating only the affected betweenness """
+        if self.dependencies is None:
+            edit()
+            self.csr = None
+            return
+
+        #sources reaching s are the only ones whose shortest paths can use an edge leaving s
+        sources = self.ancestors(s)
+        self.dependencies -= bt.brandes(*self.arrays()[:2], sources)
+        edit()
+        self.csr = None
+        self.dependencies += bt.brandes(*self.arrays()[:2], sources)
+
+        #clear rounding residue so that classification of betweenness above zero stays exact
+        self.dependencies[np.abs(self.dependencies) < 1e-9] = 0.0
+
+    def ancestors(self, s):
+        """ returns the teams that can reach team s, including s itself """
+        indptr, indices, src, dst, mode = self.arrays()
+        order = np.argsort(dst, kind="stable")
+        parents = src[order]
+        ptr = np.concatenate(([0], np.cumsum(np.bincount(dst, minlength=len(self.names)))))
+
+        seen = np.zeros(len(self.names), dtype=bool)
+        seen[s] = True
+        frontier = np.array([s])
+        while frontier.size:
+            found = np.concatenate([parents[ptr[v]:ptr[v+1]] for v in frontier])
+            frontier = np.unique(found[~seen[found]])
+            seen[frontier] = True
+
+        return np.flatnonzero(seen)
+
+    def arrays(self):
+        """ returns the (indptr, indices, src, dst, mode) arrays of the current graph, rebuilt after edits """
+        if self.csr is None:
+            src = np.array([s for s, row in enumerate(self.edges) for _ in row], dtype=np.int64)
+            dst = np.array([d for row in self.edges for d in row], dtype=np.int64)
+            mode = np.array([m for row in self.edges for m in row.values()], dtype=np.uint8)
+            self.csr = pr.edgesToCSR(src, dst, len(self.names)) + (src, dst, mode)
+        return self.csr
+
+    def pagerank(self):
+        """ returns the normalized page rank of each team (d=0.8), warm started from the previous solve """
+        indptr, indices = self.arrays()[:2]
+        if not self.warmStart:
+            return pr.pagerankSparse(indptr, indices, 100, 0.8, normalize=True)
+
+        self.rank = pr.pagerankSparse(indptr, indices, 1000, 0.8, start=self.rank, tol=self.tol)
+        return self.rank / np.linalg.norm(self.rank)
+
+    def betweenness(self):
+        """ returns the betweenness of each team, accumulating all sources on first use only """
+        if self.dependencies is None:
+            self.dependencies = bt.brandes(*self.arrays()[:2])
+        return bt.rescale(self.dependencies, len(self.names))
+
+    def topology(self, classifiers=False, centralities=False, extended=True):
+        """ Team Topology Finder - as teamtopology.findTopology for the current graph """
+        indptr, indices = self.arrays()[:2]
+        betweenness = self.betweenness()
+        pagerank = self.pagerank()
+
+        classified_betweenness = bt.classify(betweenness)
+        classified_pagerank = pr.classify(pagerank)
+        degree_out = np.diff(indptr)
+        degree_in = np.bincount(indices, minlength=len(self.names))
+        types = tt.assignTypes(classified_betweenness, classified_pagerank, degree_out, degree_in, extended)
+
+        return tt.topologyResult(self.names, betweenness, pagerank, classified_betweenness, classified_pagerank, types, classifiers, centralities)
+
+    def evaluate(self, sum=False, flow=False, imp=False, need=False, energy=True, resilience=False):
+        """ FINE flow values - as fineflowevaluation.evaluate for the current graph """
+        src, dst, mode = self.arrays()[2:]
+        slopesSum, nonZeroCount = cs.edgeSlopes(src, dst, mode, len(self.names))
+        return cs.slopeResult(self.names, self.pagerank(), slopesSum, nonZeroCount, sum, flow, imp, need, energy, resilience)
+
+    def teamflow(self):
+        """ returns the current graph as a teamflow dictionary with (team, mode) tuples """
+        letters = {m: k for k, m in cs.MODES.items()}
+        return {name: [(self.names[d], letters.get(m)) for d, m in self.edges[s].items()] for s, name in enumerate(self.names)}
@@ -0,0 +1,93 @@
+# teamgraph_test.py
+
+# Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+import unittest
+import numpy as np
+import teamgraph as tg
+import teamtopology as tt
+import cognitiveslope as cs
+import betweenness as bt
+import pagerank as pr
+
+class TestTeamGraph(unittest.TestCase):
+
+    def setUp(self):
+
+        #Team flow for Bakers Unlimited Example with interactions
+        self.exampleTeamFlow = {'StoreRO':  [('CRM', 'C'), ('QE', 'F'), ('DataEC', 'X')],
+                                'OnlineRO': [('CRM', 'C'), ('UX', 'F'), ('QE', 'F'), ('DataEC', 'X')],
+                                'CRM':      [('DataEC', 'X'), ('CloudES', 'X')],
+                                'UX':       [],
+                                'QE':       [],
+                                'DataEC':   [('QE', 'F'), ('CloudES', 'X')],
+                                'CloudES':  [('QE', 'F')]
+        }
+
+
+    def test_whenGivenExampleTeamFlowThenTopologyAndValuesMatchWithoutWarmStart(self):
+
+        graph = tg.TeamGraph(self.exampleTeamFlow, warmStart=False)
+
+        assert graph.topology(classifiers=True, centralities=True) == tt.findTopology(self.exampleTeamFlow, classifiers=True, centralities=True, sparse=True)
+        assert graph.evaluate(flow=True, imp=True, need=True, energy=True, resilience=True) == cs.findCognitiveSlope(self.exampleTeamFlow, flow=True, imp=True, need=True, energy=True, resilience=True)
+
+
+    def test_whenEdgesAreEditedThenResultsMatchAFreshAnalysis(self):
+
+        graph = tg.TeamGraph(self.exampleTeamFlow, warmStart=False)
+        graph.topology()
+
+        graph.removeEdge('CRM', 'DataEC')
+        graph.addEdge('UX', 'CloudES', 'X')
+        graph.setMode('OnlineRO', 'QE', 'X')
+        teamflow = graph.teamflow()
+
+        assert ('CloudES', 'X') in teamflow['UX']
+        assert ('QE', 'X') in teamflow['OnlineRO']
+        assert graph.topology(classifiers=True, centralities=True) == tt.findTopology(teamflow, classifiers=True, centralities=True, sparse=True)
+        assert graph.evaluate(flow=True, imp=True, need=True, energy=True, sum=True) == cs.findCognitiveSlope(teamflow, flow=True, imp=True, need=True, energy=True, sum=True)
+
+
+    def test_whenEdgesAreEditedThenIncrementalBetweennessMatchesFullBetweenness(self):
+
+        rng = np.random.default_rng(5)
+        names = ['T%d' % i for i in range(12)]
+        graph = tg.TeamGraph({name: [] for name in names})
+        graph.betweenness()
+
+        for _ in range(60):
+            team, dependency = rng.choice(names, 2, replace=False)
+            if (dependency, None) in graph.teamflow()[team]:
+                graph.removeEdge(team, dependency)
+            else:
+                graph.addEdge(team, dependency)
+
+            indptr, indices = pr.dictToCSR(graph.teamflow())
+            assert np.allclose(graph.betweenness(), bt.betweennessCSR(indptr, indices, backend="native"))
+
+
+    def test_whenWarmStartedThenPageRankMatchesConvergedColdStart(self):
+
+        graph = tg.TeamGraph(self.exampleTeamFlow)
+        graph.pagerank()
+        graph.addEdge('QE', 'UX', 'F')
+
+        indptr, indices = pr.dictToCSR(graph.teamflow())
+        expected = pr.pagerankSparse(indptr, indices, 1000, 0.8, tol=1e-12)
+
+        assert np.allclose(graph.pagerank(), expected / np.linalg.norm(expected))
+
+
+    def test_whenGivenUnknownTeamOrDependencyThenError(self):
+
+        graph = tg.TeamGraph(self.exampleTeamFlow)
+
+        with self.assertRaises(ValueError):
+            graph.addEdge('StoreRO', 'Bakery')
+        with self.assertRaises(ValueError):
+            graph.removeEdge('UX', 'QE')
+
+if __name__ == '__main__':
+    unittest.main()
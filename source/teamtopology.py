@@ -3,12 +3,14 @@
 # Copyright © 2023, SAS Institute Inc., Cary, NC, USA.  All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
-from unittest import case
 import numpy as np
 import pagerank as pr
 import betweenness as bt
+import components as cc
+import analysiscache as ac
+import instrumentation as im
 
-def findTopology(teamflow, classifiers=False, centralities=False, extended=True):
+def findTopology(teamflow, classifiers=False, centralities=False, extended=True, sparse=False, betweennessMethod="exact", samples=None, seed=None, backend=None, cache=None, components=False, pagerankMethod="iteration"):
     """ Team Topology Finder - performs team topology analysis from flow of value between teams
     
     Parameters
@@ -24,6 +26,8 @@ def findTopology(teamflow, classifiers=False, centralities=False, extended=True)
                               teamB gets no value from the other teams (must be included)
                               teamC gets value only from teamC
 
+        or a TeamFlowGraph (see the teamflowgraph and edgelist modules), which is always analysed sparse
+
     classifiers : True/False
         include classifier values in the output
     
@@ -33,6 +37,40 @@ def findTopology(teamflow, classifiers=False, centralities=False, extended=True)
     extended: True/False
         perform extended checks for classifications of SA and EN teams by final examination of vertex degree (inbound/outbound edges)
 
+    sparse: True/False
+        build a sparse CSR adjacency matrix in O(E) and use sparse PageRank iterations instead of a dense matrix
+
+    betweennessMethod: "exact", "approx" or "interior"
+        exact computes betweenness for every vertex, approx estimates it from sampled pivots (see betweenness.betweennessApprox)
+        and interior only tests for betweenness above zero, which is all the classification needs (centralities are then 0 or 1)
+
+    samples: integer
+        number of pivots sampled by the approx betweenness method. The error bound of the estimates,
+        betweenness.errorBound(N, samples) for N teams, is not part of the output; it is recorded under
+        "betweenness" while instrumentation is enabled (see the instrumentation module)
+
+    seed: integer
+        seed for the pivot sampling of the approx betweenness method
+
+    backend: "networkx", "native" or "parallel"
+        betweenness implementation, by default networkx when it is installed (see betweenness.brandes
+        and betweenness.brandesParallel)
+
+    cache: AnalysisCache
+        reuse the adjacency matrix and centralities of earlier calls on the same team flow (see the analysiscache module)
+
+    components: True/False
+        split the graph into its weakly connected components first, implies sparse. Betweenness is accumulated per
+        component, skipping components of one or two teams, and across processes with the "parallel" backend (see
+        the components module). Page rank is the sparse pagerank iteration over all components at once, as its
+        teleport term and convergence check are taken over every team, so the output equals the default output
+
+    pagerankMethod: "iteration" or "components"
+        iteration is the pagerank iteration of the default output, components solves page rank separately for each
+        weakly connected component and normalizes the ranks over all teams (see components.pagerankSolve), implies
+        components. The component ranks redistribute the rank of teams without dependencies, so they differ from
+        the iteration ranks and the page rank classifiers and team types may differ from the default output
+
     Returns
     -------
     dictionary
@@ -48,53 +86,166 @@ def findTopology(teamflow, classifiers=False, centralities=False, extended=True)
             team_type is one of: SA, EN, CS or PF.
 
     """
-    t = pr.dictToArray(teamflow)
-    
-    betweenness = bt.betweenness(t)
-    pagerank = pr.pagerank(t, d=0.8, normalize=True)
-    classified_betweenness = bt.classify(betweenness)
-    classified_pagerank = pr.classify(pagerank)
-    
-    names = list(teamflow.keys())
-    result = {}
-
-    for i in range(0,len(names)):
-        tout = list()
-
-        #select team type from classification quadrant
-        type = ("SA","EN","CS","PF")[classified_betweenness[i]*2 + classified_pagerank[i]]
-
-        #unless disabled, perform extended degree checks for SA teams
-        if extended and type == "SA":
-            #convert to EN if no outbound edges present (degree_out = 0)
-            if np.sum(t, axis=1)[i] == 0:
-                type = "EN"
-                classified_pagerank[i] = 1
-
-            #convert to CS if both inbound and outbound edges present (degree in/out > 0)
-            if np.sum(t, axis=1)[i] > 0 and np.sum(t, axis=0)[i] > 0:
-                type = "CS"
-                classified_betweenness[i] = 1
-        
-        #unless disabled, perform extended degree checks for EN teams
-        if extended and type == "EN":
-            #convert to PF if one or more outbount edge present (degree out > 0)
-            if np.sum(t, axis=1)[i] > 0:
-                type = "PF"
-                classified_betweenness[i] = 1
-
-        #if requested, output centralities
-        if centralities:
-            tout.append(round(betweenness[i], 4))
-            tout.append(round(pagerank[i], 4))    
-
-        #if requested, output classifiers
-        if classifiers:
-            tout.append(classified_betweenness[i])
-            tout.append(classified_pagerank[i])
-
-        tout.append(type)
-
-        result[names[i]] = tout
-
-    return result
+    if betweennessMethod not in ("exact", "approx", "interior"):
+        raise ValueError("betweennessMethod must be one of: exact, approx or interior")
+    if pagerankMethod not in ("iteration", "components"):
+        raise ValueError("pagerankMethod must be one of: iteration or components")
+    components = components or pagerankMethod == "components"
+
+    if isinstance(teamflow, dict):
+        names = list(teamflow.keys())
+    else:
+        names = teamflow.names
+        sparse = True
+    sparse = sparse or components
+
+    #with a cache, matrices and centralities are looked up by team flow content and solver parameters
+    h = cache.key(teamflow) if cache is not None else None
+    layout = "components" if components else "sparse" if sparse else "dense"
+
+    #stages are timed when instrumentation is enabled (see the instrumentation module)
+    if sparse:
+        with im.stage("matrix"):
+            indptr, indices = ac.memoize(cache, (h, "csr"), lambda: pr.dictToCSR(teamflow) if isinstance(teamflow, dict) else teamflow.toCSR())
+            im.matrix("csr", len(names), len(indices), indptr, indices)
+            if components:
+                labels = ac.memoize(cache, (h, "components"), lambda: cc.weakComponents(indptr, indices))
+        with im.stage("pagerank"):
+            if pagerankMethod == "components":
+                pagerank = ac.memoize(cache, (h, "pagerank", "components", 0.8), lambda: cc.pagerankSolve(indptr, indices, labels, d=0.8, normalize=True))
+            else:
+                pagerank = ac.memoize(cache, (h, "pagerank", "sparse", 0.8), lambda: pr.pagerankSparse(indptr, indices, d=0.8, normalize=True))
+        degree_out = np.diff(indptr)
+        degree_in = np.bincount(indices, minlength=len(degree_out))
+        if betweennessMethod == "exact":
+            with im.stage("betweenness"):
+                if components:
+                    betweenness = ac.memoize(cache, (h, "betweenness", layout, backend), lambda: cc.betweenness(indptr, indices, labels, backend=backend))
+                else:
+                    betweenness = ac.memoize(cache, (h, "betweenness", layout, backend), lambda: bt.betweennessCSR(indptr, indices, backend))
+    else:
+        with im.stage("matrix"):
+            t = ac.memoize(cache, (h, "adjacency"), lambda: pr.dictToArray(teamflow))
+            im.matrix("dense", len(names), None, t)
+        with im.stage("pagerank"):
+            pagerank = ac.memoize(cache, (h, "pagerank", layout, 0.8), lambda: pr.pagerank(t, d=0.8, normalize=True))
+        degree_out = np.sum(t, axis=1)
+        degree_in = np.sum(t, axis=0)
+        if betweennessMethod == "exact":
+            with im.stage("betweenness"):
+                betweenness = ac.memoize(cache, (h, "betweenness", layout, backend), lambda: bt.betweenness(t, backend))
+        else:
+            with im.stage("matrix"):
+                indptr, indices = pr.arrayToCSR(t)
+
+    if betweennessMethod == "approx":
+        k = samples or len(degree_out)
+        #unseeded samples are drawn afresh for every call
+        with im.stage("betweenness"):
+            if components:
+                betweenness = ac.memoize(cache if seed is not None else None, (h, "approx", layout, k, seed, backend), lambda: cc.betweennessApprox(indptr, indices, labels, k, seed, backend=backend))
+            else:
+                betweenness = ac.memoize(cache if seed is not None else None, (h, "approx", layout, k, seed, backend), lambda: bt.betweennessApprox(indptr, indices, k, seed, backend=backend)[0])
+            im.record("betweenness", {'method': "approx", 'teams': len(degree_out), 'samples': min(k, len(degree_out)), 'bound': bt.errorBound(len(degree_out), k)})
+    elif betweennessMethod == "interior":
+        with im.stage("betweenness"):
+            betweenness = ac.memoize(cache, (h, "interior", layout), lambda: bt.interior(indptr, indices))
+
+    with im.stage("classification"):
+        classified_betweenness = bt.classify(betweenness)
+        classified_pagerank = pr.classify(pagerank)
+        types = assignTypes(classified_betweenness, classified_pagerank, degree_out, degree_in, extended)
+
+    with im.stage("output"):
+        return topologyResult(names, betweenness, pagerank, classified_betweenness, classified_pagerank, types, classifiers, centralities)
+
+
+def topologyResult(names, betweenness, pagerank, classified_betweenness, classified_pagerank, types, classifiers=False, centralities=False):
+    """ Builds the findTopology output dictionary from the per team arrays
+
+    Parameters
+    ----------
+    names : list
+        team names in matrix order
+
+    betweenness, pagerank : numpy arrays
+        centrality scores of each team
+
+    classified_betweenness, classified_pagerank : numpy arrays
+        classifiers (0 or 1) of each team, as updated by assignTypes
+
+    types : numpy array
+        team type of each team as output by assignTypes
+
+    classifiers, centralities : True/False
+        include classifier values and centrality scores in the output
+
+    Returns
+    -------
+    dictionary
+        a dictionary containing the team topology analysis, see findTopology
+
+    """
+    #build the output columns once, then only the final dictionary per team
+    columns = []
+    if centralities:
+        columns.append(np.round(betweenness, 4).tolist())
+        columns.append(np.round(pagerank, 4).tolist())
+    if classifiers:
+        columns.append(classified_betweenness.tolist())
+        columns.append(classified_pagerank.tolist())
+    columns.append(types.tolist())
+
+    return {name: list(row) for name, row in zip(names, zip(*columns))}
+
+
+def assignTypes(classified_betweenness, classified_pagerank, degree_out, degree_in, extended=True):
+    """ Team Type Assignment - selects the team type of every team from its classification quadrant
+
+    Parameters
+    ----------
+    classified_betweenness : numpy array
+        betweenness classifiers (0 or 1) as output by betweenness.classify, updated in place by the extended checks
+
+    classified_pagerank : numpy array
+        pageRank classifiers (0 or 1) as output by pagerank.classify, updated in place by the extended checks
+
+    degree_out : numpy array
+        number of outbound edges of each team
+
+    degree_in : numpy array
+        number of inbound edges of each team
+
+    extended: True/False
+        perform extended checks for classifications of SA and EN teams by final examination of vertex degree (inbound/outbound edges)
+
+    Returns
+    -------
+    numpy array
+        team type of each team, one of: SA, EN, CS or PF.
+
+    """
+    #select team type from classification quadrant
+    quadrant = classified_betweenness*2 + classified_pagerank
+
+    #unless disabled, perform extended degree checks for SA and EN teams
+    if extended:
+        sa = quadrant == 0
+
+        #convert SA to EN if no outbound edges present (degree_out = 0)
+        toEN = sa & (degree_out == 0)
+        classified_pagerank[toEN] = 1
+
+        #convert SA to CS if both inbound and outbound edges present (degree in/out > 0)
+        toCS = sa & (degree_out > 0) & (degree_in > 0)
+        classified_betweenness[toCS] = 1
+
+        #convert EN to PF if one or more outbount edge present (degree out > 0), teams converted from SA have none
+        toPF = (quadrant == 1) & (degree_out > 0)
+        classified_betweenness[toPF] = 1
+
+        quadrant[toEN] = 1
+        quadrant[toCS] = 2
+        quadrant[toPF] = 3
+
+    return np.array(["SA","EN","CS","PF"])[quadrant]
@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import unittest
+import numpy as np
 import teamtopology as tt
 
 class TestTeamTopology(unittest.TestCase):
@@ -192,5 +193,69 @@ class TestTeamTopology(unittest.TestCase):
 
         assert ttopology == expected
 
+    def test_whenGivenExampleTeamFlowThenSparseTopologyMatchesDenseTopology(self):
+
+        dense = tt.findTopology(self.exampleTeamFlow, centralities=True, classifiers=True)
+        ttopology = tt.findTopology(self.exampleTeamFlow, centralities=True, classifiers=True, sparse=True)
+
+        if ttopology != dense:
+            print('\nUnexpected result! \nExpected:', dense, '\nInstead :', ttopology)
+
+        assert ttopology == dense
+
+    def test_whenGivenExampleTeamFlowThenInteriorBetweennessGivesSameTopology(self):
+
+        exact = tt.findTopology(self.exampleTeamFlow, classifiers=True)
+
+        for sparse in (False, True):
+            ttopology = tt.findTopology(self.exampleTeamFlow, classifiers=True, sparse=sparse, betweennessMethod="interior")
+
+            if ttopology != exact:
+                print('\nUnexpected result! \nExpected:', exact, '\nInstead :', ttopology)
+
+            assert ttopology == exact
+
+
+    def test_whenGivenExampleTeamFlowAndAllPivotsThenApproxBetweennessGivesSameTopology(self):
+
+        exact = tt.findTopology(self.exampleTeamFlow, centralities=True, classifiers=True)
+        ttopology = tt.findTopology(self.exampleTeamFlow, centralities=True, classifiers=True, betweennessMethod="approx", seed=1)
+
+        if ttopology != exact:
+            print('\nUnexpected result! \nExpected:', exact, '\nInstead :', ttopology)
+
+        assert ttopology == exact
+
+
+    def test_whenGivenExampleTeamFlowThenNativeBetweennessGivesSameTopology(self):
+
+        expected = tt.findTopology(self.exampleTeamFlow, centralities=True, classifiers=True)
+        ttopology = tt.findTopology(self.exampleTeamFlow, centralities=True, classifiers=True, sparse=True, backend="native")
+
+        if ttopology != expected:
+            print('\nUnexpected result! \nExpected:', expected, '\nInstead :', ttopology)
+
+        assert ttopology == expected
+
+
+    def test_whenGivenUnknownBetweennessMethodThenError(self):
+
+        with self.assertRaises(ValueError):
+            tt.findTopology(self.exampleTeamFlow, betweennessMethod="fast")
+
+
+    def test_whenGivenClassifiersAndDegreesThenTypesAreAssignedWithExtendedChecks(self):
+
+        classified_betweenness = np.array([0, 0, 0, 0, 1, 1])
+        classified_pagerank    = np.array([0, 0, 0, 1, 1, 0])
+        degree_out             = np.array([2, 0, 1, 1, 0, 3])
+        degree_in              = np.array([0, 3, 2, 1, 2, 0])
+
+        types = tt.assignTypes(classified_betweenness, classified_pagerank, degree_out, degree_in)
+
+        assert types.tolist() == ['SA', 'EN', 'CS', 'PF', 'PF', 'CS']
+        assert classified_betweenness.tolist() == [0, 0, 1, 1, 1, 1]
+        assert classified_pagerank.tolist() == [0, 1, 0, 1, 1, 0]
+
 if __name__ == '__main__':
     unittest.main()